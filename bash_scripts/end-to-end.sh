@@ -38,11 +38,17 @@ while read -r CRAWL || [[ -n "$CRAWL" ]]; do
     ./get_data.sh "$CRAWL"
     echo "Data Downloaded for $CRAWL."
 
-    ./run_wat_to_link.sh "$CRAWL"
-    echo "wat_output_table constructed for $CRAWL."
+    if [ -n "$FUSED_WAT_TO_GRAPH" ]; then
+        # one Spark job, no intermediate wat_output_table
+        ./run_wat_to_graph.sh "$CRAWL"
+        echo "Compressed graphs constructed for $CRAWL."
+    else
+        ./run_wat_to_link.sh "$CRAWL"
+        echo "wat_output_table constructed for $CRAWL."
 
-    ./run_link_to_graph.sh "$CRAWL"
-    echo "Compressed graphs constructed for $CRAWL."
+        ./run_link_to_graph.sh "$CRAWL"
+        echo "Compressed graphs constructed for $CRAWL."
+    fi
 
     echo "--------------------------------------"
 
@@ -13,6 +13,7 @@ CRAWL="$1"
 # Get the root of the project (one level above this script's directory)
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 PROJECT_ROOT="$(dirname "$SCRIPT_DIR")"
+VENV_PATH="$PROJECT_ROOT/.venv"
 
 # Use SCRATCH if defined, else fallback to project-local data dir
 # For cluster use
@@ -29,6 +30,9 @@ fi
 # Base URL used to download the path listings
 BASE_URL=https://data.commoncrawl.org
 
+# Number of files to download per type (all: -1)
+NUM_FILES="${NUM_FILES:-1}"
+
 
 mkdir -p "$DATA_DIR/"
 INPUT_DIR="$DATA_DIR/crawl-data/$CRAWL/input"
@@ -40,33 +44,12 @@ if [ -e "$INPUT_DIR/test.txt" ]; then
     exit 1
 fi
 
-for data_type in warc wat wet; do
-
-    echo "Downloading Common Crawl paths listings (${data_type} files of $CRAWL)..."
-
-    mkdir -p "$DATA_DIR/crawl-data/$CRAWL/"
-    listing="$DATA_DIR/crawl-data/$CRAWL/$data_type.paths.gz"
-    cd "$DATA_DIR/crawl-data/$CRAWL/"
-    wget --timestamping "$BASE_URL/crawl-data/$CRAWL/$data_type.paths.gz"
-    cd -
-
-    echo "Downloading sample ${data_type} file..."
-
-    file=$(gzip -dc "$listing" | head -1)
-    full_path="$DATA_DIR/$file"
-    mkdir -p "$(dirname "$full_path")"
-    cd "$(dirname "$full_path")"
-    wget --timestamping "$BASE_URL/$file"
-    cd -
-
-    echo "Writing input file listings..."
-
-    input="$INPUT_DIR/test_${data_type}.txt"
-    echo "Test file: $input"
-    echo "file:$full_path" >>"$input"
-
-    input="$INPUT_DIR/all_${data_type}_${CRAWL}.txt"
-    echo "All ${data_type} files of ${CRAWL}: $input"
-    gzip -dc "$listing" >"$input"
-
-done
+# Download path listings and files (resumed if interrupted),
+# write the input file listings test_<type>.txt and all_<type>_<CRAWL>.txt
+cd "$PROJECT_ROOT"
+"$VENV_PATH/bin/python" -m tgrag.construct_graph_scripts.download_crawl_data "$CRAWL" \
+    --data-dir "$DATA_DIR" \
+    --base-url "$BASE_URL" \
+    --data-types warc wat wet \
+    --num-files "$NUM_FILES"
+cd -
@@ -0,0 +1,54 @@
+#!/bin/bash
+
+# Fail on first error
+set -e
+
+# Check if CRAWL argument is provided
+if [ -z "$1" ]; then
+    echo "Usage: $0 <CRAWL-ID> [HOST-LIST-CSV]"
+    echo "Example: $0 CC-MAIN-2017-13"
+    exit 1
+fi
+
+CRAWL="$1"
+
+# Get the root of the project (one level above this script's directory)
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+PROJECT_ROOT="$(dirname "$SCRIPT_DIR")"
+VENV_PATH="$PROJECT_ROOT/.venv"
+
+# Labelled domains (CSV with column `domain`)
+HOST_LIST="${2:-$PROJECT_ROOT/data/dqr/domain_pc1.csv}"
+
+# Use SCRATCH if defined, else fallback to project-local data dir
+# For cluster usage
+if [ -z "$SCRATCH" ]; then
+    DATA_DIR="$PROJECT_ROOT/data"
+else
+    DATA_DIR="$SCRATCH"
+fi
+
+# Locally mirrored columnar URL index
+# (s3://commoncrawl/cc-index/table/cc-main/warc/)
+INDEX_DIR="$DATA_DIR/cc-index/table/cc-main/warc/"
+
+# Activate the virtual environment
+source "$VENV_PATH/bin/activate"
+
+# Set PySpark to use the virtualenv's Python
+export PYSPARK_PYTHON="$VENV_PATH/bin/python"
+export PYSPARK_DRIVER_PYTHON="$VENV_PATH/bin/python"
+
+
+# Run the Spark job: fetch only the WARC records of the labelled domains
+"$VENV_PATH/bin/spark-submit" \
+  --py-files "$PROJECT_ROOT/tgrag/cc-scripts/sparkcc.py,$PROJECT_ROOT/tgrag/cc-scripts/async_fetch.py,$PROJECT_ROOT/tgrag/cc-scripts/spark_profiles.py,$PROJECT_ROOT/tgrag/cc-scripts/wat_extract_links.py,$PROJECT_ROOT/tgrag/cc-scripts/json_importer.py" \
+  "$PROJECT_ROOT/tgrag/cc-scripts/index_host_links.py" \
+  "$INDEX_DIR" \
+  "wat_output_table" \
+  --input_table_format parquet \
+  --crawl "$CRAWL" \
+  --host_list "$HOST_LIST" \
+  --host_list_column domain \
+  --fetch_concurrency 16 \
+  --input_base_url https://data.commoncrawl.org/
@@ -37,25 +37,46 @@ export PYSPARK_DRIVER_PYTHON="$VENV_PATH/bin/python"
 #Set output for text
 OUTPUT_DIR="$DATA_DIR/crawl-data/$CRAWL/output_text_dir"
 
-# Clean previous outputs if they exist
+# Clean previous outputs (and their manifest) if they exist
 rm -rf "$OUTPUT_DIR"
+rm -f "$DATA_DIR/crawl-data/$CRAWL/manifest.json"
 mkdir -p "$OUTPUT_DIR"
 
 echo "Cleaning up:"
 rm -rf "$SPARK_WAREHOUSE/host_graph_output_vertices"
 rm -rf "$SPARK_WAREHOUSE/host_graph_output_edges"
+rm -rf "$SPARK_WAREHOUSE/host_graph_output_stats"
+rm -rf "$SPARK_WAREHOUSE/host_graph_output_skew_report"
+
+# The merger (main.py) reads the binary graph, the text graph
+# (vertices/, edges/) and the adjacency lists are opt-in:
+# SAVE_TEXT=1 SAVE_ADJACENCY=1 $0 <CRAWL-ID>
+EXTRA_OUTPUTS=()
+if [ -n "$SAVE_TEXT" ]; then
+    EXTRA_OUTPUTS+=(--save_as_text "$OUTPUT_DIR")
+fi
+if [ -n "$SAVE_ADJACENCY" ]; then
+    EXTRA_OUTPUTS+=(--save_as_adjacency "$OUTPUT_DIR/adjacency")
+fi
 
 "$VENV_PATH"/bin/spark-submit \
   --driver-memory 2g \
   --executor-memory 2g \
   --conf spark.sql.shuffle.partitions=4 \
   --conf spark.io.compression.codec=snappy \
-  --py-files "$PROJECT_ROOT/tgrag/cc-scripts/sparkcc.py,$PROJECT_ROOT/tgrag/cc-scripts/wat_extract_links.py,$PROJECT_ROOT/tgrag/cc-scripts/json_importer.py" \
+  --py-files "$PROJECT_ROOT/tgrag/cc-scripts/sparkcc.py,$PROJECT_ROOT/tgrag/cc-scripts/async_fetch.py,$PROJECT_ROOT/tgrag/cc-scripts/spark_profiles.py,$PROJECT_ROOT/tgrag/cc-scripts/wat_extract_links.py,$PROJECT_ROOT/tgrag/cc-scripts/json_importer.py" \
   "$PROJECT_ROOT/tgrag/cc-scripts/hostlinks_to_graph.py" \
   "$SPARK_WAREHOUSE/wat_output_table" \
   host_graph_output \
   --output_format "parquet" \
   --output_compression "snappy" \
   --log_level "WARN" \
-  --save_as_text "$OUTPUT_DIR" \
+  --save_as_binary "$OUTPUT_DIR/binary" \
+  "${EXTRA_OUTPUTS[@]}" \
+  --save_stats "$OUTPUT_DIR/graph_stats.json" \
   --vertex_partitions 2
+
+# Write the slice manifest (time_id, counts, file sizes and checksums)
+# read by the merger
+(cd "$PROJECT_ROOT" && "$VENV_PATH/bin/python" -m tgrag.construct_graph_scripts.slice_manifest \
+  --CC-crawl "$CRAWL" --crawl-path "$DATA_DIR/crawl-data")
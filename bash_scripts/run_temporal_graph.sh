@@ -0,0 +1,60 @@
+#!/bin/bash
+
+# Fail on first error
+set -e
+
+# Check if link table list is provided
+if [ -z "$1" ]; then
+    echo "Usage: $0 <link-tables.txt>"
+    echo "Each line of <link-tables.txt>: <time_id> <path of link table of a crawl>"
+    echo "Example line: 20250521 spark-warehouse/wat_output_table_CC-MAIN-2025-21"
+    exit 1
+fi
+
+LINK_TABLES="$1"
+
+# Get the root of the project (one level above this script's directory)
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+PROJECT_ROOT="$(dirname "$SCRIPT_DIR")"
+VENV_PATH="$PROJECT_ROOT/.venv"
+
+# Use SCRATCH if defined, else fallback to project-local data dir
+# For cluster use
+if [ -z "$SCRATCH" ]; then
+    DATA_DIR="$PROJECT_ROOT/data"
+    SPARK_WAREHOUSE="spark-warehouse"
+else
+    DATA_DIR="$SCRATCH"
+    SPARK_WAREHOUSE="$SCRATCH/spark-warehouse"
+fi
+
+# Activate the virtual environment
+source "$VENV_PATH/bin/activate"
+
+# Set PySpark to use the virtualenv's Python
+export PYSPARK_PYTHON="$VENV_PATH/bin/python"
+export PYSPARK_DRIVER_PYTHON="$VENV_PATH/bin/python"
+
+# Temporal graph as CSV, read by the dataset code
+OUTPUT_DIR="$DATA_DIR/crawl-data/temporal"
+mkdir -p "$OUTPUT_DIR"
+
+echo "Cleaning up:"
+rm -rf "$SPARK_WAREHOUSE/temporal_graph_output_vertices"
+rm -rf "$SPARK_WAREHOUSE/temporal_graph_output_nodes"
+rm -rf "$SPARK_WAREHOUSE/temporal_graph_output_edges"
+
+"$VENV_PATH"/bin/spark-submit \
+  --driver-memory 2g \
+  --executor-memory 2g \
+  --conf spark.sql.shuffle.partitions=4 \
+  --conf spark.io.compression.codec=snappy \
+  --py-files "$PROJECT_ROOT/tgrag/cc-scripts/sparkcc.py,$PROJECT_ROOT/tgrag/cc-scripts/async_fetch.py,$PROJECT_ROOT/tgrag/cc-scripts/spark_profiles.py,$PROJECT_ROOT/tgrag/cc-scripts/wat_extract_links.py,$PROJECT_ROOT/tgrag/cc-scripts/json_importer.py,$PROJECT_ROOT/tgrag/cc-scripts/iana_tld.py,$PROJECT_ROOT/tgrag/cc-scripts/hostlinks_to_graph.py" \
+  "$PROJECT_ROOT/tgrag/cc-scripts/temporal_graph.py" \
+  "$LINK_TABLES" \
+  temporal_graph_output \
+  --output_format "parquet" \
+  --output_compression "snappy" \
+  --log_level "WARN" \
+  --save_as_csv "$OUTPUT_DIR" \
+  --vertex_partitions 2
@@ -0,0 +1,95 @@
+#!/bin/bash
+
+# Fail on first error
+set -e
+
+# Check if CRAWL argument is provided
+if [ -z "$1" ]; then
+    echo "Usage: $0 <CRAWL-ID>"
+    echo "Example: $0 CC-MAIN-2017-13"
+    exit 1
+fi
+
+CRAWL="$1"
+
+# Get the root of the project (one level above this script's directory)
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+PROJECT_ROOT="$(dirname "$SCRIPT_DIR")"
+VENV_PATH="$PROJECT_ROOT/.venv"
+
+# Use SCRATCH if defined, else fallback to project-local data dir
+# For cluster use
+if [ -z "$SCRATCH" ]; then
+    DATA_DIR="$PROJECT_ROOT/data"
+    SPARK_WAREHOUSE="spark-warehouse"
+else
+    DATA_DIR="$SCRATCH"
+    SPARK_WAREHOUSE="$SCRATCH/spark-warehouse"
+fi
+
+# Activate the virtual environment
+source "$VENV_PATH/bin/activate"
+
+# Set PySpark to use the virtualenv's Python
+export PYSPARK_PYTHON="$VENV_PATH/bin/python"
+export PYSPARK_DRIVER_PYTHON="$VENV_PATH/bin/python"
+
+#Set output for text
+OUTPUT_DIR="$DATA_DIR/crawl-data/$CRAWL/output_text_dir"
+
+# Clean previous outputs (and their manifest) if they exist
+rm -rf "$OUTPUT_DIR"
+rm -f "$DATA_DIR/crawl-data/$CRAWL/manifest.json"
+mkdir -p "$OUTPUT_DIR"
+
+echo "Cleaning up:"
+rm -rf "$SPARK_WAREHOUSE/host_graph_output_vertices"
+rm -rf "$SPARK_WAREHOUSE/host_graph_output_edges"
+rm -rf "$SPARK_WAREHOUSE/host_graph_output_stats"
+rm -rf "$SPARK_WAREHOUSE/host_graph_output_skew_report"
+
+# Extract links and construct the graph in one Spark job,
+# the link table (wat_output_table) is not written.
+# Local testing: use "$INPUT_DIR/test_wat.txt"
+# Cluster / full usage: ""$INPUT_DIR/all_wat_$CRAWL.txt"
+INPUT_DIR="$DATA_DIR/crawl-data/$CRAWL/input"
+SECONDS=0
+
+# The merger (main.py) reads the binary graph, the text graph
+# (vertices/, edges/) and the adjacency lists are opt-in:
+# SAVE_TEXT=1 SAVE_ADJACENCY=1 $0 <CRAWL-ID>
+EXTRA_OUTPUTS=()
+if [ -n "$SAVE_TEXT" ]; then
+    EXTRA_OUTPUTS+=(--save_as_text "$OUTPUT_DIR")
+fi
+if [ -n "$SAVE_ADJACENCY" ]; then
+    EXTRA_OUTPUTS+=(--save_as_adjacency "$OUTPUT_DIR/adjacency")
+fi
+
+"$VENV_PATH"/bin/spark-submit \
+  --driver-memory 2g \
+  --executor-memory 2g \
+  --conf spark.sql.shuffle.partitions=4 \
+  --conf spark.io.compression.codec=snappy \
+  --py-files "$PROJECT_ROOT/tgrag/cc-scripts/sparkcc.py,$PROJECT_ROOT/tgrag/cc-scripts/async_fetch.py,$PROJECT_ROOT/tgrag/cc-scripts/spark_profiles.py,$PROJECT_ROOT/tgrag/cc-scripts/wat_extract_links.py,$PROJECT_ROOT/tgrag/cc-scripts/json_importer.py,$PROJECT_ROOT/tgrag/cc-scripts/iana_tld.py,$PROJECT_ROOT/tgrag/cc-scripts/hostlinks_to_graph.py" \
+  "$PROJECT_ROOT/tgrag/cc-scripts/wat_to_graph.py" \
+  "$INPUT_DIR/test_wat.txt" \
+  host_graph_output \
+  --input_base_url https://data.commoncrawl.org/ \
+  --output_format "parquet" \
+  --output_compression "snappy" \
+  --log_level "WARN" \
+  --save_as_binary "$OUTPUT_DIR/binary" \
+  "${EXTRA_OUTPUTS[@]}" \
+  --save_stats "$OUTPUT_DIR/graph_stats.json" \
+  --vertex_partitions 2
+
+# Write the slice manifest (time_id, counts, file sizes and checksums)
+# read by the merger
+(cd "$PROJECT_ROOT" && "$VENV_PATH/bin/python" -m tgrag.construct_graph_scripts.slice_manifest \
+  --CC-crawl "$CRAWL" --crawl-path "$DATA_DIR/crawl-data")
+
+# Wall time and bytes written to the warehouse, to compare with
+# run_wat_to_link.sh followed by run_link_to_graph.sh
+echo "Wall time: ${SECONDS}s"
+echo "Warehouse bytes: $(du -sb "$SPARK_WAREHOUSE" | cut -f1)"
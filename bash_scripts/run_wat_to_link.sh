@@ -39,7 +39,7 @@ export PYSPARK_DRIVER_PYTHON="$VENV_PATH/bin/python"
 # Local testing: use "$INPUT_DIR/test_wat.txt"
 # Cluster / full usage: ""$INPUT_DIR/all_wat_$CRAWL.txt"
 "$VENV_PATH/bin/spark-submit" \
-  --py-files "$PROJECT_ROOT/tgrag/cc-scripts/sparkcc.py" \
+  --py-files "$PROJECT_ROOT/tgrag/cc-scripts/sparkcc.py,$PROJECT_ROOT/tgrag/cc-scripts/async_fetch.py,$PROJECT_ROOT/tgrag/cc-scripts/spark_profiles.py,$PROJECT_ROOT/tgrag/cc-scripts/json_importer.py" \
   "$PROJECT_ROOT/tgrag/cc-scripts/wat_extract_links.py" \
   "$INPUT_DIR/test_wat.txt" \
   "wat_output_table" \
@@ -0,0 +1,185 @@
+import gzip
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterator
+
+import pytest
+import requests
+
+from tgrag.construct_graph_scripts.download_crawl_data import (
+    download_file,
+    get_crawl_data,
+    select_paths,
+)
+
+CRAWL = 'CC-MAIN-2025-21'
+
+
+def _make_files() -> Dict[str, bytes]:
+    wat_paths = [
+        f'crawl-data/{CRAWL}/segments/1/wat/file-{i}.warc.wat.gz' for i in range(3)
+    ]
+    files = {path: os.urandom(10000 + i) for i, path in enumerate(wat_paths)}
+    files[f'crawl-data/{CRAWL}/wat.paths.gz'] = gzip.compress(
+        '\n'.join(wat_paths).encode() + b'\n'
+    )
+    return files
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    files: Dict[str, bytes] = {}
+    # number of GET requests of a path that fail with 503 or stall
+    failures: Dict[str, int] = {}
+    stalls: Dict[str, int] = {}
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+    def _send(self, body: bool) -> None:
+        path = self.path.lstrip('/')
+        data = self.files.get(path)
+        if data is None:
+            self.send_error(404)
+            return
+        if body and self.failures.get(path, 0) > 0:
+            self.failures[path] -= 1
+            self.send_error(503)
+            return
+        if body and self.stalls.get(path, 0) > 0:
+            self.stalls[path] -= 1
+            time.sleep(2)
+            return
+        start = 0
+        range_header = self.headers.get('Range')
+        if range_header:
+            start = int(range_header.split('=')[1].split('-')[0])
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{len(data)}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header(
+                'Content-Range', f'bytes {start}-{len(data) - 1}/{len(data)}'
+            )
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(data) - start))
+        self.end_headers()
+        if body:
+            self.wfile.write(data[start:])
+
+    def do_GET(self) -> None:
+        self._send(body=True)
+
+    def do_HEAD(self) -> None:
+        self._send(body=False)
+
+
+@pytest.fixture
+def files() -> Dict[str, bytes]:
+    return _make_files()
+
+
+@pytest.fixture
+def base_url(files: Dict[str, bytes]) -> Iterator[str]:
+    RangeRequestHandler.files = files
+    RangeRequestHandler.failures = {}
+    RangeRequestHandler.stalls = {}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RangeRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def test_select_paths() -> None:
+    paths = [str(i) for i in range(10)]
+    assert select_paths(paths, 3) == ['0', '1', '2']
+    assert select_paths(paths, -1) == paths
+    sample = select_paths(paths, 3, sample=True, seed=1)
+    assert len(set(sample)) == 3
+    assert sample == select_paths(paths, 3, sample=True, seed=1)
+
+
+def test_download_file_resumes_partial_download(
+    tmp_path: Path, base_url: str, files: Dict[str, bytes]
+) -> None:
+    path = next(p for p in files if p.endswith('file-0.warc.wat.gz'))
+    target = tmp_path / 'file-0.warc.wat.gz'
+    Path(str(target) + '.part').write_bytes(files[path][:1234])
+
+    size = download_file(f'{base_url}/{path}', str(target))
+
+    assert size == len(files[path])
+    assert target.read_bytes() == files[path]
+    assert not Path(str(target) + '.part').exists()
+
+
+def test_download_file_replaces_truncated_file(
+    tmp_path: Path, base_url: str, files: Dict[str, bytes]
+) -> None:
+    path = next(p for p in files if p.endswith('file-1.warc.wat.gz'))
+    target = tmp_path / 'file-1.warc.wat.gz'
+    target.write_bytes(files[path][:100])
+
+    download_file(f'{base_url}/{path}', str(target))
+
+    assert target.read_bytes() == files[path]
+
+
+def test_download_file_retries_server_error(
+    tmp_path: Path, base_url: str, files: Dict[str, bytes]
+) -> None:
+    path = next(p for p in files if p.endswith('file-2.warc.wat.gz'))
+    target = tmp_path / 'file-2.warc.wat.gz'
+    RangeRequestHandler.failures[path] = 2
+
+    download_file(f'{base_url}/{path}', str(target))
+
+    assert target.read_bytes() == files[path]
+    assert RangeRequestHandler.failures[path] == 0
+
+
+def test_download_file_does_not_retry_client_error(
+    tmp_path: Path, base_url: str
+) -> None:
+    with pytest.raises(requests.HTTPError):
+        download_file(f'{base_url}/missing', str(tmp_path / 'missing'))
+
+
+def test_download_file_retries_stalled_request(
+    tmp_path: Path, base_url: str, files: Dict[str, bytes]
+) -> None:
+    path = next(p for p in files if p.endswith('file-2.warc.wat.gz'))
+    target = tmp_path / 'file-2.warc.wat.gz'
+    RangeRequestHandler.stalls[path] = 1
+
+    start = time.monotonic()
+    download_file(f'{base_url}/{path}', str(target), timeout=(1, 0.1))
+
+    # the stalled request times out instead of waiting for the server
+    assert time.monotonic() - start < 1.5
+    assert target.read_bytes() == files[path]
+    assert RangeRequestHandler.stalls[path] == 0
+
+
+def test_get_crawl_data_writes_input_listings(
+    tmp_path: Path, base_url: str, files: Dict[str, bytes]
+) -> None:
+    get_crawl_data(CRAWL, str(tmp_path), base_url, ['wat'], num_files=2, workers=2)
+
+    input_dir = tmp_path / 'crawl-data' / CRAWL / 'input'
+    test_listing = (input_dir / 'test_wat.txt').read_text().splitlines()
+    all_listing = (input_dir / f'all_wat_{CRAWL}.txt').read_text().splitlines()
+
+    assert len(all_listing) == 3
+    assert len(test_listing) == 2
+    for line, path in zip(test_listing, all_listing):
+        assert line == f'file:{tmp_path / path}'
+        assert (tmp_path / path).read_bytes() == files[path]
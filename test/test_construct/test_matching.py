@@ -1,7 +1,10 @@
 import gzip
+import json
 import tempfile
+from pathlib import Path
 from typing import List
 
+import numpy as np
 import pytest
 
 from tgrag.utils.matching import extract_graph_domains
@@ -110,3 +113,32 @@ def test_extract_different_TLD(sample_different_TLD: List[str]) -> None:
     assert (
         result.iloc[0]['match_domain'] != result.iloc[1]['match_domain']
     ), 'Expected different top-level domains to be extracted as different domains.'
+
+
+def test_extract_graph_domains_binary(tmp_path: Path) -> None:
+    names = [b'com.xbox', b'cz.zvb.forum', b'gov.whitehouse']
+    offsets = np.zeros(len(names) + 1, dtype='<i8')
+    np.cumsum([len(name) for name in names], out=offsets[1:])
+    offsets.tofile(tmp_path / 'vertices.offsets.bin')
+    (tmp_path / 'vertices.names.bin').write_bytes(b''.join(names))
+    (tmp_path / 'vertices.json').write_text(
+        json.dumps(
+            {
+                'num_vertices': len(names),
+                'offsets': 'vertices.offsets.bin',
+                'offsets_dtype': '<i8',
+                'names': 'vertices.names.bin',
+                'encoding': 'utf-8',
+            }
+        )
+    )
+    (tmp_path / 'edges.json').write_text('{}')
+
+    result = extract_graph_domains(str(tmp_path))
+
+    assert result['node_id'].tolist() == [0, 1, 2]
+    assert result['match_domain'].tolist() == [
+        'xbox.com',
+        'zvb.cz',
+        'whitehouse.gov',
+    ]
@@ -0,0 +1,131 @@
+import gzip
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from tgrag.construct_graph_scripts import slice_manifest
+from tgrag.construct_graph_scripts.process_compressed_text import (
+    move_and_rename_compressed_outputs,
+)
+from tgrag.construct_graph_scripts.slice_manifest import (
+    read_slice_manifest,
+    update_slice_manifest,
+    verify_slice_manifest,
+    write_slice_manifest,
+)
+from tgrag.construct_graph_scripts.temporal_merge import TemporalGraphMerger
+
+SLICE_ID = 'CC-MAIN-2025-21'
+
+
+@pytest.fixture
+def crawl_root(tmp_path: Path) -> Path:
+    root = tmp_path / 'crawl-data'
+    wat_dir = root / SLICE_ID / 'segments' / '1234' / 'wat'
+    wat_dir.mkdir(parents=True)
+    with gzip.open(wat_dir / 'part-00000.wat.gz', 'wt') as f:
+        f.write('WARC/1.0\nWARC-Date: 2025-05-12T10:00:00Z\n')
+
+    # Spark text output, before it is moved by main
+    output_dir = root / SLICE_ID / 'output_text_dir'
+    (output_dir / 'vertices').mkdir(parents=True)
+    (output_dir / 'edges').mkdir(parents=True)
+    with gzip.open(output_dir / 'vertices' / 'part-00000.txt.gz', 'wt') as f:
+        f.write('0\tcom.example\n1\torg.wikipedia\n2\tie.peikko\n')
+    with gzip.open(output_dir / 'edges' / 'part-00000.txt.gz', 'wt') as f:
+        f.write('0\t1\n1\t2\n')
+    return root
+
+
+def test_write_slice_manifest(crawl_root: Path) -> None:
+    manifest = write_slice_manifest(str(crawl_root), SLICE_ID)
+
+    assert manifest == read_slice_manifest(str(crawl_root), SLICE_ID)
+    assert manifest['crawl_id'] == SLICE_ID
+    assert manifest['time_id'] == 20250512
+    assert manifest['num_vertices'] == 3
+    assert manifest['num_edges'] == 2
+
+    edges_file = (
+        crawl_root / SLICE_ID / 'output_text_dir' / 'edges' / 'part-00000.txt.gz'
+    )
+    entry = manifest['files']['edges/part-00000.txt.gz']
+    assert entry['size'] == edges_file.stat().st_size
+    assert entry['sha256'] == hashlib.sha256(edges_file.read_bytes()).hexdigest()
+
+
+def test_read_missing_manifest(crawl_root: Path) -> None:
+    assert read_slice_manifest(str(crawl_root), SLICE_ID) is None
+
+
+def test_merger_uses_manifest(tmp_path: Path, crawl_root: Path) -> None:
+    write_slice_manifest(str(crawl_root), SLICE_ID)
+    # WAT files are not needed anymore
+    shutil.rmtree(crawl_root / SLICE_ID / 'segments')
+
+    merger = TemporalGraphMerger(str(tmp_path / 'temporal'))
+    merger.time_ids_seen.add(20250512)
+    merger.add_graph(str(crawl_root), 'unused', 'unused', SLICE_ID)
+    assert merger.num_edges == 0
+
+
+def test_update_manifest_after_move(crawl_root: Path) -> None:
+    write_slice_manifest(str(crawl_root), SLICE_ID)
+    shutil.rmtree(crawl_root / SLICE_ID / 'segments')
+    output_dir = str(crawl_root / SLICE_ID / 'output_text_dir')
+    move_and_rename_compressed_outputs(output_dir, output_dir)
+
+    manifest = update_slice_manifest(str(crawl_root), SLICE_ID)
+    assert manifest['time_id'] == 20250512
+    assert 'vertices.txt.gz' in manifest['files']
+    assert 'edges.txt.gz' in manifest['files']
+    assert verify_slice_manifest(str(crawl_root), SLICE_ID, manifest) == []
+    assert update_slice_manifest(str(crawl_root), SLICE_ID) == manifest
+
+
+def test_verify_manifest_hashes_only_changed_files(
+    crawl_root: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    manifest = write_slice_manifest(str(crawl_root), SLICE_ID)
+    edges_file = (
+        crawl_root / SLICE_ID / 'output_text_dir' / 'edges' / 'part-00000.txt.gz'
+    )
+
+    def fail(path: str) -> str:
+        raise AssertionError(f'{path} hashed')
+
+    # size and mtime match: no file is read
+    monkeypatch.setattr(slice_manifest, 'file_checksum', fail)
+    assert verify_slice_manifest(str(crawl_root), SLICE_ID, manifest) == []
+    monkeypatch.undo()
+
+    # same content, new mtime: the checksum is compared
+    stat = edges_file.stat()
+    os.utime(edges_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert verify_slice_manifest(str(crawl_root), SLICE_ID, manifest) == []
+
+    data = bytearray(edges_file.read_bytes())
+    data[-1] ^= 0xFF
+    edges_file.write_bytes(bytes(data))
+    assert verify_slice_manifest(str(crawl_root), SLICE_ID, manifest) == [
+        'edges/part-00000.txt.gz: sha256'
+    ]
+
+
+def test_merger_verifies_manifest(tmp_path: Path, crawl_root: Path) -> None:
+    write_slice_manifest(str(crawl_root), SLICE_ID)
+    edges_file = (
+        crawl_root / SLICE_ID / 'output_text_dir' / 'edges' / 'part-00000.txt.gz'
+    )
+    with gzip.open(edges_file, 'wt') as f:
+        f.write('0\t2\n1\t2\n')
+
+    merger = TemporalGraphMerger(str(tmp_path / 'temporal'))
+    with pytest.raises(ValueError, match='edges/part-00000.txt.gz'):
+        merger.add_graph(str(crawl_root), 'unused', 'unused', SLICE_ID)
+    # slices merged already are not verified
+    merger.time_ids_seen.add(20250512)
+    merger.add_graph(str(crawl_root), 'unused', 'unused', SLICE_ID)
@@ -0,0 +1,324 @@
+import gzip
+import json
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tgrag.construct_graph_scripts.temporal_merge import (
+    DomainNormalizer,
+    LoadedSlice,
+    TemporalGraphMerger,
+)
+
+
+def _write_slice(
+    root: Path,
+    slice_id: str,
+    date: str,
+    vertices: List[str],
+    edges: List[Tuple[int, int]],
+) -> Tuple[str, str]:
+    wat_dir = root / slice_id / 'segments' / '1234' / 'wat'
+    wat_dir.mkdir(parents=True)
+    with gzip.open(wat_dir / 'part-00000.wat.gz', 'wt') as f:
+        f.write('WARC/1.0\nWARC-Type: warcinfo\nWARC-Date: ' + date + 'T10:00:00Z\n')
+
+    output_dir = root / slice_id / 'output_text_dir'
+    output_dir.mkdir(parents=True)
+    vertices_path = output_dir / 'vertices.txt.gz'
+    with gzip.open(vertices_path, 'wt') as f:
+        for node_id, domain in enumerate(vertices):
+            f.write(f'{node_id}\t{domain}\n')
+    edges_path = output_dir / 'edges.txt.gz'
+    with gzip.open(edges_path, 'wt') as f:
+        for src, dst in edges:
+            f.write(f'{src}\t{dst}\n')
+    return str(vertices_path), str(edges_path)
+
+
+@pytest.fixture
+def crawl_root(tmp_path: Path) -> Path:
+    root = tmp_path / 'crawl-data'
+    _write_slice(
+        root,
+        'CC-MAIN-2025-18',
+        '2025-04-20',
+        ['com.example', 'org.wikipedia', 'ie.peikko'],
+        [(0, 1), (1, 2), (2, 0)],
+    )
+    _write_slice(
+        root,
+        'CC-MAIN-2025-21',
+        '2025-05-12',
+        ['com.example', 'de.spiegel'],
+        [(0, 1)],
+    )
+    return root
+
+
+def _add_slice(merger: TemporalGraphMerger, root: Path, slice_id: str) -> None:
+    output_dir = root / slice_id / 'output_text_dir'
+    merger.add_graph(
+        str(root),
+        str(output_dir / 'vertices.txt.gz'),
+        str(output_dir / 'edges.txt.gz'),
+        slice_id,
+    )
+
+
+def test_add_graph_edge_chunks(tmp_path: Path, crawl_root: Path) -> None:
+    merger = TemporalGraphMerger(str(tmp_path / 'temporal'))
+    _add_slice(merger, crawl_root, 'CC-MAIN-2025-18')
+    _add_slice(merger, crawl_root, 'CC-MAIN-2025-21')
+
+    assert len(merger.edge_chunks) == 2
+    assert merger.num_edges == 4
+    for src, dst, time_id in merger.edge_chunks:
+        assert src.dtype == dst.dtype == np.int32
+        assert time_id.dtype == np.int32
+
+    src, dst, time_id = merger.get_edges()
+    assert src.tolist() == [0, 1, 2, 0]
+    # de.spiegel (local ID 1 in CC-MAIN-2025-21) is the fourth domain
+    assert dst.tolist() == [1, 2, 0, 3]
+    assert time_id.tolist() == [20250420] * 3 + [20250512]
+
+
+def test_add_graph_global_ids(tmp_path: Path, crawl_root: Path) -> None:
+    _write_slice(
+        crawl_root,
+        'CC-MAIN-2025-26',
+        '2025-06-15',
+        ['de.spiegel', 'org.wikipedia', 'COM.Example.', 'nl.nu'],
+        [(0, 1), (2, 0), (3, 2), (1, 3)],
+    )
+    merger = TemporalGraphMerger(str(tmp_path / 'temporal'))
+    for slice_id in ['CC-MAIN-2025-18', 'CC-MAIN-2025-21', 'CC-MAIN-2025-26']:
+        _add_slice(merger, crawl_root, slice_id)
+
+    assert {domain: node for domain, (node, _) in merger.domain_to_node.items()} == {
+        'com.example': 0,
+        'org.wikipedia': 1,
+        'ie.peikko': 2,
+        'de.spiegel': 3,
+        'nl.nu': 4,
+    }
+    src, dst, _ = merger.edge_chunks[-1]
+    assert list(zip(src.tolist(), dst.tolist())) == [(3, 1), (0, 3), (4, 0), (1, 4)]
+    assert merger.domain_to_node['com.example'] == (0, 20250615)
+
+
+def test_merge_slice_sparse_node_ids(tmp_path: Path) -> None:
+    merger = TemporalGraphMerger(str(tmp_path / 'temporal'))
+    merger._merge_slice(
+        LoadedSlice(
+            'CC-MAIN-2025-18',
+            20250420,
+            ['com.example', 'org.wikipedia', 'ie.peikko'],
+            np.array([7, 2**40, 2**41]),
+            np.array([7, 2**40, 2**41, 5]),
+            np.array([2**40, 2**41, 7, 7]),
+        )
+    )
+    src, dst, _ = merger.edge_chunks[-1]
+    # the edge of the unknown node ID 5 is dropped
+    assert list(zip(src.tolist(), dst.tolist())) == [(0, 1), (1, 2), (2, 0)]
+
+
+def test_add_graph_skips_existing_time_id(tmp_path: Path, crawl_root: Path) -> None:
+    merger = TemporalGraphMerger(str(tmp_path / 'temporal'))
+    _add_slice(merger, crawl_root, 'CC-MAIN-2025-18')
+    _add_slice(merger, crawl_root, 'CC-MAIN-2025-18')
+    assert merger.num_edges == 3
+
+
+def test_save_and_reload(tmp_path: Path, crawl_root: Path) -> None:
+    output_dir = tmp_path / 'temporal'
+    merger = TemporalGraphMerger(str(output_dir))
+    _add_slice(merger, crawl_root, 'CC-MAIN-2025-18')
+    _add_slice(merger, crawl_root, 'CC-MAIN-2025-21')
+    merger.save()
+    merger.export_csv()
+
+    df_edges = pd.read_csv(output_dir / 'temporal_edges.csv')
+    assert list(df_edges.columns) == ['src', 'dst', 'time_id']
+    assert len(df_edges) == 4
+    df_nodes = pd.read_csv(output_dir / 'temporal_nodes.csv')
+    assert list(df_nodes.columns) == ['domain', 'node_id', 'time_id']
+    assert set(df_nodes['domain']) == {
+        'com.example',
+        'org.wikipedia',
+        'ie.peikko',
+        'de.spiegel',
+    }
+
+    reloaded = TemporalGraphMerger(str(output_dir))
+    assert reloaded.num_edges == 4
+    assert reloaded.time_ids_seen == {20250420, 20250512}
+    assert [a.tolist() for a in reloaded.get_edges()] == [
+        a.tolist() for a in merger.get_edges()
+    ]
+
+
+def test_save_appends_partitions(tmp_path: Path, crawl_root: Path) -> None:
+    output_dir = tmp_path / 'temporal'
+    merger = TemporalGraphMerger(str(output_dir))
+    _add_slice(merger, crawl_root, 'CC-MAIN-2025-18')
+    merger.save()
+    first = output_dir / 'store' / 'edges' / 'time_id=20250420' / 'part-0.parquet'
+    mtime = first.stat().st_mtime_ns
+
+    reloaded = TemporalGraphMerger(str(output_dir))
+    _add_slice(reloaded, crawl_root, 'CC-MAIN-2025-21')
+    reloaded.save()
+
+    # only the new partition is written
+    assert first.stat().st_mtime_ns == mtime
+    assert reloaded.store.time_ids == [20250420, 20250512]
+    assert reloaded.domain_to_node['com.example'] == (0, 20250512)
+    assert reloaded.domain_to_node['ie.peikko'] == (2, 20250420)
+    assert TemporalGraphMerger(str(output_dir)).num_edges == 4
+
+
+def test_reload_from_snapshot(tmp_path: Path, crawl_root: Path) -> None:
+    output_dir = tmp_path / 'temporal'
+    merger = TemporalGraphMerger(str(output_dir))
+    _add_slice(merger, crawl_root, 'CC-MAIN-2025-18')
+    _add_slice(merger, crawl_root, 'CC-MAIN-2025-21')
+    merger.save()
+    assert merger.snapshot.time_ids == [20250420, 20250512]
+
+    reloaded = TemporalGraphMerger(str(output_dir))
+    assert all(isinstance(src, np.memmap) for src, _, _ in reloaded.edge_chunks)
+    assert reloaded.domain_to_node == merger.domain_to_node
+    assert [a.tolist() for a in reloaded.get_edges()] == [
+        a.tolist() for a in merger.get_edges()
+    ]
+
+    # a stale snapshot is ignored, the store is read instead
+    merger.store.append_partition(
+        20250601,
+        'CC-MAIN-2025-26',
+        np.array([1]),
+        np.array([0]),
+        ['nl.nu', 'com.example'],
+        np.array([0, 1]),
+    )
+    reloaded = TemporalGraphMerger(str(output_dir))
+    assert reloaded.num_edges == 5
+    src, dst, _ = reloaded.edge_chunks[-1]
+    assert (src.tolist(), dst.tolist()) == ([0], [4])
+    reloaded.save()
+    assert reloaded.snapshot.time_ids == [20250420, 20250512, 20250601]
+
+
+def test_upgrade_snapshot_version(tmp_path: Path, crawl_root: Path) -> None:
+    output_dir = tmp_path / 'temporal'
+    merger = TemporalGraphMerger(str(output_dir))
+    _add_slice(merger, crawl_root, 'CC-MAIN-2025-18')
+    _add_slice(merger, crawl_root, 'CC-MAIN-2025-21')
+    merger.save()
+    expected = [a.tolist() for a in merger.get_edges()]
+
+    # version 1: edges with the node IDs of the slices, no version in the header
+    snapshot_dir = output_dir / 'snapshot'
+    np.save(snapshot_dir / 'edges' / '20250512.src.npy', np.array([0]))
+    np.save(snapshot_dir / 'edges' / '20250512.dst.npy', np.array([1]))
+    header_path = snapshot_dir / 'nodes' / 'vertices.json'
+    header = json.loads(header_path.read_text())
+    del header['version']
+    header_path.write_text(json.dumps(header))
+
+    reloaded = TemporalGraphMerger(str(output_dir))
+    assert not reloaded.snapshot.exists()
+    assert [a.tolist() for a in reloaded.get_edges()] == expected
+    reloaded.save()
+    assert reloaded.snapshot.time_ids == [20250420, 20250512]
+
+    reloaded = TemporalGraphMerger(str(output_dir))
+    assert all(isinstance(src, np.memmap) for src, _, _ in reloaded.edge_chunks)
+    assert [a.tolist() for a in reloaded.get_edges()] == expected
+
+
+def test_migrate_csv_to_store(tmp_path: Path, crawl_root: Path) -> None:
+    output_dir = tmp_path / 'temporal'
+    merger = TemporalGraphMerger(str(output_dir))
+    _add_slice(merger, crawl_root, 'CC-MAIN-2025-18')
+    _add_slice(merger, crawl_root, 'CC-MAIN-2025-21')
+    merger.export_csv()
+
+    migrated = TemporalGraphMerger(str(output_dir))
+    migrated.save()
+    assert migrated.store.time_ids == [20250420, 20250512]
+    reloaded = TemporalGraphMerger(str(output_dir))
+    assert [a.tolist() for a in reloaded.get_edges()] == [
+        a.tolist() for a in merger.get_edges()
+    ]
+    assert reloaded.domain_to_node == merger.domain_to_node
+
+
+def test_add_graphs_parallel(tmp_path: Path, crawl_root: Path) -> None:
+    serial = TemporalGraphMerger(str(tmp_path / 'serial'))
+    _add_slice(serial, crawl_root, 'CC-MAIN-2025-18')
+    _add_slice(serial, crawl_root, 'CC-MAIN-2025-21')
+
+    slices = []
+    # slices given out of time order, and one of them twice
+    for slice_id in ['CC-MAIN-2025-21', 'CC-MAIN-2025-18', 'CC-MAIN-2025-21']:
+        output_dir = crawl_root / slice_id / 'output_text_dir'
+        slices.append(
+            (
+                str(output_dir / 'vertices.txt.gz'),
+                str(output_dir / 'edges.txt.gz'),
+                slice_id,
+            )
+        )
+    parallel = TemporalGraphMerger(str(tmp_path / 'parallel'))
+    parallel.add_graphs(str(crawl_root), slices, workers=2)
+
+    assert [a.tolist() for a in parallel.get_edges()] == [
+        a.tolist() for a in serial.get_edges()
+    ]
+    assert parallel.domain_to_node == serial.domain_to_node
+
+
+def test_domain_normalizer() -> None:
+    names = [
+        'com.example',
+        ' COM.Example. ',
+        'www.example.com',
+        'WWW.www.example.com',
+        'http://www.Example.com:8080/path',
+        'https://',
+        'example.com:443',
+        'example.com.:80',
+        'Ä.example.',
+        '\x1ccom.example\x1f',
+        'www.',
+        '',
+    ]
+    expected = [TemporalGraphMerger._normalize_domain(name) for name in names]
+    assert DomainNormalizer.normalize_batch(names) == expected
+
+    normalizer = DomainNormalizer()
+    assert normalizer.normalize(names) == expected
+    assert normalizer.cache[' COM.Example. '] == 'com.example'
+    assert normalizer.normalize(names[::-1] + ['Org.New']) == expected[::-1] + [
+        'org.new'
+    ]
+    assert len(normalizer.cache) == len(set(names)) + 1
+
+
+def test_normalizer_cache_across_slices(tmp_path: Path, crawl_root: Path) -> None:
+    merger = TemporalGraphMerger(str(tmp_path / 'temporal'))
+    _add_slice(merger, crawl_root, 'CC-MAIN-2025-18')
+    _add_slice(merger, crawl_root, 'CC-MAIN-2025-21')
+    assert set(merger.normalizer.cache) == {
+        'com.example',
+        'org.wikipedia',
+        'ie.peikko',
+        'de.spiegel',
+    }
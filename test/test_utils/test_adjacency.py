@@ -0,0 +1,124 @@
+import ast
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from tgrag.utils.adjacency import (
+    csr_to_edges,
+    decode_varints,
+    encode_successors,
+    encode_varints,
+    read_adjacency,
+)
+
+
+@pytest.fixture
+def adjacency() -> Dict[int, List[int]]:
+    return {
+        0: [1, 5, 300],
+        2: [0, 300, 100000],
+        3: [4],
+        7: [0, 1, 2, 3],
+    }
+
+
+def _write_part(path: Path, adjacency: Dict[int, List[int]]) -> None:
+    table = pa.table(
+        {
+            's': pa.array(list(adjacency), type=pa.int64()),
+            'degree': pa.array([len(t) for t in adjacency.values()], type=pa.int32()),
+            'successors': pa.array(
+                [encode_successors(t) for t in adjacency.values()], type=pa.binary()
+            ),
+        }
+    )
+    pq.write_table(table, str(path))
+
+
+def _load_spark_encoder() -> Any:
+    # the cc-scripts are run by spark-submit and import modules (sparkcc,
+    # iana_tld) which are not dependencies of tgrag: only the static
+    # adjacency encoders of HostLinksToGraph are compiled
+    path = Path(__file__).parents[2] / 'tgrag' / 'cc-scripts' / 'hostlinks_to_graph.py'
+    tree = ast.parse(path.read_text())
+    cls = next(
+        node
+        for node in tree.body
+        if isinstance(node, ast.ClassDef) and node.name == 'HostLinksToGraph'
+    )
+    cls.bases = []
+    cls.body = [
+        node
+        for node in cls.body
+        if isinstance(node, ast.FunctionDef)
+        and node.name in ('encode_varints', 'edges_to_adjacency')
+    ]
+    namespace: Dict[str, Any] = {}
+    module = ast.Module(body=[cls], type_ignores=[])
+    exec(compile(module, str(path), 'exec'), namespace)
+    return namespace['HostLinksToGraph']
+
+
+def test_decode_varints() -> None:
+    values = [0, 1, 127, 128, 300, 16383, 16384, 2**35, 2**62]
+    data = np.frombuffer(encode_varints(values), dtype=np.uint8)
+    assert decode_varints(data).tolist() == values
+
+
+def test_decode_varints_truncated() -> None:
+    with pytest.raises(ValueError):
+        decode_varints(np.array([0x01, 0x80], dtype=np.uint8))
+
+
+def test_read_adjacency(tmp_path: Path, adjacency: Dict[int, List[int]]) -> None:
+    # parts written in reverse order to check that rows are sorted by source
+    _write_part(tmp_path / 'part-00001.parquet', {7: adjacency[7]})
+    _write_part(
+        tmp_path / 'part-00000.parquet',
+        {s: adjacency[s] for s in adjacency if s != 7},
+    )
+
+    indptr, indices = read_adjacency(str(tmp_path), num_nodes=10)
+
+    assert len(indptr) == 11
+    for v in range(10):
+        assert indices[indptr[v] : indptr[v + 1]].tolist() == adjacency.get(v, [])
+
+    src, dst = csr_to_edges(indptr, indices)
+    edges = {(s, t) for s in adjacency for t in adjacency[s]}
+    assert set(zip(src.tolist(), dst.tolist())) == edges
+    assert len(src) == len(edges)
+
+
+def test_read_adjacency_num_nodes(
+    tmp_path: Path, adjacency: Dict[int, List[int]]
+) -> None:
+    _write_part(tmp_path / 'part-00000.parquet', adjacency)
+    indptr, indices = read_adjacency(str(tmp_path))
+    assert len(indptr) == 100000 + 2
+    assert indptr[-1] == len(indices) == 11
+
+
+def test_spark_encoder_matches(tmp_path: Path, adjacency: Dict[int, List[int]]) -> None:
+    spark_encoder = _load_spark_encoder()
+    values = [0, 1, 127, 128, 300, 16383, 16384, 2**35, 2**62]
+    assert spark_encoder.encode_varints(values) == encode_varints(values)
+
+    rows = [(s, t) for s in sorted(adjacency) for t in adjacency[s]]
+    sources, degrees, successors = zip(*spark_encoder.edges_to_adjacency(rows))
+    table = pa.table(
+        {
+            's': pa.array(sources, type=pa.int64()),
+            'degree': pa.array(degrees, type=pa.int32()),
+            'successors': pa.array(successors, type=pa.binary()),
+        }
+    )
+    pq.write_table(table, str(tmp_path / 'part-00000.parquet'))
+
+    indptr, indices = read_adjacency(str(tmp_path), num_nodes=10)
+    for v in range(10):
+        assert indices[indptr[v] : indptr[v + 1]].tolist() == adjacency.get(v, [])
@@ -0,0 +1,78 @@
+import json
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pytest
+
+from tgrag.utils.binary_graph import (
+    VertexNames,
+    is_binary_graph,
+    read_binary_edges,
+)
+
+
+def _write_binary_graph(path: Path, names: List[str], edges: np.ndarray) -> None:
+    data = [name.encode('utf-8') for name in names]
+    offsets = np.zeros(len(names) + 1, dtype='<i8')
+    np.cumsum([len(d) for d in data], out=offsets[1:])
+    offsets.tofile(path / 'vertices.offsets.bin')
+    (path / 'vertices.names.bin').write_bytes(b''.join(data))
+    (path / 'vertices.json').write_text(
+        json.dumps(
+            {
+                'num_vertices': len(names),
+                'offsets': 'vertices.offsets.bin',
+                'offsets_dtype': '<i8',
+                'names': 'vertices.names.bin',
+                'encoding': 'utf-8',
+            }
+        )
+    )
+    edges.astype('<i4').tofile(path / 'edges.bin')
+    (path / 'edges.json').write_text(
+        json.dumps(
+            {
+                'num_edges': len(edges),
+                'num_vertices': len(names),
+                'edges': 'edges.bin',
+                'dtype': '<i4',
+                'shape': [len(edges), 2],
+                'columns': ['s', 't'],
+            }
+        )
+    )
+
+
+@pytest.fixture
+def names() -> List[str]:
+    return ['com.example', 'de.xn--bcher-kva', 'ie.peikko', 'org.wikipedia.de']
+
+
+def test_read_binary_graph(tmp_path: Path, names: List[str]) -> None:
+    edges = np.array([[0, 1], [0, 3], [2, 1], [3, 0]])
+    _write_binary_graph(tmp_path, names, edges)
+
+    assert is_binary_graph(str(tmp_path))
+    mapped = read_binary_edges(str(tmp_path))
+    assert isinstance(mapped, np.memmap)
+    assert mapped.tolist() == edges.tolist()
+    assert read_binary_edges(str(tmp_path), mmap=False).tolist() == edges.tolist()
+
+    vertex_names = VertexNames(str(tmp_path))
+    assert len(vertex_names) == len(names)
+    assert vertex_names[2] == 'ie.peikko'
+    assert vertex_names.to_list() == names
+    with pytest.raises(IndexError):
+        vertex_names[len(names)]
+
+
+def test_read_empty_binary_graph(tmp_path: Path) -> None:
+    _write_binary_graph(tmp_path, [], np.zeros((0, 2), dtype='<i4'))
+
+    assert read_binary_edges(str(tmp_path)).shape == (0, 2)
+    assert VertexNames(str(tmp_path)).to_list() == []
+
+
+def test_is_binary_graph(tmp_path: Path) -> None:
+    assert not is_binary_graph(str(tmp_path))
@@ -0,0 +1,35 @@
+from pathlib import Path
+
+import numpy as np
+
+from tgrag.utils.graph_snapshot import GraphSnapshot
+
+
+def test_snapshot_roundtrip(tmp_path: Path) -> None:
+    snapshot = GraphSnapshot(str(tmp_path / 'snapshot'))
+    assert not snapshot.exists()
+    snapshot.write_partition(20250420, np.array([0, 1, 2]), np.array([1, 2, 0]))
+    snapshot.write_partition(20250512, np.zeros(0, np.int32), np.zeros(0, np.int32))
+    snapshot.write_nodes(
+        ['com.example', 'ie.peikko', 'fi.äö'],
+        np.array([0, 2, 3]),
+        np.array([20250512, 20250420, 20250420]),
+        [20250512, 20250420],
+    )
+
+    reopened = GraphSnapshot(snapshot.path)
+    assert reopened.time_ids == [20250420, 20250512]
+    assert reopened.has_partition(20250420)
+    assert not reopened.has_partition(20250101)
+
+    src, dst = reopened.read_partition(20250420)
+    assert isinstance(src, np.memmap)
+    assert src.tolist() == [0, 1, 2]
+    assert dst.tolist() == [1, 2, 0]
+    src, dst = reopened.read_partition(20250512)
+    assert len(src) == len(dst) == 0
+
+    domains, node_ids, time_ids = reopened.read_nodes()
+    assert domains == ['com.example', 'ie.peikko', 'fi.äö']
+    assert node_ids.tolist() == [0, 2, 3]
+    assert time_ids.tolist() == [20250512, 20250420, 20250420]
@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from tgrag.utils.temporal_store import TemporalGraphStore
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> TemporalGraphStore:
+    store = TemporalGraphStore(str(tmp_path / 'store'))
+    store.append_partition(
+        20250420,
+        'CC-MAIN-2025-18',
+        np.array([0, 1, 2]),
+        np.array([1, 2, 0]),
+        ['com.example', 'org.wikipedia', 'ie.peikko'],
+        np.array([0, 1, 2]),
+    )
+    store.append_partition(
+        20250512,
+        'CC-MAIN-2025-21',
+        np.array([0]),
+        np.array([1]),
+        ['com.example', 'de.spiegel'],
+        np.array([0, 1]),
+    )
+    return store
+
+
+def test_read_time_range(store: TemporalGraphStore) -> None:
+    reopened = TemporalGraphStore(store.path)
+    assert reopened.time_ids == [20250420, 20250512]
+
+    edges = reopened.read_edges()
+    assert edges['src'].tolist() == [0, 1, 2, 0]
+    assert edges['time_id'].tolist() == [20250420] * 3 + [20250512]
+
+    edges = reopened.read_edges(start=20250501)
+    assert edges['dst'].tolist() == [1]
+    assert len(reopened.read_edges(end=20250101)) == 0
+
+
+def test_read_nodes_last_seen(store: TemporalGraphStore) -> None:
+    nodes = store.read_nodes().set_index('domain')
+    assert nodes.loc['com.example', 'time_id'] == 20250512
+    assert nodes.loc['ie.peikko', 'time_id'] == 20250420
+    assert len(nodes) == 4
+
+    nodes = store.read_nodes(end=20250420)
+    assert set(nodes['domain']) == {'com.example', 'org.wikipedia', 'ie.peikko'}
+
+
+def test_append_existing_partition(store: TemporalGraphStore) -> None:
+    with pytest.raises(ValueError):
+        store.append_partition(
+            20250512, 'CC-MAIN-2025-21', np.array([0]), np.array([1]), [], np.array([])
+        )
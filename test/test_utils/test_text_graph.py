@@ -0,0 +1,34 @@
+import gzip
+from pathlib import Path
+
+from tgrag.utils.text_graph import read_text_edges, read_text_vertices
+
+
+def test_read_text_edges(tmp_path: Path) -> None:
+    path = tmp_path / 'edges.txt.gz'
+    with gzip.open(path, 'wt') as f:
+        f.write('0\t1\n0\t2\nmalformed\n5\t3\n')
+
+    src, dst = read_text_edges(str(path))
+    assert src.tolist() == [0, 0, 5]
+    assert dst.tolist() == [1, 2, 3]
+
+
+def test_read_text_edges_empty(tmp_path: Path) -> None:
+    path = tmp_path / 'edges.txt.gz'
+    with gzip.open(path, 'wt'):
+        pass
+
+    src, dst = read_text_edges(str(path))
+    assert len(src) == len(dst) == 0
+
+
+def test_read_text_vertices(tmp_path: Path) -> None:
+    path = tmp_path / 'vertices.txt.gz'
+    with gzip.open(path, 'wb') as f:
+        f.write('0\tcom.example\n1\tde.bücher\n'.encode('utf-8'))
+        f.write(b'2\tcom.invalid\xff\n')
+
+    names, node_ids = read_text_vertices(str(path))
+    assert names == ['com.example', 'de.bücher', 'com.invalid']
+    assert node_ids.tolist() == [0, 1, 2]
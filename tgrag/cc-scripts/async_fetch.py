@@ -0,0 +1,113 @@
+"""asyncio-based fetch engine keeping multiple downloads in flight
+per Python worker, cf. CCSparkJob option --fetch_concurrency
+"""
+
+import asyncio
+import queue
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncFetcher(object):
+    """Fetch WARC/WAT/WET files or records concurrently.
+
+    An asyncio event loop running in a background thread schedules
+    up to `concurrency` fetches (at most `per_host_concurrency` per host).
+    The blocking fetch function is run in a thread pool, so that all
+    access methods supported by `CCSparkJob.fetch_warc` (S3, HTTP, HDFS,
+    local files) are available. Completed streams are handed over to
+    the consuming thread (the Spark task) in completion order. A slot
+    is only released after the consumer has taken the stream, so that
+    no more than `concurrency` streams are buffered at any time.
+    """
+
+    _done = object()
+
+    def __init__(self, fetch, host_of, concurrency=8, per_host_concurrency=4):
+        """
+        Args:
+            fetch: function called with an item, returns a stream or None
+            host_of: function called with an item, returns the host name
+                (or any other key) used to limit the per-host concurrency
+            concurrency: max. number of fetches in flight or buffered
+            per_host_concurrency: max. number of fetches in flight per host
+        """
+        self.fetch = fetch
+        self.host_of = host_of
+        self.concurrency = max(1, concurrency)
+        self.per_host_concurrency = max(1, per_host_concurrency)
+
+    def fetch_all(self, items):
+        """Fetch all items, yield pairs <item, stream> in completion order.
+        Exceptions raised by the fetch function are re-raised in the
+        consuming thread.
+        """
+        results = queue.Queue()
+        loop = asyncio.new_event_loop()
+        # semaphore is created inside the loop (required for Python < 3.10)
+        slots = []
+        task = loop.create_task(self._fetch_all(loop, items, results, slots))
+
+        def run_loop():
+            try:
+                loop.run_until_complete(task)
+            except BaseException as exception:
+                results.put(exception)
+            finally:
+                results.put(AsyncFetcher._done)
+
+        thread = threading.Thread(target=run_loop, name='AsyncFetcher', daemon=True)
+        thread.start()
+        try:
+            while True:
+                res = results.get()
+                if res is AsyncFetcher._done:
+                    break
+                if isinstance(res, BaseException):
+                    raise res
+                loop.call_soon_threadsafe(slots[0].release)
+                yield res
+        finally:
+            if thread.is_alive():
+                loop.call_soon_threadsafe(task.cancel)
+            thread.join()
+            loop.close()
+            # close streams fetched but not consumed (if the consumer exits early)
+            while not results.empty():
+                res = results.get_nowait()
+                if isinstance(res, tuple) and res[1] is not None:
+                    res[1].close()
+
+    async def _fetch_all(self, loop, items, results, slots):
+        slots.append(asyncio.Semaphore(self.concurrency))
+        host_slots = defaultdict(lambda: asyncio.Semaphore(self.per_host_concurrency))
+        with ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix='AsyncFetcher'
+        ) as executor:
+
+            async def fetch_one(item):
+                try:
+                    async with host_slots[self.host_of(item)]:
+                        stream = await loop.run_in_executor(executor, self.fetch, item)
+                except Exception as exception:
+                    # re-raised by the consumer
+                    results.put(exception)
+                else:
+                    results.put((item, stream))
+
+            pending = set()
+            try:
+                for item in items:
+                    await slots[0].acquire()
+                    future = loop.create_task(fetch_one(item))
+                    pending.add(future)
+                    future.add_done_callback(pending.discard)
+                if pending:
+                    await asyncio.gather(*pending)
+            except asyncio.CancelledError:
+                # consumer has stopped early
+                for future in pending:
+                    future.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                raise
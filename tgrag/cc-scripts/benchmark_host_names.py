@@ -0,0 +1,124 @@
+"""Benchmark normalization and validation of host names (vertices/s)
+as done by HostLinksToGraph (options --normalize_host_names and
+--validate_host_names): row-at-a-time Python UDF functions vs.
+Arrow-batched pandas UDF functions. The functions are called directly
+on batches of the size used by Spark (spark.sql.execution.arrow.
+maxRecordsPerBatch), without the overhead of a Spark job. Usage:
+
+    python benchmark_host_names.py [--hosts ../../data/dqr/domain_pc1.csv]
+"""
+
+import argparse
+import csv
+import random
+import time
+
+import pandas as pd
+from hostlinks_to_graph import HostLinksToGraph
+
+# prefixes of host names to derive subdomains from registered domains
+SUBDOMAINS = ['', 'www.', 'm.', 'en.', 'blog.', 'shop.', 'news.']
+
+# Unicode host name parts (IDNs)
+IDN_PARTS = ['bücher', 'пример', '例え', 'ελληνικά', 'café', 'straße']
+
+
+def load_hosts(path, column):
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        return [row[column].strip().lower() for row in reader if row[column].strip()]
+
+
+def make_host_list(domains, size, idn_fraction, seed):
+    """Reversed host names, a fraction of them with Unicode parts"""
+    rand = random.Random(seed)
+    hosts = set()
+    while len(hosts) < size:
+        subdomain = rand.choice(SUBDOMAINS)
+        if subdomain == 'www.' and rand.random() < 0.5:
+            # many distinct subdomains, e.g. of blog or hosting platforms
+            subdomain = 'user{}.'.format(rand.randint(0, 10**7))
+        host = subdomain + rand.choice(domains)
+        if rand.random() < idn_fraction:
+            host = rand.choice(IDN_PARTS) + str(rand.randint(0, 999)) + '.' + host
+        hosts.add(HostLinksToGraph.reverse_host(host))
+    hosts = list(hosts)
+    rand.shuffle(hosts)
+    return hosts
+
+
+def run_rows(hosts):
+    normalized = [HostLinksToGraph.reverse_host_normalize(h) for h in hosts]
+    return [HostLinksToGraph.reverse_host_is_valid(h) for h in normalized if h]
+
+
+def run_batches(hosts, batch_size):
+    valid = []
+    for i in range(0, len(hosts), batch_size):
+        batch = pd.Series(hosts[i : i + batch_size], dtype=object)
+        normalized = HostLinksToGraph.reverse_host_normalize_batch(batch).dropna()
+        valid.extend(HostLinksToGraph.reverse_host_is_valid_batch(normalized))
+    return valid
+
+
+def benchmark(name, func, hosts, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(
+        '{:<24} {:>10.3f} s {:>14,.0f} vertices/s'.format(name, best, len(hosts) / best)
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument(
+        '--hosts',
+        default='../../data/dqr/domain_pc1.csv',
+        help='CSV file with registered domains',
+    )
+    parser.add_argument('--column', default='domain', help='Column of domains')
+    parser.add_argument(
+        '--size', type=int, default=1000000, help='Number of host names'
+    )
+    parser.add_argument(
+        '--idn_fraction',
+        type=float,
+        default=0.01,
+        help='Fraction of host names with Unicode parts',
+    )
+    parser.add_argument(
+        '--batch_size',
+        type=int,
+        default=10000,
+        help='Arrow batch size (spark.sql.execution.arrow.maxRecordsPerBatch)',
+    )
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    domains = load_hosts(args.hosts, args.column)
+    hosts = make_host_list(domains, args.size, args.idn_fraction, args.seed)
+    print(
+        '{} host names ({} registered domains, {:.1%} IDNs)'.format(
+            len(hosts), len(domains), args.idn_fraction
+        )
+    )
+
+    rows = benchmark('Python UDF (rows)', lambda: run_rows(hosts), hosts, args.repeat)
+    batches = benchmark(
+        'pandas UDF (batches)',
+        lambda: run_batches(hosts, args.batch_size),
+        hosts,
+        args.repeat,
+    )
+    if rows != batches:
+        raise Exception('Results of row and batch functions differ')
+
+
+if __name__ == '__main__':
+    main()
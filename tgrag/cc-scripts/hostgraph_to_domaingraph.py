@@ -0,0 +1,199 @@
+import os
+import re
+
+from hostlinks_to_graph import HostLinksToGraph
+from pyspark.sql import functions as sqlf
+from pyspark.sql.types import StringType
+
+try:
+    import pandas as pd
+    import pyarrow as pa
+except ImportError:
+    # fall back to row-at-a-time Python UDF
+    pa = None
+
+
+class HostGraphToDomainGraph(HostLinksToGraph):
+    """Fold the vertices of a host-level webgraph (output of
+    HostLinksToGraph) into registered domains (or host names without
+    alias prefixes, e.g. `www.`, `m.`). Edges between domains are
+    aggregated (column `count`: number of host-level edges), edges within
+    a domain are dropped.
+    """
+
+    name = 'HostGraphToDomainGraph'
+
+    input_descr = (
+        'Name of host graph (tables <input>_vertices and <input>_edges,'
+        ' looked up in the catalog or in spark.sql.warehouse.dir)'
+    )
+
+    # prefixes of host names which are aliases of the host name without
+    # the prefix, e.g. www.example.com, www2.example.com, m.example.com
+    alias_prefix_pattern = re.compile(r'^(?:www\d*|m|mobile)$')
+
+    # public suffix extractors (see `get_suffix_extractor`)
+    _suffix_extractors = {}
+
+    def add_arguments(self, parser):
+        super(HostGraphToDomainGraph, self).add_arguments(parser)
+        parser.add_argument(
+            '--fold',
+            choices=['domain', 'alias'],
+            default='domain',
+            help='Fold host names into registered domains (public suffix'
+            ' list) or only strip alias prefixes (www., m.) from host'
+            ' names. Host names without registered domain (IP addresses,'
+            ' unknown suffix) are always only stripped of alias prefixes.',
+        )
+        parser.add_argument(
+            '--include_private_suffixes',
+            action='store_true',
+            help='Include private suffixes of the public suffix list,'
+            ' e.g. blogspot.com: subdomains of private suffixes'
+            ' (foo.blogspot.com) become registered domains',
+        )
+        parser.add_argument(
+            '--keep_intra_domain_edges',
+            action='store_true',
+            help='Keep edges between hosts of the same domain'
+            ' (as self-loops of the domain)',
+        )
+
+    @staticmethod
+    def get_suffix_extractor(include_private_suffixes):
+        """Get public suffix extractor using the snapshot of the public
+        suffix list bundled with tldextract (no download), created
+        lazily on every executor"""
+        extractors = HostGraphToDomainGraph._suffix_extractors
+        if include_private_suffixes not in extractors:
+            import tldextract
+
+            extractors[include_private_suffixes] = tldextract.TLDExtract(
+                suffix_list_urls=(),
+                cache_dir=None,
+                include_psl_private_domains=include_private_suffixes,
+            )
+        return extractors[include_private_suffixes]
+
+    @staticmethod
+    def reverse_host_strip_aliases(rev_host):
+        """Strip alias prefixes (www., m.) from a reversed host name,
+        at least two host name parts are kept"""
+        parts = rev_host.split('.')
+        while len(parts) > 2 and HostGraphToDomainGraph.alias_prefix_pattern.match(
+            parts[-1]
+        ):
+            parts.pop()
+        return '.'.join(parts)
+
+    @staticmethod
+    def reverse_host_to_domain(rev_host, fold='domain', include_private=False):
+        """Map a reversed host name to the reversed name of its registered
+        domain (fold `domain`) or to the host name without alias prefixes
+        (fold `alias`)"""
+        if rev_host is None:
+            return None
+        if fold == 'domain':
+            extract = HostGraphToDomainGraph.get_suffix_extractor(include_private)
+            result = extract(HostLinksToGraph.reverse_host(rev_host))
+            domain = result.top_domain_under_public_suffix
+            if domain:
+                return HostLinksToGraph.reverse_host(domain)
+        return HostGraphToDomainGraph.reverse_host_strip_aliases(rev_host)
+
+    def get_domain_udf(self):
+        """Get UDF to map host names to domains: Arrow-batched pandas UDF
+        if pyarrow is installed, otherwise a Python UDF"""
+        fold = self.args.fold
+        include_private = self.args.include_private_suffixes
+
+        def to_domain(rev_host):
+            return HostGraphToDomainGraph.reverse_host_to_domain(
+                rev_host, fold, include_private
+            )
+
+        if pa is not None:
+
+            def to_domain_batch(rev_hosts: 'pd.Series') -> 'pd.Series':
+                return rev_hosts.map(to_domain)
+
+            return sqlf.pandas_udf(to_domain_batch, StringType())
+        return sqlf.udf(to_domain, StringType())
+
+    def load_host_graph_table(self, session, name):
+        if session.catalog.tableExists(name):
+            return session.table(name)
+        # table saved by another Spark session (in-memory catalog)
+        warehouse_dir = session.conf.get('spark.sql.warehouse.dir')
+        return session.read.format(self.args.output_format).load(
+            os.path.join(warehouse_dir, name)
+        )
+
+    def run_job(self, session):
+        session.sql('DROP TABLE IF EXISTS {}_vertices'.format(self.args.output))
+        session.sql('DROP TABLE IF EXISTS {}_edges'.format(self.args.output))
+
+        hosts = self.load_host_graph_table(session, self.args.input + '_vertices')
+        edges = self.load_host_graph_table(session, self.args.input + '_edges')
+
+        to_domain = self.get_domain_udf()
+        hosts = hosts.select(hosts.id, to_domain(hosts.name).alias('domain'))
+        hosts = hosts.persist()
+
+        # domains with number of hosts folded into them,
+        # domain IDs are assigned in sort order of the domain names
+        num_partitions = self.get_id_partitions(session)
+        domains = hosts.groupBy(hosts.domain.alias('name')).agg(
+            sqlf.count('id').alias('num_hosts')
+        )
+        domains = domains.persist()
+        domain_ids = self.assign_dense_ids(session, domains, num_partitions)
+        num_hosts = hosts.count()
+        num_domains = domain_ids.count()
+        self.get_logger(session).info(
+            'Folded {} hosts into {} domains'.format(num_hosts, num_domains)
+        )
+
+        vertices = domain_ids.join(domains, 'name', 'inner')
+        vertices = vertices.select('name', 'id', 'num_hosts')
+        if self.args.vertex_partitions < num_partitions:
+            vertices = vertices.coalesce(self.args.vertex_partitions)
+        if self.args.save_as_text is not None:
+            vertices.select(
+                sqlf.concat_ws('\t', vertices.id, vertices.name)
+            ).write.text(
+                os.path.join(self.args.save_as_text, 'vertices'), compression='gzip'
+            )
+        self.save_table(vertices, self.args.output + '_vertices', ['name'], ['name'])
+
+        # map host IDs to domain IDs, the mapping takes the place of the
+        # vertex table <name, id> when edges are encoded
+        host_to_domain = hosts.join(
+            domain_ids, hosts.domain == domain_ids.name, 'inner'
+        ).select(hosts.id.alias('name'), domain_ids.id.alias('id'))
+        host_to_domain = host_to_domain.persist()
+        edges = self.encode_edges(session, edges.select('s', 't'), host_to_domain)
+
+        if not self.args.keep_intra_domain_edges:
+            edges = edges.filter(edges.s != edges.t)
+        edges = edges.groupBy('s', 't').agg(sqlf.count('*').alias('count'))
+        edges = edges.coalesce(self.args.num_output_partitions)
+        edges = edges.sortWithinPartitions('s', 't')
+
+        if self.args.save_as_text is not None:
+            edges = edges.persist()
+            edges.select(sqlf.concat_ws('\t', edges.s, edges.t)).write.text(
+                os.path.join(self.args.save_as_text, 'edges'), compression='gzip'
+            )
+        self.save_table(edges, self.args.output + '_edges', ['s'], ['s', 't'])
+
+        host_to_domain.unpersist()
+        domain_ids.unpersist()
+        domains.unpersist()
+        hosts.unpersist()
+
+
+if __name__ == '__main__':
+    job = HostGraphToDomainGraph()
+    job.run()
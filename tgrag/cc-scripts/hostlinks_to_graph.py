@@ -1,12 +1,18 @@
+import json
 import logging
 import os
+import re
+import shutil
 
 import idna
 from iana_tld import iana_tld_list
+from pyspark import TaskContext
 from pyspark.sql import SparkSession
 from pyspark.sql import functions as sqlf
 from pyspark.sql.types import (
+    BinaryType,
     BooleanType,
+    IntegerType,
     LongType,
     StringType,
     StructField,
@@ -15,6 +21,16 @@ from pyspark.sql.types import (
 from sparkcc import CCSparkJob
 from wat_extract_links import ExtractHostLinksJob
 
+try:
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    # fall back to row-at-a-time Python UDFs
+    # (binary output not available)
+    pa = None
+
 
 class HostLinksToGraph(CCSparkJob):
     """Construct host-level webgraph from table with link pairs
@@ -23,6 +39,36 @@ class HostLinksToGraph(CCSparkJob):
 
     name = 'LinksToGraph'
 
+    # ASCII host name (all parts match `host_part_pattern`),
+    # RE2 syntax as used by pyarrow.compute
+    ascii_host_pattern = (
+        r'^[a-z0-9](?:[a-z0-9_-]{0,61}[a-z0-9])?'
+        r'(?:\.[a-z0-9](?:[a-z0-9_-]{0,61}[a-z0-9])?)*$'
+    )
+
+    # adjacency lists (option --save_as_adjacency), successors
+    # are gap-encoded as unsigned LEB128 varints
+    adjacency_schema = StructType(
+        [
+            StructField('s', LongType(), False),
+            StructField('degree', IntegerType(), False),
+            StructField('successors', BinaryType(), False),
+        ]
+    )
+
+    # keys (host names) causing skewed joins
+    skew_report_schema = StructType(
+        [
+            StructField('column', StringType(), False),
+            StructField('name', StringType(), True),
+            StructField('sample_count', LongType(), False),
+            StructField('estimated_edges', LongType(), False),
+        ]
+    )
+
+    # IANA TLDs as Arrow array (see `reverse_host_is_valid_batch`)
+    _tld_value_set = None
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--save_as_text',
@@ -30,6 +76,37 @@ class HostLinksToGraph(CCSparkJob):
             default=None,
             help='Save webgraph also as text on path',
         )
+        parser.add_argument(
+            '--save_as_adjacency',
+            type=str,
+            default=None,
+            help='Save webgraph also as adjacency lists on path'
+            ' (Parquet files sorted by source vertex ID, one row per'
+            ' source with columns s, degree and successors, the'
+            ' sorted successor IDs gap-encoded as varints)',
+        )
+        parser.add_argument(
+            '--save_as_binary',
+            type=str,
+            default=None,
+            help='Save webgraph also as binary files on a local or shared'
+            ' file system path (must be writable by executors): edges as'
+            ' array of little-endian int32/int64 pairs (edges.bin,'
+            ' header edges.json), vertex names as string table'
+            ' (vertices.offsets.bin, vertices.names.bin, header'
+            ' vertices.json). Requires pyarrow.',
+        )
+        parser.add_argument(
+            '--save_stats',
+            type=str,
+            default=None,
+            help='Compute graph statistics (number of vertices, edges,'
+            ' self-loops, isolated vertices without edges, dangling vertices'
+            ' without outgoing edges (including isolated vertices), in- and'
+            ' out-degree histograms) while the graph is built. Statistics'
+            ' are saved as table <output>_stats and, with histograms, as'
+            ' JSON file on the given local or shared file system path.',
+        )
         parser.add_argument(
             '--normalize_host_names',
             action='store_true',
@@ -46,19 +123,54 @@ class HostLinksToGraph(CCSparkJob):
             '--vertex_partitions',
             type=int,
             default=1,
-            help='Number of partitions to enumerate and store'
-            ' vertices. The default (1 partition) is recommended'
-            ' only for smaller graphs. IDs are represented'
-            ' either as int (if 1 partition) or long (multiple'
-            ' partitions).',
+            help='Number of partitions to store vertices. Vertex IDs'
+            ' are assigned using at least spark.sql.shuffle.partitions'
+            ' partitions, independent of this option.',
         )
         parser.add_argument(
             '--vertex_ids',
             type=str,
-            help='Path to table providing hostname - vertex ID'
-            ' mappings. If the mapping exists IDs are read'
-            ' from it, otherwise the mapping is created and'
-            ' also saved as table.',
+            help='Path to global (append-only) table providing'
+            ' hostname - vertex ID mappings shared by multiple graphs,'
+            ' e.g., of different crawls. If the mapping exists IDs are'
+            ' read from it and new host names are appended with new'
+            ' IDs, otherwise the mapping is created. The vertices table'
+            ' of the graph holds only the vertices of this graph, so'
+            ' that vertex IDs are not dense. Only one job may update'
+            ' the mapping at a time.',
+        )
+        parser.add_argument(
+            '--broadcast_vertices_max',
+            type=int,
+            default=1000000,
+            help='Max. number of vertices to broadcast the vertex table'
+            ' when edges are encoded by vertex IDs. Both edge endpoints'
+            ' are then looked up without shuffling the edges. Larger'
+            ' vertex tables are joined with the edges by shuffle joins'
+            ' (0: always use shuffle joins). The broadcast table is'
+            ' collected on the driver, raise this only together with'
+            ' the driver memory.',
+        )
+        parser.add_argument(
+            '--skew_threshold',
+            type=int,
+            default=1000000,
+            help='Min. number of edges of a host name (estimated from a'
+            ' sample) to be handled as a skewed key by the shuffle joins'
+            ' which encode edges by vertex IDs. Edges of skewed keys are'
+            ' joined with a broadcast of their IDs (0: disable)',
+        )
+        parser.add_argument(
+            '--skew_sample_fraction',
+            type=float,
+            default=0.001,
+            help='Fraction of edges sampled to detect skewed keys',
+        )
+        parser.add_argument(
+            '--skew_max_keys',
+            type=int,
+            default=1000,
+            help='Max. number of skewed keys per edge endpoint',
         )
         parser.add_argument(
             '--add_input',
@@ -66,6 +178,27 @@ class HostLinksToGraph(CCSparkJob):
             action='append',
             help='Additional input table to be merged',
         )
+        parser.add_argument(
+            '--num_buckets',
+            type=int,
+            default=0,
+            help='Save vertices and edges as tables bucketed and sorted'
+            ' by name resp. source vertex ID. The input links are also'
+            ' kept in a bucketed table <output>_links: if it exists, only'
+            ' new links of <input> and --add_input are merged into it'
+            ' (without shuffling the existing links). With --vertex_ids'
+            ' the graph is updated incrementally as well: only the new'
+            ' vertices get IDs, only the new links are encoded and both'
+            ' are appended to the vertices and edges tables. Without'
+            ' --vertex_ids vertices and edges are rebuilt. Requires a'
+            ' persistent catalog, see --hive_support.',
+        )
+
+    def validate_arguments(self, args):
+        if args.save_as_binary is not None and pa is None:
+            self.get_logger().error('Option --save_as_binary requires pyarrow')
+            return False
+        return super(HostLinksToGraph, self).validate_arguments(args)
 
     @staticmethod
     def reverse_host(host):
@@ -73,6 +206,39 @@ class HostLinksToGraph(CCSparkJob):
         parts.reverse()
         return '.'.join(parts)
 
+    @staticmethod
+    def encode_varints(values):
+        """Encode non-negative integers as unsigned LEB128 varints
+        (same as tgrag.utils.adjacency.encode_varints, checked by
+        test/test_utils/test_adjacency.py)"""
+        buf = bytearray()
+        for value in values:
+            while value > 0x7F:
+                buf.append((value & 0x7F) | 0x80)
+                value >>= 7
+            buf.append(value)
+        return bytes(buf)
+
+    @staticmethod
+    def edges_to_adjacency(rows):
+        """Group edges <s, t> of a partition sorted by s and t into adjacency
+        lists <s, degree, successors>: the first successor ID followed by
+        the differences to the previous successor, encoded as varints"""
+        source = None
+        gaps = []
+        last = 0
+        for s, t in rows:
+            if s != source:
+                if gaps:
+                    yield source, len(gaps), HostLinksToGraph.encode_varints(gaps)
+                source = s
+                gaps = []
+                last = 0
+            gaps.append(t - last)
+            last = t
+        if gaps:
+            yield source, len(gaps), HostLinksToGraph.encode_varints(gaps)
+
     @staticmethod
     def reverse_host_is_valid(rev_host):
         if rev_host is None:
@@ -109,95 +275,765 @@ class HostLinksToGraph(CCSparkJob):
             return '.'.join(parts)
         return rev_host
 
-    def vertices_assign_ids(self, session, edges):
+    @staticmethod
+    def reverse_host_normalize_batch(rev_hosts: 'pd.Series') -> 'pd.Series':
+        """Vectorized `reverse_host_normalize` (pandas UDF): host names
+        matching the ASCII host name pattern are kept as they are, only
+        the remaining (usually few) host names are normalized by idna.
+        """
+        is_ascii = pc.match_substring_regex(
+            pa.Array.from_pandas(rev_hosts),
+            HostLinksToGraph.ascii_host_pattern,
+            ignore_case=True,
+        )
+        # null values are kept (and removed by dropna)
+        is_ascii = pc.fill_null(is_ascii, True).to_numpy(zero_copy_only=False)
+        if is_ascii.all():
+            return rev_hosts
+        normalized = rev_hosts.copy()
+        non_ascii = ~is_ascii
+        normalized[non_ascii] = [
+            HostLinksToGraph.reverse_host_normalize(rev_host)
+            for rev_host in rev_hosts[non_ascii]
+        ]
+        return normalized
+
+    @staticmethod
+    def reverse_host_is_valid_batch(rev_hosts: 'pd.Series') -> 'pd.Series':
+        """Vectorized `reverse_host_is_valid` (pandas UDF)"""
+        if HostLinksToGraph._tld_value_set is None:
+            HostLinksToGraph._tld_value_set = pa.array(sorted(iana_tld_list))
+        hosts = pa.Array.from_pandas(rev_hosts)
+        tld = pc.list_element(pc.split_pattern(hosts, '.', max_splits=1), 0)
+        is_valid = pc.and_(
+            pc.match_substring(hosts, '.'),
+            pc.is_in(tld, value_set=HostLinksToGraph._tld_value_set),
+        )
+        return pc.fill_null(is_valid, False).to_pandas()
+
+    def get_host_name_udfs(self):
+        """Get UDFs to normalize and validate host names: Arrow-batched
+        pandas UDFs if pyarrow is installed, otherwise Python UDFs"""
+        if pa is not None:
+            return (
+                sqlf.pandas_udf(
+                    HostLinksToGraph.reverse_host_normalize_batch, StringType()
+                ),
+                sqlf.pandas_udf(
+                    HostLinksToGraph.reverse_host_is_valid_batch, BooleanType()
+                ),
+            )
+        self.get_logger().warning(
+            'pyarrow not available, using row-at-a-time Python UDFs'
+            ' to normalize and validate host names'
+        )
+        return (
+            sqlf.udf(HostLinksToGraph.reverse_host_normalize, StringType()),
+            sqlf.udf(HostLinksToGraph.reverse_host_is_valid, BooleanType()),
+        )
+
+    def get_id_partitions(self, session):
+        """Number of partitions used to sort names and assign IDs"""
+        shuffle_partitions = session.conf.get('spark.sql.shuffle.partitions')
+        return max(self.args.vertex_partitions, int(shuffle_partitions))
+
+    def assign_dense_ids(self, session, names, num_partitions, offset=0):
+        """Assign dense IDs (offset, offset+1, ...) to names (column `name`)
+        in sort order of the names. The names must be distinct and their
+        computation deterministic (e.g., the DataFrame is persisted).
+
+        Names are range-partitioned and sorted within partitions, the
+        number of names per partition is counted, and the counts are
+        summed up on the driver into a per-partition ID offset, which is
+        added to the row index within the partition. The names with row
+        index are persisted, so that the counts and the IDs are computed
+        from the same partitioning. The returned IDs are persisted and
+        materialized.
+        """
+        names = names.select('name')
+        names = names.repartitionByRange(num_partitions, 'name').sortWithinPartitions(
+            'name'
+        )
+        # upper 31 bits: partition index, lower 33 bits: row index
+        names = names.withColumn('row_id', sqlf.monotonically_increasing_id())
+        names = names.persist()
+        partition = sqlf.shiftright(names.row_id, 33)
+
+        counts = names.groupBy(partition.alias('partition')).count().collect()
+        partition_offsets = []
+        for row in sorted(counts):
+            partition_offsets.append((row['partition'], offset))
+            offset += row['count']
+        partition_offsets = session.createDataFrame(
+            partition_offsets,
+            schema=StructType(
+                [
+                    StructField('partition', LongType(), False),
+                    StructField('offset', LongType(), False),
+                ]
+            ),
+        )
+
+        ids = names.join(
+            sqlf.broadcast(partition_offsets),
+            partition == partition_offsets.partition,
+            'inner',
+        )
+        ids = ids.select(
+            ids.name,
+            (ids.offset + ids.row_id.bitwiseAND((1 << 33) - 1)).alias('id'),
+        ).persist()
+        ids.count()
+        names.unpersist()
+        return ids
+
+    def get_vertex_names(self, edges):
+        """Get distinct (and optionally normalized and validated)
+        host names of edge endpoints (column `name`)"""
         source = edges.select(edges.s.alias('name'))
         target = edges.select(edges.t.alias('name'))
 
-        ids = source.union(target).distinct()
+        names = source.union(target).distinct()
+
+        normalize, is_valid = self.get_host_name_udfs()
 
         if self.args.normalize_host_names:
-            normalize = sqlf.udf(HostLinksToGraph.reverse_host_normalize, StringType())
-            ids = ids.withColumn('name', normalize(ids['name']))
-            ids = ids.dropna().distinct()
+            names = names.withColumn('name', normalize(names['name']))
+            names = names.dropna().distinct()
 
         if self.args.validate_host_names:
-            is_valid = sqlf.udf(HostLinksToGraph.reverse_host_is_valid, BooleanType())
-            ids = ids.filter(is_valid(ids['name']))
-
-        if self.args.vertex_partitions == 1:
-            ids = (
-                ids.coalesce(1)
-                .sort('name')
-                .withColumn('id', sqlf.monotonically_increasing_id())
+            names = names.filter(is_valid(names['name']))
+
+        return names
+
+    def save_vertex_ids(self, ids, mode):
+        """Save (mode `overwrite`) or extend (mode `append`) the global
+        vertex ID table, see --vertex_ids"""
+        ids.select('name', 'id').write.mode(mode).format(
+            self.args.output_format
+        ).option('compression', self.args.output_compression).save(self.args.vertex_ids)
+
+    def load_vertex_ids(self, session):
+        return session.read.format(self.args.output_format).load(self.args.vertex_ids)
+
+    def vertices_assign_ids_global(self, session, names, num_partitions):
+        """Look up IDs of names in the global vertex ID table, and assign
+        new IDs (following the max. ID) to names not contained in it.
+        The new names and IDs are appended to the global table.
+        """
+        global_ids = self.load_vertex_ids(session)
+        max_id = global_ids.agg(sqlf.max('id')).first()[0]
+        offset = 0 if max_id is None else max_id + 1
+
+        new_names = names.join(global_ids, names.name == global_ids.name, 'left_anti')
+        new_names = new_names.persist()
+        # IDs are materialized before the global table is modified
+        new_ids = self.assign_dense_ids(session, new_names, num_partitions, offset)
+        self.get_logger(session).info(
+            'Number of new vertices: {} (IDs starting at {})'.format(
+                new_ids.count(), offset
             )
+        )
+        self.save_vertex_ids(new_ids, 'append')
+        new_names.unpersist()
+
+        # (re)load the extended global table
+        global_ids = self.load_vertex_ids(session)
+        vertices = names.join(global_ids, 'name', 'inner').select('name', 'id')
+        vertices = vertices.repartitionByRange(num_partitions, 'name')
+        vertices = vertices.sortWithinPartitions('name').persist()
+        self.get_logger(session).info('Number of vertices: {}'.format(vertices.count()))
+        new_ids.unpersist()
+        return vertices
+
+    def vertices_assign_ids(self, session, edges):
+        # distinct names must be stable while IDs are assigned
+        names = self.get_vertex_names(edges).persist()
+        num_partitions = self.get_id_partitions(session)
+
+        if self.args.vertex_ids is not None and self.path_exists(
+            session, self.args.vertex_ids
+        ):
+            vertices = self.vertices_assign_ids_global(session, names, num_partitions)
         else:
-            id_rdd = (
-                ids.select(ids.name)
-                .rdd.map(lambda row: tuple(row)[0])
-                .sortBy(lambda x: x, True, self.args.vertex_partitions)
-                .zipWithIndex()
-            )
-            id_schema = StructType(
-                [
-                    StructField('name', StringType(), True),
-                    StructField('id', LongType(), True),
-                ]
+            vertices = self.assign_dense_ids(session, names, num_partitions)
+            self.get_logger(session).info(
+                'Number of vertices: {}'.format(vertices.count())
             )
-            ids = session.createDataFrame(id_rdd, schema=id_schema)
+            if self.args.vertex_ids is not None:
+                self.save_vertex_ids(vertices, 'overwrite')
+
+        ids = vertices
+        if self.args.vertex_partitions < num_partitions:
+            # coalesce only after the IDs have been computed in parallel
+            ids = ids.coalesce(self.args.vertex_partitions)
 
         if self.args.save_as_text is not None:
-            ids = ids.persist()
             ids.select(sqlf.concat_ws('\t', ids.id, ids.name)).write.text(
                 os.path.join(self.args.save_as_text, 'vertices'), compression='gzip'
             )
-        ids.write.format(self.args.output_format).option(
+        self.save_table(ids, self.args.output + '_vertices', ['name'], ['name'])
+        vertices.unpersist()
+        names.unpersist()
+
+        # read the saved table instead of recomputing the vertex IDs
+        return session.table(self.args.output + '_vertices')
+
+    def get_skewed_keys(self, session, edges):
+        """Detect host names occurring in many edges (heavy hitters) as
+        source or target from a sample of the edges. A report of the
+        skewed keys is saved as table <output>_skew_report.
+
+        Returns:
+            dict mapping the edge endpoint column (`s`, `t`) to the list
+            of skewed host names
+        """
+        fraction = self.args.skew_sample_fraction
+        min_sample_count = max(1, int(self.args.skew_threshold * fraction))
+        sample = edges.select('s', 't').sample(False, fraction, seed=42).persist()
+        report = []
+        for column in ('s', 't'):
+            counts = sample.groupBy(sample[column].alias('name')).count()
+            counts = counts.filter(counts['count'] >= min_sample_count)
+            counts = counts.orderBy(sqlf.desc('count')).limit(self.args.skew_max_keys)
+            for row in counts.collect():
+                report.append(
+                    (column, row['name'], row['count'], int(row['count'] / fraction))
+                )
+        sample.unpersist()
+
+        for column, name, _, estimated_edges in report[:20]:
+            self.get_logger(session).info(
+                'Skewed key in join on {}: {} (~{} edges)'.format(
+                    column, name, estimated_edges
+                )
+            )
+        if report:
+            # names as strings, also if the keys are (host) IDs
+            report_rows = [(c, str(name), n, e) for c, name, n, e in report]
+            session.createDataFrame(
+                report_rows, schema=self.skew_report_schema
+            ).coalesce(1).write.format(self.args.output_format).option(
+                'compression', self.args.output_compression
+            ).saveAsTable(self.args.output + '_skew_report')
+
+        return {
+            column: [name for c, name, _, _ in report if c == column]
+            for column in ('s', 't')
+        }
+
+    @staticmethod
+    def join_ids(edges, ids, column, skewed_keys=None):
+        """Replace the host names in column (`s` or `t`) by vertex IDs,
+        other columns of the edges (e.g., `time_id`) are kept.
+        Edges of skewed keys are joined with a broadcast of their IDs,
+        the remaining edges with the vertex table as is.
+        """
+        columns = edges.columns
+
+        def join(edges, ids):
+            edges = edges.join(ids, edges[column] == ids.name, 'inner')
+            return edges.select(
+                *[edges.id.alias(c) if c == column else edges[c] for c in columns]
+            )
+
+        if not skewed_keys:
+            return join(edges, ids)
+        is_skewed = edges[column].isin(skewed_keys)
+        skewed_ids = sqlf.broadcast(ids.filter(ids.name.isin(skewed_keys)))
+        return join(edges.filter(~is_skewed), ids).unionByName(
+            join(edges.filter(is_skewed), skewed_ids)
+        )
+
+    def encode_edges(self, session, edges, ids):
+        """Replace the host names of both edge endpoints by vertex IDs"""
+        num_vertices = ids.count()
+        skewed_keys = {}
+        if num_vertices <= self.args.broadcast_vertices_max:
+            self.get_logger(session).info(
+                'Broadcasting {} vertices to encode edges'.format(num_vertices)
+            )
+            # both joins reuse the broadcast vertex table,
+            # edges are not shuffled
+            ids = sqlf.broadcast(ids)
+        else:
+            self.get_logger(session).info(
+                'Joining {} vertices with edges'.format(num_vertices)
+            )
+            if self.args.skew_threshold > 0:
+                skewed_keys = self.get_skewed_keys(session, edges)
+        edges = HostLinksToGraph.join_ids(edges, ids, 's', skewed_keys.get('s'))
+        return HostLinksToGraph.join_ids(edges, ids, 't', skewed_keys.get('t'))
+
+    def save_adjacency(self, session, edges):
+        """Save edges as adjacency lists, edges must be range-partitioned
+        by source ID and sorted by source and target ID within partitions"""
+        adjacency = edges.select('s', 't').rdd.mapPartitions(
+            HostLinksToGraph.edges_to_adjacency
+        )
+        session.createDataFrame(adjacency, schema=self.adjacency_schema).write.parquet(
+            self.args.save_as_adjacency, compression=self.args.output_compression
+        )
+
+    @staticmethod
+    def binary_part_path(path, prefix, partition):
+        return os.path.join(path, '{}-{:05d}.part'.format(prefix, partition))
+
+    @staticmethod
+    def binary_part_writer(path, prefix, columns, dtype):
+        """Get a function (for `mapInArrow`) which writes a partition to
+        the file <path>/<prefix>-<partition>.part. Integer columns are
+        written as array of rows of fixed-width values (numpy dtype).
+        A string column (dtype None) is written as concatenated UTF-8
+        bytes, the string lengths (int32) are written to the file
+        <path>/<prefix>.lengths-<partition>.part. Yields the number of
+        rows of the partition.
+        """
+
+        def write_part(batches):
+            context = TaskContext.get()
+            partition = context.partitionId()
+            outputs = [prefix] if dtype is not None else [prefix, prefix + '.lengths']
+            tmp_suffix = '.{}.tmp'.format(context.attemptNumber())
+            files = [
+                open(
+                    HostLinksToGraph.binary_part_path(path, output, partition)
+                    + tmp_suffix,
+                    'wb',
+                )
+                for output in outputs
+            ]
+            rows = 0
+            for batch in batches:
+                rows += batch.num_rows
+                if dtype is not None:
+                    values = np.column_stack(
+                        [
+                            batch.column(column).to_numpy(zero_copy_only=False)
+                            for column in columns
+                        ]
+                    )
+                    files[0].write(values.astype(dtype).tobytes())
+                    continue
+                strings = pc.cast(batch.column(columns[0]), pa.large_binary())
+                offsets = np.frombuffer(strings.buffers()[1], dtype='<i8')
+                offsets = offsets[strings.offset : strings.offset + len(strings) + 1]
+                if len(strings) > 0 and strings.buffers()[2] is not None:
+                    files[0].write(
+                        memoryview(strings.buffers()[2])[offsets[0] : offsets[-1]]
+                    )
+                files[1].write(np.diff(offsets).astype('<i4').tobytes())
+            for f in files:
+                f.close()
+                os.replace(f.name, f.name[: -len(tmp_suffix)])
+            yield pa.RecordBatch.from_pydict({'partition': [partition], 'rows': [rows]})
+
+        return write_part
+
+    def write_binary(self, df, path, prefix, columns, dtype):
+        """Write columns of a DataFrame as binary file(s) <path>/<prefix>.bin
+        (and <path>/<prefix>.lengths.bin for strings, see
+        `binary_part_writer`). Parts are written by the executors and
+        concatenated by the driver in the order of partitions.
+
+        Returns:
+            the number of rows written
+        """
+        part_schema = StructType(
+            [
+                StructField('partition', LongType(), False),
+                StructField('rows', LongType(), False),
+            ]
+        )
+        parts = df.mapInArrow(
+            HostLinksToGraph.binary_part_writer(path, prefix, columns, dtype),
+            part_schema,
+        ).collect()
+        partitions = sorted(part['partition'] for part in parts)
+        outputs = [prefix] if dtype is not None else [prefix, prefix + '.lengths']
+        for output in outputs:
+            with open(os.path.join(path, output + '.bin'), 'wb') as out:
+                for partition in partitions:
+                    part_path = HostLinksToGraph.binary_part_path(
+                        path, output, partition
+                    )
+                    with open(part_path, 'rb') as f:
+                        shutil.copyfileobj(f, out, 1 << 24)
+                    os.remove(part_path)
+        return sum(part['rows'] for part in parts)
+
+    def save_binary(self, session, edges, ids):
+        """Save edges and vertices as binary files, see --save_as_binary"""
+        path = re.sub(r'^file:(//)?', '', self.args.save_as_binary)
+        os.makedirs(path, exist_ok=True)
+
+        # vertex names are stored in the order of IDs (dense, starting at 0)
+        vertices = ids.repartitionByRange(self.args.vertex_partitions, 'id')
+        vertices = vertices.sortWithinPartitions('id')
+        id_range = ids.agg(sqlf.min('id'), sqlf.max('id'), sqlf.count('id')).first()
+        num_vertices = id_range[2]
+        if num_vertices > 0 and (id_range[0] != 0 or id_range[1] != num_vertices - 1):
+            raise Exception(
+                'Vertex IDs are not dense: {} vertices, IDs {} - {}'.format(
+                    num_vertices, id_range[0], id_range[1]
+                )
+            )
+        self.write_binary(vertices, path, 'vertices.names', ['name'], None)
+        # string lengths to offsets
+        lengths_path = os.path.join(path, 'vertices.names.lengths.bin')
+        lengths = np.fromfile(lengths_path, dtype='<i4')
+        offsets = np.zeros(len(lengths) + 1, dtype='<i8')
+        np.cumsum(lengths, out=offsets[1:])
+        offsets.tofile(os.path.join(path, 'vertices.offsets.bin'))
+        os.remove(lengths_path)
+        with open(os.path.join(path, 'vertices.json'), 'w') as f:
+            json.dump(
+                {
+                    'num_vertices': int(num_vertices),
+                    'offsets': 'vertices.offsets.bin',
+                    'offsets_dtype': '<i8',
+                    'names': 'vertices.names.bin',
+                    'encoding': 'utf-8',
+                },
+                f,
+                indent=2,
+            )
+
+        dtype = '<i4' if num_vertices < 2**31 else '<i8'
+        num_edges = self.write_binary(edges, path, 'edges', ['s', 't'], dtype)
+        with open(os.path.join(path, 'edges.json'), 'w') as f:
+            json.dump(
+                {
+                    'num_edges': int(num_edges),
+                    'num_vertices': int(num_vertices),
+                    'edges': 'edges.bin',
+                    'dtype': dtype,
+                    'shape': [int(num_edges), 2],
+                    'columns': ['s', 't'],
+                },
+                f,
+                indent=2,
+            )
+        self.get_logger(session).info(
+            'Saved binary graph ({} vertices, {} edges) in {}'.format(
+                num_vertices, num_edges, path
+            )
+        )
+
+    def compute_stats(self, session, edges, num_vertices, num_self_loops):
+        """Compute statistics of the (persisted) edges <s, t> of a graph
+        with num_vertices vertices, self-loops removed. Isolated vertices
+        have no edges, dangling vertices no outgoing edges (isolated
+        vertices included), self-loops not counted.
+
+        Returns:
+            dict with the statistics, the degree histograms as lists
+            of [degree, number of vertices]
+        """
+        out_degrees = edges.groupBy(edges.s.alias('id')).agg(
+            sqlf.count('*').alias('out_degree')
+        )
+        in_degrees = edges.groupBy(edges.t.alias('id')).agg(
+            sqlf.count('*').alias('in_degree')
+        )
+        degrees = out_degrees.join(in_degrees, 'id', 'full_outer').fillna(0)
+        degrees = degrees.persist()
+
+        totals = degrees.agg(
+            sqlf.count('*').alias('linked_vertices'),
+            sqlf.coalesce(sqlf.sum('out_degree'), sqlf.lit(0)).alias('edges'),
+            sqlf.sum((degrees.out_degree == 0).cast('long')).alias('dangling'),
+            sqlf.max('out_degree').alias('max_out_degree'),
+            sqlf.max('in_degree').alias('max_in_degree'),
+        ).first()
+        # vertices not linked at all count as degree 0
+        num_isolated = num_vertices - totals['linked_vertices']
+        histograms = {}
+        for column in ('out_degree', 'in_degree'):
+            counts = dict(degrees.groupBy(column).count().collect())
+            counts[0] = counts.get(0, 0) + num_isolated
+            histograms[column] = [
+                [degree, counts[degree]] for degree in sorted(counts) if counts[degree]
+            ]
+        degrees.unpersist()
+
+        return {
+            'vertices': int(num_vertices),
+            'edges': int(totals['edges']),
+            'self_loops': int(num_self_loops),
+            'isolated_vertices': int(num_isolated),
+            'dangling_vertices': int(totals['dangling'] or 0) + int(num_isolated),
+            'max_out_degree': int(totals['max_out_degree'] or 0),
+            'max_in_degree': int(totals['max_in_degree'] or 0),
+            'out_degree_histogram': histograms['out_degree'],
+            'in_degree_histogram': histograms['in_degree'],
+        }
+
+    def save_stats(self, session, stats):
+        """Save graph statistics as one-row table <output>_stats (without
+        histograms) and as JSON file, see --save_stats"""
+        row = {k: v for k, v in stats.items() if not k.endswith('_histogram')}
+        session.createDataFrame(
+            [tuple(row.values())],
+            schema=StructType(
+                [StructField(name, LongType(), False) for name in row.keys()]
+            ),
+        ).write.format(self.args.output_format).option(
             'compression', self.args.output_compression
-        ).saveAsTable(self.args.output + '_vertices')
+        ).saveAsTable(self.args.output + '_stats')
 
-        return ids
+        path = re.sub(r'^file:(//)?', '', self.args.save_stats)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(stats, f, indent=2)
+        self.get_logger(session).info(
+            'Graph statistics: {}'.format(json.dumps(row, sort_keys=True))
+        )
+
+    def save_table(self, df, name, bucket_columns, sort_columns, mode='errorifexists'):
+        """Save DataFrame as table, bucketed and sorted if --num_buckets
+        is given"""
+        if self.args.num_buckets > 0:
+            # one file per bucket
+            df = df.repartition(self.args.num_buckets, *bucket_columns)
+        writer = (
+            df.write.mode(mode)
+            .format(self.args.output_format)
+            .option('compression', self.args.output_compression)
+        )
+        if self.args.num_buckets > 0:
+            writer = writer.bucketBy(self.args.num_buckets, *bucket_columns)
+            writer = writer.sortBy(*sort_columns)
+        writer.saveAsTable(name)
+
+    def check_catalog(self, session):
+        if session.conf.get('spark.sql.catalogImplementation') == 'in-memory':
+            raise Exception(
+                'Option --num_buckets requires a persistent catalog'
+                ' (e.g. --hive_support) to keep the bucketed tables'
+            )
+        # anti-join on <s, t> and buckets on s only:
+        # do not shuffle the existing links
+        session.conf.set('spark.sql.requireAllClusterKeysForCoPartition', 'false')
+
+    def prepare_links(self, session, edges):
+        """Input links (and --add_input), deduplicated within the buckets
+        of the links table"""
+        for add_input in self.args.add_input or []:
+            edges = edges.union(session.read.load(add_input))
+        edges = edges.select('s', 't')
+        return edges.repartition(self.args.num_buckets, 's').dropDuplicates()
+
+    def get_new_links(self, session, edges):
+        """Get (persisted) links not contained in the links table"""
+        links = session.table(self.args.output + '_links')
+        new_links = edges.join(links, ['s', 't'], 'left_anti').persist()
+        self.get_logger(session).info(
+            'Number of new links: {}'.format(new_links.count())
+        )
+        return new_links
+
+    def append_links(self, new_links):
+        # new links are added as additional files to the buckets
+        new_links.write.mode('append').format(self.args.output_format).option(
+            'compression', self.args.output_compression
+        ).bucketBy(self.args.num_buckets, 's').sortBy('s', 't').saveAsTable(
+            self.args.output + '_links'
+        )
+
+    def merge_links(self, session, edges):
+        """Merge input links (and --add_input) into the bucketed links
+        table <output>_links and return the merged links"""
+        self.check_catalog(session)
+        links_table = self.args.output + '_links'
+        edges = self.prepare_links(session, edges)
+
+        if not session.catalog.tableExists(links_table):
+            self.get_logger(session).info('Creating links table ' + links_table)
+            self.save_table(edges, links_table, ['s'], ['s', 't'])
+            return session.table(links_table)
+
+        new_links = self.get_new_links(session, edges)
+        self.append_links(new_links)
+        new_links.unpersist()
+        return session.table(links_table)
+
+    def is_incremental(self, session):
+        """Whether new links are added to the existing graph tables:
+        requires bucketed tables (--num_buckets) and the global vertex
+        ID table (--vertex_ids), so that the IDs of existing vertices
+        stay valid"""
+        if self.args.num_buckets <= 0 or self.args.vertex_ids is None:
+            return False
+        if not self.path_exists(session, self.args.vertex_ids):
+            return False
+        return all(
+            session.catalog.tableExists('{}_{}'.format(self.args.output, table))
+            for table in ('links', 'vertices', 'edges')
+        )
+
+    def drop_graph_tables(
+        self, session, tables=('vertices', 'edges', 'stats', 'skew_report')
+    ):
+        for table in tables:
+            session.sql('DROP TABLE IF EXISTS {}_{}'.format(self.args.output, table))
+
+    def prepare_graph_tables(self, session):
+        """Drop the tables of a previous graph, except the vertices and
+        edges tables if they are updated incrementally.
+
+        Returns:
+            whether the graph is updated incrementally
+        """
+        if self.args.num_buckets > 0:
+            self.check_catalog(session)
+        if self.is_incremental(session):
+            self.drop_graph_tables(session, ('stats', 'skew_report'))
+            return True
+        self.drop_graph_tables(session)
+        return False
+
+    def add_links(self, session, edges):
+        """Add the new links of the input links (and --add_input) to the
+        existing graph, see `update_graph`"""
+        new_links = self.get_new_links(session, self.prepare_links(session, edges))
+        self.update_graph(session, new_links)
+        # links are appended last: an interrupted update is repeated
+        self.append_links(new_links)
+        new_links.unpersist()
 
     def run_job(self, session):
+        incremental = self.prepare_graph_tables(session)
+
         # read edges  s -> t  (host names)
-        session.sql("DROP TABLE IF EXISTS host_graph_output_vertices")
-        session.sql("DROP TABLE IF EXISTS host_graph_output_edges")
         edges = session.read.load(self.args.input)
 
-        if self.args.add_input:
+        if incremental:
+            self.add_links(session, edges)
+            return
+
+        if self.args.num_buckets > 0:
+            edges = self.merge_links(session, edges)
+        elif self.args.add_input:
             # merge multiple input graphs
             for add_input in self.args.add_input:
                 add_edges = session.read.load(add_input)
                 edges = edges.union(add_edges)
 
-            # remove duplicates and sort
+            # remove duplicates and sort (duplicates are detected
+            # by hash of both s and t, hub hosts do not cause skew)
             edges = edges.dropDuplicates().sortWithinPartitions('s', 't')
 
-        if self.args.vertex_ids is not None:
-            ids = session.read.load(self.args.vertex_ids)
+        self.build_graph(session, edges)
+
+    def has_outputs(self):
+        return (
+            self.args.save_as_text is not None
+            or self.args.save_as_adjacency is not None
+            or self.args.save_as_binary is not None
+            or self.args.save_stats is not None
+        )
+
+    def partition_output_edges(self, edges):
+        if self.args.save_as_adjacency is not None:
+            # all successors of a vertex in one partition
+            edges = edges.repartitionByRange(self.args.num_output_partitions, 's')
         else:
-            ids = self.vertices_assign_ids(session, edges)
+            edges = edges.coalesce(self.args.num_output_partitions)
+        return edges.sortWithinPartitions('s', 't')
 
-        edges = edges.join(ids, edges.s == ids.name, 'inner')
-        edges = edges.select(edges.id.alias('s'), 't')
-        edges = edges.join(ids, edges.t == ids.name, 'inner')
-        edges = edges.select('s', edges.id.alias('t'))
-        edges = edges.coalesce(self.args.num_output_partitions).sortWithinPartitions(
-            's', 't'
+    def save_outputs(self, session, edges, ids, num_self_loops):
+        """Save the optional outputs of the graph from the (persisted)
+        edges, self-loops removed, and the vertex IDs"""
+        if self.args.save_stats is not None:
+            stats = self.compute_stats(session, edges, ids.count(), num_self_loops)
+            self.save_stats(session, stats)
+        if self.args.save_as_text is not None:
+            edges.select(sqlf.concat_ws('\t', edges.s, edges.t)).write.text(
+                os.path.join(self.args.save_as_text, 'edges'), compression='gzip'
+            )
+        if self.args.save_as_adjacency is not None:
+            self.save_adjacency(session, edges)
+        if self.args.save_as_binary is not None:
+            if self.args.vertex_ids is not None:
+                # names of all vertices in the global ID space
+                self.save_binary(session, edges, self.load_vertex_ids(session))
+            else:
+                self.save_binary(session, edges, ids)
+
+    def update_graph(self, session, new_links):
+        """Add new links <s, t> (host names) to the existing graph: IDs
+        are assigned only to new vertices (in the global vertex ID
+        table), only the new links are encoded, and both are appended
+        to the bucketed vertices and edges tables. The optional outputs
+        are written from the updated tables."""
+        vertices_table = self.args.output + '_vertices'
+        edges_table = self.args.output + '_edges'
+
+        names = self.get_vertex_names(new_links)
+        names = names.join(session.table(vertices_table), 'name', 'left_anti').persist()
+        new_vertices = self.vertices_assign_ids_global(
+            session, names, self.get_id_partitions(session)
         )
+        self.save_table(new_vertices, vertices_table, ['name'], ['name'], 'append')
+        new_vertices.unpersist()
+        names.unpersist()
+
+        ids = session.table(vertices_table)
+        new_edges = self.encode_edges(session, new_links, ids)
+        new_edges = new_edges.filter(new_edges.s != new_edges.t)
+        # edges of an interrupted update are not appended twice
+        new_edges = new_edges.join(session.table(edges_table), ['s', 't'], 'left_anti')
+        self.save_table(new_edges, edges_table, ['s'], ['s', 't'], 'append')
+
+        if self.args.save_as_text is not None:
+            # full vertex table in the order of IDs
+            vertices = ids.repartitionByRange(self.args.vertex_partitions, 'id')
+            vertices = vertices.sortWithinPartitions('id')
+            vertices.select(
+                sqlf.concat_ws('\t', vertices.id, vertices.name)
+            ).write.text(
+                os.path.join(self.args.save_as_text, 'vertices'), compression='gzip'
+            )
+        if self.has_outputs():
+            num_self_loops = None
+            if self.args.save_stats is not None:
+                # self-loops of the links between vertices of the graph
+                links = session.table(self.args.output + '_links').unionByName(
+                    new_links
+                )
+                loops = links.filter(links.s == links.t)
+                num_self_loops = loops.join(
+                    ids, loops.s == ids.name, 'left_semi'
+                ).count()
+            edges = self.partition_output_edges(session.table(edges_table)).persist()
+            self.save_outputs(session, edges, ids, num_self_loops)
+            edges.unpersist()
+
+    def build_graph(self, session, edges):
+        """Build the graph from distinct edges <s, t> (host names):
+        assign vertex IDs, encode the edges by IDs and save vertices
+        and edges (and the optional outputs)"""
+        ids = self.vertices_assign_ids(session, edges)
+
+        edges = self.encode_edges(session, edges, ids)
+        edges = self.partition_output_edges(edges)
+
+        if self.has_outputs():
+            edges = edges.persist()
+        num_self_loops = None
+        if self.args.save_stats is not None:
+            # counted before removal, on the persisted edges
+            num_self_loops = edges.filter(edges.s == edges.t).count()
 
         # remove self-loops
         # (must be done after assignment of IDs so that isolated
         # nodes/vertices are contained in map <name, id>
         edges = edges.filter(edges.s != edges.t)
 
-        if self.args.save_as_text is not None:
-            edges = edges.persist()
-            edges.select(sqlf.concat_ws('\t', edges.s, edges.t)).write.text(
-                os.path.join(self.args.save_as_text, 'edges'), compression='gzip'
-            )
-            # TODO: save as adjacency list
-        edges.write.format(self.args.output_format).option(
-            'compression', self.args.output_compression
-        ).saveAsTable(self.args.output + '_edges')
+        self.save_outputs(session, edges, ids, num_self_loops)
+        self.save_table(edges, self.args.output + '_edges', ['s'], ['s', 't'])
 
 
 if __name__ == '__main__':
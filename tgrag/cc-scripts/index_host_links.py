@@ -0,0 +1,274 @@
+from html.parser import HTMLParser
+
+from pyspark.sql import functions as sqlf
+from sparkcc import CCIndexWarcSparkJob
+from wat_extract_links import ExtractHostLinksJob
+
+
+class HTMLLinkParser(HTMLParser):
+    """Collect links from HTML into the structure of the WAT
+    `HTML-Metadata` object, so that `ExtractHostLinksJob.get_links`
+    can be applied to HTML payloads of WARC records.
+    """
+
+    # elements and attributes holding links, cf. WAT `Links`
+    link_attributes = {
+        'a': 'href',
+        'area': 'href',
+        'audio': 'src',
+        'embed': 'src',
+        'form': 'action',
+        'iframe': 'src',
+        'img': 'src',
+        'source': 'src',
+        'video': 'src',
+    }
+
+    def __init__(self):
+        super(HTMLLinkParser, self).__init__(convert_charrefs=True)
+        self.head = {'Link': [], 'Metas': [], 'Scripts': []}
+        self.links = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value for name, value in attrs if value is not None}
+        if tag == 'base':
+            if 'href' in attrs and 'Base' not in self.head:
+                self.head['Base'] = attrs['href']
+        elif tag == 'link':
+            if 'href' in attrs:
+                self.head['Link'].append({'url': attrs['href']})
+        elif tag == 'meta':
+            if 'content' in attrs:
+                self.head['Metas'].append(attrs)
+        elif tag == 'script':
+            if 'src' in attrs:
+                self.head['Scripts'].append({'url': attrs['src']})
+        elif tag in HTMLLinkParser.link_attributes:
+            attr = HTMLLinkParser.link_attributes[tag]
+            if attr in attrs:
+                self.links.append(
+                    {'path': '{}@/{}'.format(tag.upper(), attr), 'url': attrs[attr]}
+                )
+
+    def get_html_metadata(self):
+        return {'Head': self.head, 'Links': self.links}
+
+    @staticmethod
+    def parse(html):
+        parser = HTMLLinkParser()
+        try:
+            parser.feed(html)
+            parser.close()
+        except Exception:
+            pass  # keep links found so far
+        return parser.get_html_metadata()
+
+
+class ExtractIndexedHostLinksJob(CCIndexWarcSparkJob, ExtractHostLinksJob):
+    """Extract host-level links for a list of target hosts or domains.
+    WARC records of the targets are selected from the columnar URL index
+    and fetched by range requests, so that the cost is proportional to
+    the number of target pages and not to the size of the crawl.
+    The output has the same schema as that of ExtractHostLinksJob
+    (pairs <source_host, target_host> of reversed host names).
+    """
+
+    name = 'ExtrIndexedHostLinks'
+
+    # columns of the URL index used to match the host list
+    host_match_columns = {
+        'host': 'url_host_name',
+        'registered_domain': 'url_host_registered_domain',
+    }
+
+    html_types = {'text/html', 'application/xhtml+xml'}
+
+    # max. size of HTML payload parsed for links
+    max_html_size = 2097152
+
+    def add_arguments(self, parser):
+        super(ExtractIndexedHostLinksJob, self).add_arguments(parser)
+        parser.add_argument(
+            '--host_list',
+            type=str,
+            default=None,
+            help='File with target host names or registered domains'
+            ' (not reversed, one per line, or a CSV file if'
+            ' --host_list_column is given). Together with'
+            ' `--input_table_format` the URL index table read from'
+            ' <input> is restricted to WARC records of these hosts.'
+            ' Together with `--query` the list is available as view'
+            ' `host_list` (column `host`).',
+        )
+        parser.add_argument(
+            '--host_list_column',
+            type=str,
+            default=None,
+            help='Column holding the host names if --host_list'
+            ' is a CSV file with header, e.g. `domain`',
+        )
+        parser.add_argument(
+            '--host_match',
+            choices=sorted(ExtractIndexedHostLinksJob.host_match_columns),
+            default='registered_domain',
+            help='Match the host list against host names or'
+            ' registered domains of the URL index',
+        )
+        parser.add_argument(
+            '--crawl',
+            type=str,
+            action='append',
+            default=None,
+            help='Select records of crawl(s), e.g. CC-MAIN-2025-21'
+            ' (default: all crawls in the URL index table)',
+        )
+        parser.add_argument(
+            '--subset',
+            type=str,
+            action='append',
+            default=None,
+            help='Select records of index subset(s) (default: `warc`'
+            ' and `crawldiagnostics` for successful captures and'
+            ' redirects)',
+        )
+
+    def load_host_list(self, session):
+        if self.args.host_list_column is not None:
+            hosts = session.read.csv(self.args.host_list, header=True).select(
+                sqlf.col(self.args.host_list_column).alias('host')
+            )
+        else:
+            hosts = session.read.text(self.args.host_list).select(
+                sqlf.col('value').alias('host')
+            )
+        hosts = hosts.select(sqlf.lower(sqlf.trim(hosts.host)).alias('host'))
+        if self.args.host_match == 'registered_domain':
+            hosts = hosts.select(
+                sqlf.regexp_replace(hosts.host, r'^www\.', '').alias('host')
+            )
+        return hosts.filter(hosts.host != '').distinct()
+
+    def load_dataframe(self, session, partitions=-1):
+        if self.args.host_list is None or self.args.input_table_format is None:
+            if self.args.host_list is not None:
+                self.load_host_list(session).createOrReplaceTempView('host_list')
+            return super(ExtractIndexedHostLinksJob, self).load_dataframe(
+                session, partitions
+            )
+
+        hosts = self.load_host_list(session)
+        self.get_logger(session).info(
+            'Number of target hosts: {}'.format(hosts.count())
+        )
+
+        reader = session.read.format(self.args.input_table_format)
+        reader = reader.options(**self.get_input_table_options())
+        index = reader.load(self.args.input)
+
+        # filter on partition columns first (partition pruning)
+        if self.args.crawl:
+            index = index.filter(index.crawl.isin(self.args.crawl))
+        subsets = self.args.subset or ['warc', 'crawldiagnostics']
+        index = index.filter(index.subset.isin(subsets))
+        index = index.filter(
+            (
+                (index.fetch_status == 200)
+                & index.content_mime_detected.isin(list(self.html_types))
+            )
+            | index.fetch_status.between(300, 399)
+        )
+
+        host_column = ExtractIndexedHostLinksJob.host_match_columns[
+            self.args.host_match
+        ]
+        sqldf = index.join(
+            sqlf.broadcast(hosts), index[host_column] == hosts.host, 'left_semi'
+        )
+
+        if partitions > 0:
+            self.get_logger(session).info(
+                'Repartitioning data to {} partitions'.format(partitions)
+            )
+            sqldf = sqldf.repartition(partitions)
+
+        sqldf.persist()
+        self.get_logger(session).info(
+            'Number of WARC records of target hosts: {}'.format(sqldf.count())
+        )
+
+        return sqldf
+
+    def is_html_response(self, record, content_type):
+        payload_type = self.get_warc_header(record, 'WARC-Identified-Payload-Type')
+        if payload_type is not None:
+            return payload_type in self.html_types
+        if content_type is None:
+            return False
+        return content_type.split(';')[0].strip() in self.html_types
+
+    def process_html(self, record, stream, http_status_line):
+        """Parse HTML payload of WARC response record into a WAT-like
+        metadata object and extract links by `get_links`
+        """
+        headers = {}
+        content_type = None
+        line = stream.readline()
+        while line and line.strip():
+            name, _, value = line.partition(b':')
+            name = name.strip().lower()
+            if name == b'content-type':
+                content_type = value.strip().lower().decode('ascii', 'ignore')
+            elif name in (b'link', b'content-location'):
+                headers.setdefault(name.decode('ascii'), []).append(
+                    value.strip().decode('utf-8', 'replace')
+                )
+            line = stream.readline()
+
+        if not self.is_html_response(record, content_type):
+            self.counters['records_non_html'] += 1
+            return
+
+        charset = (
+            self.get_warc_header(record, 'WARC-Identified-Content-Charset') or 'utf-8'
+        )
+        payload = stream.read(self.max_html_size)
+        try:
+            html = payload.decode(charset, 'replace')
+        except LookupError:
+            html = payload.decode('utf-8', 'replace')
+
+        url = self.get_warc_header(record, 'WARC-Target-URI')
+        wat_record = {
+            'Envelope': {
+                'Payload-Metadata': {
+                    'HTTP-Response-Metadata': {
+                        'Headers': headers,
+                        'HTML-Metadata': HTMLLinkParser.parse(html),
+                    }
+                }
+            }
+        }
+        for link in self.get_links(url, wat_record):
+            yield link
+
+    def run_job(self, session):
+        sqldf = self.load_dataframe(session, self.args.num_input_partitions)
+
+        warc_recs = self.get_warc_records(sqldf)
+
+        output = warc_recs.mapPartitions(self.fetch_process_warc_records)
+
+        session.createDataFrame(output, schema=self.output_schema).dropDuplicates(
+            ['s', 't']
+        ).coalesce(self.args.num_output_partitions).sortWithinPartitions(
+            's', 't'
+        ).write.format(self.args.output_format).option(
+            'compression', self.args.output_compression
+        ).options(**self.get_output_options()).saveAsTable(self.args.output)
+
+        self.log_accumulators(session)
+
+
+if __name__ == '__main__':
+    job = ExtractIndexedHostLinksJob()
+    job.run()
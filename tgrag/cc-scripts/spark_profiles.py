@@ -0,0 +1,165 @@
+"""Persist and compare Python profiles of Spark jobs (option --spark-profiler).
+
+Profiles are saved per stage (RDD or UDF) in a profile directory as pstats
+files and in the collapsed-stack format read by flamegraph tools
+(e.g. flamegraph.pl or speedscope). Usage to compare two runs:
+
+    python spark_profiles.py <profile_dir_a> <profile_dir_b> [--top N]
+"""
+
+import argparse
+import glob
+import os
+import pstats
+from collections import defaultdict
+
+
+def func_label(func):
+    """Readable label of a pstats function key (file, line, name)"""
+    filename, line, name = func
+    if filename == '~':
+        # built-in functions, e.g. <method 'loads' of 'orjson' objects>
+        return name
+    return '{} ({}:{})'.format(name, os.path.basename(filename), line)
+
+
+def collapse_stacks(stats, max_depth=64, min_micros=1, max_stacks=100000):
+    """Approximate call stacks from a pstats object.
+
+    pstats only record caller-callee pairs, not full stacks. The time of
+    a function is distributed over the stacks leading to it in proportion
+    to the time spent in calls from each caller. The number of stacks
+    grows exponentially with the depth of the call graph, the walk stops
+    at max_depth and after max_stacks stacks; a stack cut off there is
+    attributed the cumulative time of its last function.
+
+    Returns:
+        dict mapping stacks (labels joined by `;`) to self time
+        in microseconds
+    """
+    func_stats = stats.stats
+    callees = defaultdict(list)
+    for func, (_cc, _nc, _tt, _ct, callers) in func_stats.items():
+        for caller, caller_stats in callers.items():
+            # cumulative time of func when called from caller
+            callees[caller].append((func, caller_stats[3]))
+
+    stacks = defaultdict(int)
+    num_walked = 0
+
+    def walk(func, stack, fraction, visited):
+        nonlocal num_walked
+        num_walked += 1
+        _cc, _nc, tt, ct, _callers = func_stats[func]
+        stack = stack + (func_label(func).replace(';', ':'),)
+        truncated = len(stack) >= max_depth or num_walked >= max_stacks
+        micros = int(round((ct if truncated else tt) * fraction * 1e6))
+        if micros >= min_micros:
+            stacks[';'.join(stack)] += micros
+        if truncated:
+            return
+        for callee, ct_from_func in callees[func]:
+            callee_ct = func_stats[callee][3]
+            if callee_ct <= 0 or callee in visited:
+                continue
+            share = fraction * ct_from_func / callee_ct
+            if share * callee_ct * 1e6 < min_micros:
+                continue
+            visited.add(callee)
+            walk(callee, stack, share, visited)
+            visited.discard(callee)
+
+    for func, (_cc, _nc, _tt, _ct, callers) in func_stats.items():
+        if not callers:
+            walk(func, (), 1.0, {func})
+
+    return stacks
+
+
+def write_collapsed_stacks(pstats_path, output_path):
+    stacks = collapse_stacks(pstats.Stats(pstats_path))
+    with open(output_path, 'w') as f:
+        for stack in sorted(stacks):
+            f.write('{} {}\n'.format(stack, stacks[stack]))
+
+
+def save_collapsed_stacks(profile_dir):
+    """Write a collapsed-stack file next to every pstats file in profile_dir"""
+    for pstats_path in glob.glob(os.path.join(profile_dir, '*.pstats')):
+        output_path = pstats_path[: -len('.pstats')] + '.collapsed'
+        write_collapsed_stacks(pstats_path, output_path)
+
+
+def load_profiles(profile_dir):
+    """Load and merge all pstats files of one run"""
+    paths = sorted(glob.glob(os.path.join(profile_dir, '*.pstats')))
+    if not paths:
+        raise ValueError('No pstats files found in {}'.format(profile_dir))
+    return pstats.Stats(*paths)
+
+
+def function_times(stats):
+    """Map function labels to (number of calls, self time, cumulative time)"""
+    times = defaultdict(lambda: [0, 0.0, 0.0])
+    for func, (_cc, nc, tt, ct, _callers) in stats.stats.items():
+        entry = times[func_label(func)]
+        entry[0] += nc
+        entry[1] += tt
+        entry[2] += ct
+    return times
+
+
+def compare_profiles(profile_dir_a, profile_dir_b, top=30, sort='tottime'):
+    """Compare the hottest functions of two runs
+
+    Returns:
+        list of tuples (label, calls_a, calls_b, time_a, time_b) sorted
+        by the max. time of both runs, times are either self time
+        (sort='tottime') or cumulative time (sort='cumtime')
+    """
+    index = 1 if sort == 'tottime' else 2
+    times_a = function_times(load_profiles(profile_dir_a))
+    times_b = function_times(load_profiles(profile_dir_b))
+    rows = []
+    for label in set(times_a) | set(times_b):
+        a = times_a.get(label, (0, 0.0, 0.0))
+        b = times_b.get(label, (0, 0.0, 0.0))
+        rows.append((label, a[0], b[0], a[index], b[index]))
+    rows.sort(key=lambda row: max(row[3], row[4]), reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare Python profiles of two Spark job runs'
+    )
+    parser.add_argument('profile_dir_a', help='Profile directory of run A')
+    parser.add_argument('profile_dir_b', help='Profile directory of run B')
+    parser.add_argument(
+        '--top', type=int, default=30, help='Number of functions to show'
+    )
+    parser.add_argument(
+        '--sort',
+        choices=['tottime', 'cumtime'],
+        default='tottime',
+        help='Compare self time (tottime) or cumulative time (cumtime)',
+    )
+    args = parser.parse_args()
+
+    rows = compare_profiles(args.profile_dir_a, args.profile_dir_b, args.top, args.sort)
+    print(
+        '{:>12} {:>12} {:>10} {:>10} {:>10} {:>8}  {}'.format(
+            'calls A', 'calls B', 'A (s)', 'B (s)', 'B-A (s)', 'B/A', 'function'
+        )
+    )
+    for label, calls_a, calls_b, time_a, time_b in rows:
+        ratio = '{:.2f}'.format(time_b / time_a) if time_a > 0 else '-'
+        print(
+            '{:>12} {:>12} {:>10.3f} {:>10.3f} {:>+10.3f} {:>8}  {}'.format(
+                calls_a, calls_b, time_a, time_b, time_b - time_a, ratio, label
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -5,20 +5,41 @@ import json
 import logging
 import os
 import re
+import time
+from collections import defaultdict
 from io import BytesIO
 from tempfile import SpooledTemporaryFile, TemporaryFile
 
 import boto3
 import botocore
 import requests
+from async_fetch import AsyncFetcher
+from pyspark.accumulators import AccumulatorParam
 from pyspark.sql import SparkSession
-from pyspark.sql.types import LongType, StringType, StructField, StructType
+from pyspark.sql.types import (
+    DoubleType,
+    LongType,
+    StringType,
+    StructField,
+    StructType,
+)
 from warcio.archiveiterator import ArchiveIterator
 from warcio.recordloader import ArchiveLoadFailed, ArcWarcRecord
 
 LOGGING_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
 
 
+class ListAccumulatorParam(AccumulatorParam):
+    """Accumulator collecting a list of items (e.g., rows)"""
+
+    def zero(self, value):
+        return []
+
+    def addInPlace(self, value1, value2):
+        value1.extend(value2)
+        return value1
+
+
 class CCSparkJob(object):
     """A simple Spark job definition to process Common Crawl data
     (WARC/WAT/WET files using Spark and warcio)
@@ -37,10 +58,28 @@ class CCSparkJob(object):
     # parse HTTP headers of WARC records (derived classes may override this)
     warc_parse_http_header = True
 
+    # schema of the per-input-file metrics table (option --file_metrics)
+    file_metrics_schema = StructType(
+        [
+            StructField('uri', StringType(), True),
+            StructField('bytes', LongType(), True),
+            StructField('records', LongType(), True),
+            StructField('links', LongType(), True),
+            StructField('fetch_seconds', DoubleType(), True),
+            StructField('parse_seconds', DoubleType(), True),
+            StructField('failures', LongType(), True),
+        ]
+    )
+
     args = None
     records_processed = None
     warc_input_processed = None
     warc_input_failed = None
+    file_metrics = None
+
+    # counters kept locally in the task and added to the accumulators
+    # of the same name once per input file, see flush_counters()
+    counters = None
     log_level = 'INFO'
     logging.basicConfig(level=log_level, format=LOGGING_FORMAT)
 
@@ -115,6 +154,38 @@ class CCSparkJob(object):
             default=None,
             help='Local temporary directory, used to' ' buffer content from S3',
         )
+        arg_parser.add_argument(
+            '--fetch_concurrency',
+            type=int,
+            default=1,
+            help='Number of concurrent downloads (files or WARC'
+            ' records) per task. If greater than 1, an asyncio-based'
+            ' fetch engine keeps multiple downloads in flight while'
+            ' fetched content is processed.',
+        )
+        arg_parser.add_argument(
+            '--fetch_concurrency_per_host',
+            type=int,
+            default=4,
+            help='Max. number of concurrent downloads per host'
+            ' (or S3 bucket), see --fetch_concurrency',
+        )
+        arg_parser.add_argument(
+            '--file_metrics',
+            action='store_true',
+            help='Save metrics per input file (bytes, records, links,'
+            ' fetch and parse time, failures) as table'
+            ' <output>_file_metrics. Note: files processed by'
+            ' retried tasks may be listed more than once.',
+        )
+
+        arg_parser.add_argument(
+            '--hive_support',
+            action='store_true',
+            help='Enable Hive support: tables are registered in a'
+            ' persistent metastore (incl. bucketing information),'
+            ' cf. spark.sql.catalogImplementation',
+        )
 
         arg_parser.add_argument(
             '--log_level', default=self.log_level, help='Logging level'
@@ -124,7 +195,17 @@ class CCSparkJob(object):
             action='store_true',
             help='Enable PySpark profiler and log'
             ' profiling metrics if job has finished,'
-            ' cf. spark.python.profile',
+            ' cf. spark.python.profile. Profiles of RDD stages and'
+            ' Python UDFs are also saved, see --spark_profiler_dir',
+        )
+        arg_parser.add_argument(
+            '--spark_profiler_dir',
+            default=None,
+            help='Local directory to save profiles (pstats and collapsed'
+            ' stacks for flame graphs) if --spark-profiler is enabled,'
+            ' default: <output>_profiles in the local warehouse directory'
+            ' or in the working directory. Profiles of two runs can be'
+            ' compared by `python spark_profiles.py <dir_a> <dir_b>`',
         )
 
         self.add_arguments(arg_parser)
@@ -177,6 +258,69 @@ class CCSparkJob(object):
         self.records_processed = sc.accumulator(0)
         self.warc_input_processed = sc.accumulator(0)
         self.warc_input_failed = sc.accumulator(0)
+        if self.args.file_metrics:
+            self.file_metrics = sc.accumulator([], ListAccumulatorParam())
+        self.counters = defaultdict(int)
+
+    def flush_counters(self):
+        """Add the local counters to the accumulators of the same name
+        and reset them. Called once per input file (or partition).
+        """
+        for name, value in self.counters.items():
+            if value:
+                getattr(self, name).add(value)
+        self.counters.clear()
+
+    def get_file_metrics(self):
+        """Get metrics of the current input file from the local counters.
+        Derived classes may override this method to fill in further
+        columns of the metrics table (see `file_metrics_schema`).
+        """
+        return {
+            'records': self.counters['records_processed'],
+            'links': 0,
+            'failures': self.counters['warc_input_failed'],
+        }
+
+    def add_file_metrics(self, uri, size, fetch_seconds, parse_seconds, failed):
+        """Add a row to the per-input-file metrics table"""
+        metrics = self.get_file_metrics()
+        if failed:
+            metrics['failures'] += 1
+        self.file_metrics.add(
+            [
+                (
+                    uri,
+                    size,
+                    metrics['records'],
+                    metrics['links'],
+                    fetch_seconds,
+                    parse_seconds,
+                    metrics['failures'],
+                )
+            ]
+        )
+
+    def save_file_metrics(self, session):
+        """Save the per-input-file metrics as table <output>_file_metrics"""
+        if self.file_metrics is None or not self.file_metrics.value:
+            return
+        session.createDataFrame(
+            self.file_metrics.value, schema=self.file_metrics_schema
+        ).coalesce(1).write.format(self.args.output_format).option(
+            'compression', self.args.output_compression
+        ).options(**self.get_output_options()).saveAsTable(
+            self.args.output + '_file_metrics'
+        )
+
+    @staticmethod
+    def path_exists(session, path):
+        """Check whether a path exists on the Hadoop file system
+        (local file system, HDFS, S3, etc.)"""
+        jvm = session.sparkContext._jvm
+        hadoop_path = jvm.org.apache.hadoop.fs.Path(path)
+        fs = hadoop_path.getFileSystem(session.sparkContext._jsc.hadoopConfiguration())
+        return fs.exists(hadoop_path)
 
     def get_logger(self, session=None):
         """Get logger from SparkSession or (if None) from logging module"""
@@ -195,8 +339,13 @@ class CCSparkJob(object):
 
         builder = SparkSession.builder.appName(self.name)
 
+        if self.args.hive_support:
+            builder.enableHiveSupport()
+
         if self.args.spark_profiler:
             builder.config('spark.python.profile', 'true')
+            # profile Python UDFs as well (Spark 4.0+)
+            builder.config('spark.sql.pyspark.udf.profiler', 'perf')
 
         session = builder.getOrCreate()
 
@@ -207,9 +356,38 @@ class CCSparkJob(object):
 
         if self.args.spark_profiler:
             session.sparkContext.show_profiles()
+            self.save_profiles(session)
 
         session.stop()
 
+    def get_profiler_dir(self, session):
+        if self.args.spark_profiler_dir:
+            return self.args.spark_profiler_dir
+        warehouse_dir = session.conf.get('spark.sql.warehouse.dir', '')
+        if warehouse_dir.startswith('file:'):
+            warehouse_dir = re.sub(r'^file:(//)?', '', warehouse_dir)
+        elif re.match(r'^[a-z][a-z0-9]*:', warehouse_dir):
+            # remote file system: profiles are written by the driver
+            warehouse_dir = ''
+        return os.path.join(
+            warehouse_dir or os.getcwd(), self.args.output + '_profiles'
+        )
+
+    def save_profiles(self, session):
+        """Save profiles per RDD stage (rdd_<id>.pstats) and Python UDF
+        (udf_<id>_perf.pstats) and the corresponding collapsed stacks"""
+        from spark_profiles import save_collapsed_stacks
+
+        profiler_dir = self.get_profiler_dir(session)
+        os.makedirs(profiler_dir, exist_ok=True)
+        session.sparkContext.dump_profiles(profiler_dir)
+        try:
+            session.profile.dump(profiler_dir, type='perf')
+        except AttributeError:
+            pass  # UDF profiles available since Spark 4.0.0
+        save_collapsed_stacks(profiler_dir)
+        self.get_logger(session).info('Profiles saved in {}'.format(profiler_dir))
+
     def log_accumulator(self, session, acc, descr):
         """Log single counter/accumulator"""
         self.get_logger(session).info(descr.format(acc.value))
@@ -248,6 +426,7 @@ class CCSparkJob(object):
         ).options(**self.get_output_options()).saveAsTable(self.args.output)
 
         self.log_accumulators(session)
+        self.save_file_metrics(session)
 
     def get_s3_client(self):
         if not self.s3client:
@@ -256,6 +435,9 @@ class CCSparkJob(object):
 
     def fetch_warc(self, uri, base_uri=None, offset=-1, length=-1):
         """Fetch WARC/WAT/WET files (or a record if offset and length are given)"""
+        # Note: failures are added directly to the accumulator, not to the
+        # local counters, because this method may run in the fetcher threads
+        # of AsyncFetcher
         (scheme, netloc, path) = (None, None, None)
         uri_match = self.data_url_pattern.match(uri)
         if not uri_match and base_uri:
@@ -363,20 +545,84 @@ class CCSparkJob(object):
 
         return stream
 
+    def get_fetch_host(self, uri):
+        """Get the host name (or S3 bucket) of a WARC/WAT/WET file
+        or record, used to limit the number of concurrent fetches per host
+        """
+        uri_match = self.data_url_pattern.match(uri)
+        if not uri_match and self.args.input_base_url:
+            uri_match = self.data_url_pattern.match(self.args.input_base_url + uri)
+        if uri_match:
+            return uri_match.group(2)
+        return None
+
+    def get_async_fetcher(self, fetch, host_of):
+        """Get a fetch engine keeping up to `--fetch_concurrency`
+        downloads in flight, see `AsyncFetcher`
+        """
+        return AsyncFetcher(
+            fetch,
+            host_of,
+            concurrency=self.args.fetch_concurrency,
+            per_host_concurrency=self.args.fetch_concurrency_per_host,
+        )
+
     def process_warcs(self, _id, iterator):
         """Process WARC/WAT/WET files, calling iterate_records(...) for each file"""
+        if self.args.fetch_concurrency > 1:
+            for res in self.process_warcs_async(iterator):
+                yield res
+            return
+
         for uri in iterator:
-            self.warc_input_processed.add(1)
+            stream, fetch_seconds = self.fetch_warc_timed(uri)
+            for res in self.process_fetched_warc(uri, stream, fetch_seconds):
+                yield res
 
-            stream = self.fetch_warc(uri, self.args.input_base_url)
-            if not stream:
-                continue
+    def process_warcs_async(self, iterator):
+        """Process WARC/WAT/WET files while fetching the next files
+        concurrently, see option --fetch_concurrency
+        """
+        fetcher = self.get_async_fetcher(self.fetch_warc_timed, self.get_fetch_host)
+        for uri, (stream, fetch_seconds) in fetcher.fetch_all(iterator):
+            for res in self.process_fetched_warc(uri, stream, fetch_seconds):
+                yield res
+
+    def fetch_warc_timed(self, uri):
+        """Fetch WARC/WAT/WET file, return the stream and the fetch time"""
+        start = time.monotonic()
+        stream = self.fetch_warc(uri, self.args.input_base_url)
+        return stream, time.monotonic() - start
 
+    @staticmethod
+    def get_stream_size(stream):
+        """Get the size of a (seekable) stream, None if unknown"""
+        try:
+            return stream.seek(0, os.SEEK_END)
+        except Exception:
+            return None
+
+    def process_fetched_warc(self, uri, stream, fetch_seconds):
+        """Process a fetched WARC/WAT/WET file, record its metrics
+        and flush the local counters
+        """
+        self.counters['warc_input_processed'] += 1
+        size = None
+        parse_seconds = 0.0
+        if stream:
+            start = time.monotonic()
             for res in self.process_warc(uri, stream):
                 yield res
-
+            parse_seconds = time.monotonic() - start
+            size = self.get_stream_size(stream)
             stream.close()
 
+        if self.file_metrics is not None:
+            self.add_file_metrics(
+                uri, size, fetch_seconds, parse_seconds, failed=not stream
+            )
+        self.flush_counters()
+
     def process_warc(self, uri, stream):
         """Parse a WARC (or WAT/WET file) using warcio,
         call iterate_records() to process the WARC records
@@ -388,7 +634,7 @@ class CCSparkJob(object):
             for res in self.iterate_records(uri, rec_iter):
                 yield res
         except ArchiveLoadFailed as exception:
-            self.warc_input_failed.add(1)
+            self.counters['warc_input_failed'] += 1
             self.get_logger().error('Invalid WARC: {} - {}'.format(uri, exception))
 
     def process_record(self, record):
@@ -400,10 +646,11 @@ class CCSparkJob(object):
         and allows to access also values from ArchiveIterator, namely
         WARC record offset and length.
         """
+        counters = self.counters
         for record in archive_iterator:
             for res in self.process_record(record):
                 yield res
-            self.records_processed.add(1)
+            counters['records_processed'] += 1
             # WARC record offset and length should be read after the record
             # has been processed, otherwise the record content is consumed
             # while offset and length are determined:
@@ -633,41 +880,74 @@ class CCIndexWarcSparkJob(CCIndexSparkJob):
         for res in self.process_record(record):
             yield res
 
+    def fetch_warc_record(self, row):
+        """Fetch the WARC record specified by columns warc_filename,
+        warc_record_offset and warc_record_length in row
+        """
+        self.get_logger().debug('Fetching WARC record for {}'.format(row['url']))
+        return self.fetch_warc(
+            row['warc_filename'],
+            self.args.input_base_url,
+            int(row['warc_record_offset']),
+            int(row['warc_record_length']),
+        )
+
+    def process_warc_record_stream(self, row, record_stream):
+        """Process the WARC record(s) in a fetched record stream"""
+        no_parse = not self.warc_parse_http_header
+        try:
+            for record in ArchiveIterator(record_stream, no_record_parse=no_parse):
+                for res in self.process_record_with_row(record, row):
+                    yield res
+                self.counters['records_processed'] += 1
+        except ArchiveLoadFailed as exception:
+            self.counters['warc_input_failed'] += 1
+            self.get_logger().error(
+                'Invalid WARC record: {} ({}, offset: {}, length: {}) - {}'.format(
+                    row['url'],
+                    row['warc_filename'],
+                    row['warc_record_offset'],
+                    row['warc_record_length'],
+                    exception,
+                )
+            )
+
     def fetch_process_warc_records(self, rows):
         """Fetch and process WARC records specified by columns warc_filename,
         warc_record_offset and warc_record_length in rows
         """
-        no_parse = not self.warc_parse_http_header
-
-        for row in rows:
-            url = row['url']
-            warc_path = row['warc_filename']
-            offset = int(row['warc_record_offset'])
-            length = int(row['warc_record_length'])
-            self.get_logger().debug('Fetching WARC record for {}'.format(url))
-            record_stream = self.fetch_warc(
-                warc_path, self.args.input_base_url, offset, length
+        if self.args.fetch_concurrency > 1:
+            # many small range requests: keep multiple requests in flight
+            fetcher = self.get_async_fetcher(
+                self.fetch_warc_record,
+                lambda row: self.get_fetch_host(row['warc_filename']),
             )
-            try:
-                for record in ArchiveIterator(record_stream, no_record_parse=no_parse):
-                    for res in self.process_record_with_row(record, row):
-                        yield res
-                    self.records_processed.add(1)
-            except ArchiveLoadFailed as exception:
-                self.warc_input_failed.add(1)
-                self.get_logger().error(
-                    'Invalid WARC record: {} ({}, offset: {}, length: {}) - {}'.format(
-                        url, warc_path, offset, length, exception
-                    )
-                )
+            fetched = fetcher.fetch_all(rows)
+        else:
+            fetched = ((row, self.fetch_warc_record(row)) for row in rows)
 
-    def run_job(self, session):
-        sqldf = self.load_dataframe(session, self.args.num_input_partitions)
+        for row, record_stream in fetched:
+            if not record_stream:
+                continue
+            for res in self.process_warc_record_stream(row, record_stream):
+                yield res
+
+        self.flush_counters()
 
+    @staticmethod
+    def get_warc_records(sqldf):
+        """Select the WARC record coordinates (and the optional content
+        charset) from the input table, return them as RDD of rows
+        """
         columns = ['url', 'warc_filename', 'warc_record_offset', 'warc_record_length']
         if 'content_charset' in sqldf.columns:
             columns.append('content_charset')
-        warc_recs = sqldf.select(*columns).rdd
+        return sqldf.select(*columns).rdd
+
+    def run_job(self, session):
+        sqldf = self.load_dataframe(session, self.args.num_input_partitions)
+
+        warc_recs = self.get_warc_records(sqldf)
 
         output = warc_recs.mapPartitions(self.fetch_process_warc_records).reduceByKey(
             self.reduce_by_key_func
@@ -0,0 +1,138 @@
+import glob
+import os
+import re
+import shutil
+
+from hostlinks_to_graph import HostLinksToGraph
+from pyspark.sql import functions as sqlf
+
+
+class TemporalHostLinksToGraph(HostLinksToGraph):
+    """Construct temporal host-level webgraph from the link tables
+    <from_host, to_host> of multiple crawls: vertex IDs are assigned once
+    over all crawls, edges <src, dst, time_id> are partitioned by time_id,
+    vertices <domain, node_id, time_id> hold the time_id of the last
+    (and first) crawl the vertex is seen in.
+    """
+
+    name = 'TemporalLinksToGraph'
+
+    input_descr = (
+        'Path to file listing the link tables of the crawls,'
+        ' one per line: <time_id> <path>'
+    )
+
+    def add_arguments(self, parser):
+        super(TemporalHostLinksToGraph, self).add_arguments(parser)
+        parser.add_argument(
+            '--save_as_csv',
+            type=str,
+            default=None,
+            help='Save temporal graph also as CSV files temporal_edges.csv'
+            ' (src, dst, time_id) and temporal_nodes.csv (domain, node_id,'
+            ' time_id) on a local or shared file system path (must be'
+            ' writable by executors), the format written by'
+            ' TemporalGraphMerger',
+        )
+
+    def load_crawl_links(self, session):
+        """Read the link tables listed in the input file and union them
+        with the time_id of the crawl (column `time_id`)"""
+        edges = None
+        for line in session.sparkContext.textFile(self.args.input).collect():
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            time_id, path = line.split(None, 1)
+            links = session.read.load(path).select(
+                's', 't', sqlf.lit(int(time_id)).cast('int').alias('time_id')
+            )
+            self.get_logger(session).info(
+                'Adding links of {} (time_id {})'.format(path, time_id)
+            )
+            edges = links if edges is None else edges.union(links)
+        if edges is None:
+            raise Exception('No link tables listed in ' + self.args.input)
+        return edges
+
+    def get_temporal_vertices(self, edges, ids):
+        """Vertices <domain, node_id, time_id, first_seen>: time_id
+        (first_seen) is the last (first) crawl the vertex is linked in"""
+        seen = edges.select(edges.s.alias('name'), 'time_id').union(
+            edges.select(edges.t.alias('name'), 'time_id')
+        )
+        seen = seen.groupBy('name').agg(
+            sqlf.max('time_id').alias('time_id'),
+            sqlf.min('time_id').alias('first_seen'),
+        )
+        vertices = ids.join(seen, 'name', 'inner')
+        return vertices.select(
+            vertices.name.alias('domain'),
+            vertices.id.alias('node_id'),
+            'time_id',
+            'first_seen',
+        )
+
+    def save_csv(self, df, path, name, columns):
+        """Save columns of a DataFrame as a single CSV file <path>/<name>
+        with header. Parts are written by the executors and concatenated
+        by the driver in the order of partitions."""
+        parts_path = os.path.join(path, name + '.parts')
+        df.select(*columns).write.mode('overwrite').csv(parts_path, header=False)
+        with open(os.path.join(path, name), 'wb') as out:
+            out.write((','.join(columns) + '\n').encode('utf-8'))
+            for part_path in sorted(glob.glob(os.path.join(parts_path, 'part-*'))):
+                with open(part_path, 'rb') as f:
+                    shutil.copyfileobj(f, out, 1 << 24)
+        shutil.rmtree(parts_path)
+
+    def run_job(self, session):
+        for table in ('vertices', 'edges', 'nodes'):
+            session.sql('DROP TABLE IF EXISTS {}_{}'.format(self.args.output, table))
+
+        # edges  s -> t  (host names) of all crawls
+        edges = self.load_crawl_links(session).dropDuplicates().persist()
+
+        # one ID space over all crawls
+        ids = self.vertices_assign_ids(session, edges)
+
+        vertices = self.get_temporal_vertices(edges, ids)
+        vertices = vertices.coalesce(self.args.vertex_partitions)
+        vertices = vertices.sortWithinPartitions('node_id')
+        vertices.write.format(self.args.output_format).option(
+            'compression', self.args.output_compression
+        ).saveAsTable(self.args.output + '_nodes')
+        vertices = session.table(self.args.output + '_nodes')
+
+        links = edges
+        edges = self.encode_edges(session, edges, ids)
+        # remove self-loops (after assignment of IDs, see HostLinksToGraph)
+        edges = edges.filter(edges.s != edges.t)
+        edges = edges.select(edges.s.alias('src'), edges.t.alias('dst'), edges.time_id)
+        # sorted by time_id (and source ID) over all partitions, so that
+        # the crawls are stored in few files each
+        edges = edges.repartitionByRange(
+            self.args.num_output_partitions, 'time_id', 'src'
+        )
+        edges = edges.sortWithinPartitions('time_id', 'src', 'dst')
+        if self.args.save_as_csv is not None:
+            edges = edges.persist()
+        edges.write.partitionBy('time_id').format(self.args.output_format).option(
+            'compression', self.args.output_compression
+        ).saveAsTable(self.args.output + '_edges')
+        links.unpersist()
+
+        if self.args.save_as_csv is not None:
+            path = re.sub(r'^file:(//)?', '', self.args.save_as_csv)
+            os.makedirs(path, exist_ok=True)
+            self.save_csv(edges, path, 'temporal_edges.csv', ['src', 'dst', 'time_id'])
+            self.save_csv(
+                vertices, path, 'temporal_nodes.csv', ['domain', 'node_id', 'time_id']
+            )
+            edges.unpersist()
+            self.get_logger(session).info('Saved temporal graph as CSV in ' + path)
+
+
+if __name__ == '__main__':
+    job = TemporalHostLinksToGraph()
+    job.run()
@@ -81,10 +81,11 @@ class ExtractLinksJob(CCSparkJob):
         self.processing_robotstxt_warc = (
             ExtractLinksJob.robotstxt_warc_path_pattern.match(warc_uri)
         )
+        counters = self.counters
         for record in archive_iterator:
             for res in self.process_record(record):
                 yield res
-            self.records_processed.add(1)
+            counters['records_processed'] += 1
 
     def process_record(self, record):
         link_count = 0
@@ -93,36 +94,40 @@ class ExtractLinksJob(CCSparkJob):
                 wat_record = json.loads(self.get_payload_stream(record).read())
             except ValueError as e:
                 self.get_logger().error('Failed to load JSON: {}'.format(e))
-                self.records_failed.add(1)
+                self.counters['records_failed'] += 1
                 return
             warc_header = wat_record['Envelope']['WARC-Header-Metadata']
             if warc_header['WARC-Type'] != 'response':
                 # WAT request or metadata records
                 return
-            self.records_response.add(1)
-            self.records_response_wat.add(1)
+            self.counters['records_response'] += 1
+            self.counters['records_response_wat'] += 1
             url = warc_header['WARC-Target-URI']
             for link in self.get_links(url, wat_record):
                 link_count += 1
                 yield link
         elif self.is_response_record(record):
-            self.records_response.add(1)
-            self.records_response_warc.add(1)
+            self.counters['records_response'] += 1
+            self.counters['records_response_warc'] += 1
             stream = self.get_payload_stream(record)
             http_status_line = stream.readline()
             if (
                 self.processing_robotstxt_warc
                 and ExtractLinksJob.http_success_pattern.match(http_status_line)
             ):
-                self.records_response_robotstxt.add(1)
+                self.counters['records_response_robotstxt'] += 1
                 for link in self.process_robotstxt(record, stream, http_status_line):
                     link_count += 1
                     yield link
             elif ExtractLinksJob.http_redirect_pattern.match(http_status_line):
-                self.records_response_redirect.add(1)
+                self.counters['records_response_redirect'] += 1
                 for link in self.process_redirect(record, stream, http_status_line):
                     link_count += 1
                     yield link
+            elif ExtractLinksJob.http_success_pattern.match(http_status_line):
+                for link in self.process_html(record, stream, http_status_line):
+                    link_count += 1
+                    yield link
         else:
             return
         if link_count == 0:
@@ -132,7 +137,7 @@ class ExtractLinksJob(CCSparkJob):
             for link in self.yield_link(uri, uri):
                 link_count += 1
                 yield link
-        self.link_count.add(link_count)
+        self.counters['link_count'] += link_count
 
     def process_redirect(self, record, stream, http_status_line):
         """Process redirects (HTTP status code 30[12378])
@@ -159,6 +164,13 @@ class ExtractLinksJob(CCSparkJob):
                 return
             line = stream.readline()
 
+    def process_html(self, record, stream, http_status_line):
+        """Process successfully fetched WARC response records (HTTP status
+        code 200). Links are extracted from WAT records, so by default
+        WARC responses do not yield any links.
+        """
+        return []
+
     def process_robotstxt(self, record, stream, http_status_line):
         # Robots.txt -> sitemap links are meaningful for host-level graphs,
         # page-level graphs usually do not contain the robots.txt as a node
@@ -233,7 +245,7 @@ class ExtractLinksJob(CCSparkJob):
                 for l in self.yield_http_header_links(url, response_meta['Headers']):
                     yield l
             if 'HTML-Metadata' not in response_meta:
-                self.records_non_html.add(1)
+                self.counters['records_non_html'] += 1
                 return
             html_meta = response_meta['HTML-Metadata']
             base = None
@@ -276,7 +288,7 @@ class ExtractLinksJob(CCSparkJob):
 
         except KeyError as e:
             self.get_logger().error('Failed to parse record for {}: {}'.format(url, e))
-            self.records_failed.add(1)
+            self.counters['records_failed'] += 1
 
     def init_accumulators(self, session):
         super(ExtractLinksJob, self).init_accumulators(session)
@@ -313,10 +325,17 @@ class ExtractLinksJob(CCSparkJob):
         )
         self.log_accumulator(session, self.link_count, 'non-unique link pairs = {}')
 
-    def run_job(self, session):
+    def get_file_metrics(self):
+        metrics = super(ExtractLinksJob, self).get_file_metrics()
+        metrics['links'] = self.counters['link_count']
+        metrics['failures'] += self.counters['records_failed']
+        return metrics
+
+    def extract_links(self, session):
+        """Extract the links of the input WARC/WAT files, or read them from
+        the intermediate output. Returns a DataFrame (`output_schema`)
+        with duplicate links."""
         output = None
-        session.sql("DROP TABLE IF EXISTS host_graph_output_vertices")
-        session.sql("DROP TABLE IF EXISTS host_graph_output_edges")
         if self.args.input != '':
             input_data = session.sparkContext.textFile(
                 self.args.input, minPartitions=self.args.num_input_partitions
@@ -340,6 +359,12 @@ class ExtractLinksJob(CCSparkJob):
                 warehouse_dir, self.args.intermediate_output
             )
             df = session.read.parquet(intermediate_output)
+        return df
+
+    def run_job(self, session):
+        session.sql("DROP TABLE IF EXISTS host_graph_output_vertices")
+        session.sql("DROP TABLE IF EXISTS host_graph_output_edges")
+        df = self.extract_links(session)
 
         df.dropDuplicates().coalesce(
             self.args.num_output_partitions
@@ -348,6 +373,7 @@ class ExtractLinksJob(CCSparkJob):
         ).saveAsTable(self.args.output)
 
         self.log_accumulators(session.sparkContext)
+        self.save_file_metrics(session)
 
 
 class ExtractHostLinksJob(ExtractLinksJob):
@@ -524,7 +550,7 @@ class ExtractHostLinksJob(ExtractLinksJob):
                     ):
                         yield l
             if 'HTML-Metadata' not in response_meta:
-                self.records_non_html.add(1)
+                self.counters['records_non_html'] += 1
                 return
             html_meta = response_meta['HTML-Metadata']
             base = None
@@ -598,7 +624,7 @@ class ExtractHostLinksJob(ExtractLinksJob):
 
         except KeyError as e:
             self.get_logger().error('Failed to parse record for {}: {}'.format(url, e))
-            self.records_failed.add(1)
+            self.counters['records_failed'] += 1
 
     def process_robotstxt(self, record, stream, _http_status_line):
         """Process robots.txt and yield sitemap links"""
@@ -0,0 +1,67 @@
+from hostlinks_to_graph import HostLinksToGraph
+from wat_extract_links import ExtractHostLinksJob
+
+
+class WatToGraph(ExtractHostLinksJob, HostLinksToGraph):
+    """Extract host links from WAT/WARC files (ExtractHostLinksJob) and
+    construct the host-level webgraph from them (HostLinksToGraph)
+    in one Spark job: the links are passed to the assignment of vertex
+    IDs without saving and reading back the link table.
+    """
+
+    name = 'WatToGraph'
+
+    output_descr = (
+        'Name of output graph (tables <output>_vertices and <output>_edges,'
+        ' saved in spark.sql.warehouse.dir)'
+    )
+
+    def add_arguments(self, parser):
+        ExtractHostLinksJob.add_arguments(self, parser)
+        HostLinksToGraph.add_arguments(self, parser)
+        parser.add_argument(
+            '--save_links',
+            type=str,
+            default=None,
+            help='Save the distinct host links <s, t> also as table, the'
+            ' input of HostLinksToGraph (by default, links are not'
+            ' persisted)',
+        )
+
+    def run_job(self, session):
+        incremental = self.prepare_graph_tables(session)
+
+        # edges  s -> t  (host names), deduplicated once
+        # and not sorted (sorted by vertex IDs later)
+        edges = self.extract_links(session).dropDuplicates()
+
+        if self.args.save_links is not None:
+            edges.write.format(self.args.output_format).option(
+                'compression', self.args.output_compression
+            ).saveAsTable(self.args.save_links)
+            edges = session.table(self.args.save_links)
+        else:
+            # edges are read twice (vertex names and encoding by IDs),
+            # links must not be extracted again
+            edges = edges.persist()
+        links = edges
+        if incremental:
+            self.add_links(session, edges)
+        else:
+            if self.args.num_buckets > 0:
+                edges = self.merge_links(session, edges)
+            elif self.args.add_input:
+                for add_input in self.args.add_input:
+                    edges = edges.union(session.read.load(add_input))
+                edges = edges.dropDuplicates()
+
+            self.build_graph(session, edges)
+        links.unpersist()
+
+        self.log_accumulators(session.sparkContext)
+        self.save_file_metrics(session)
+
+
+if __name__ == '__main__':
+    job = WatToGraph()
+    job.run()
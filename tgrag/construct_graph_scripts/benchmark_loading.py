@@ -0,0 +1,107 @@
+"""Benchmark loading of edges.txt.gz in lines/s.
+
+Compares the line-by-line Python loop previously used by
+TemporalGraphMerger with the pyarrow CSV reader (single- and
+multithreaded). Usage:
+
+    python -m tgrag.construct_graph_scripts.benchmark_loading --edges EDGES
+
+Without --edges, a synthetic slice with --num-edges edges is generated.
+"""
+
+import argparse
+import gzip
+import os
+import tempfile
+import time
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from tgrag.utils.text_graph import read_text_edges
+
+
+def write_synthetic_edges(path: str, num_edges: int, seed: int) -> None:
+    """Write random edges sorted by source, as written by HostLinksToGraph."""
+    rng = np.random.default_rng(seed)
+    num_nodes = max(1, num_edges // 10)
+    chunk_size = 10_000_000
+    with gzip.open(path, 'wb', compresslevel=6) as f:
+        for start in range(0, num_edges, chunk_size):
+            size = min(chunk_size, num_edges - start)
+            src = np.sort(rng.integers(0, num_nodes, size))
+            dst = rng.integers(0, num_nodes, size)
+            lines = np.char.add(
+                np.char.add(src.astype(str), '\t'), np.char.add(dst.astype(str), '\n')
+            )
+            f.write(''.join(lines.tolist()).encode('ascii'))
+
+
+def load_edges_loop(path: str) -> List[Tuple[int, int]]:
+    with gzip.open(path, 'rt', encoding='utf-8', errors='ignore') as f:
+        result: List[Tuple[int, int]] = []
+        for line in f:
+            parts = line.strip().split()
+            if len(parts) == 2:
+                result.append((int(parts[0]), int(parts[1])))
+        return result
+
+
+def benchmark(name: str, func: Callable[[], int], repeat: int) -> None:
+    best = None
+    num_lines = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        num_lines = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    assert best is not None
+    print(f'{name:<28} {best:>10.3f} s {num_lines / best:>14,.0f} lines/s')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--edges', help='edges.txt.gz of a slice')
+    parser.add_argument(
+        '--num-edges',
+        type=int,
+        default=100_000_000,
+        help='Number of edges of the synthetic slice',
+    )
+    parser.add_argument(
+        '--skip-loop',
+        action='store_true',
+        help='Skip the (slow) Python loop',
+    )
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = args.edges
+        if path is None:
+            path = os.path.join(tmp_dir, 'edges.txt.gz')
+            print(f'Writing {args.num_edges:,} synthetic edges to {path}')
+            write_synthetic_edges(path, args.num_edges, args.seed)
+        print(f'{path}: {os.path.getsize(path):,} bytes')
+
+        if not args.skip_loop:
+            benchmark(
+                'Python loop',
+                lambda: len(load_edges_loop(path)),
+                args.repeat,
+            )
+        benchmark(
+            'pyarrow CSV (1 thread)',
+            lambda: len(read_text_edges(path, use_threads=False)[0]),
+            args.repeat,
+        )
+        benchmark(
+            'pyarrow CSV (threads)',
+            lambda: len(read_text_edges(path)[0]),
+            args.repeat,
+        )
+
+
+if __name__ == '__main__':
+    main()
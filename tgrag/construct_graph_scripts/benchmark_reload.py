@@ -0,0 +1,118 @@
+"""Benchmark TemporalGraphMerger._load_existing: load time and RSS.
+
+Compares reloading a merged graph from temporal_edges.csv and
+temporal_nodes.csv, from the Parquet store and from the binary snapshot.
+Each path is loaded in a fresh process. Usage:
+
+    python -m tgrag.construct_graph_scripts.benchmark_reload --num-edges 10000000
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from typing import Tuple
+
+import numpy as np
+
+from tgrag.construct_graph_scripts.temporal_merge import (
+    LoadedSlice,
+    TemporalGraphMerger,
+)
+
+
+def write_synthetic_graph(
+    output_dir: str, num_slices: int, num_nodes: int, num_edges: int, seed: int
+) -> None:
+    """Merge synthetic slices, save the store and snapshot and export CSVs."""
+    rng = np.random.default_rng(seed)
+    merger = TemporalGraphMerger(output_dir)
+    for i in range(num_slices):
+        # each slice holds a random half of the domains
+        node_ids = np.sort(rng.choice(num_nodes, num_nodes // 2, replace=False))
+        size = num_edges // num_slices
+        merger._merge_slice(
+            LoadedSlice(
+                slice_id=f'CC-MAIN-SYNTHETIC-{i}',
+                time_id=20250101 + i,
+                domains=[f'com.domain{node_id}' for node_id in node_ids.tolist()],
+                node_ids=node_ids,
+                src=np.sort(rng.choice(node_ids, size)),
+                dst=rng.choice(node_ids, size),
+            )
+        )
+    merger.save()
+    merger.export_csv()
+
+
+def _memory_mb() -> Tuple[float, float]:
+    """Current and peak RSS of this process (VmRSS, VmHWM)."""
+    status = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            status[key] = value
+    return (
+        int(status['VmRSS'].split()[0]) / 2**10,
+        int(status['VmHWM'].split()[0]) / 2**10,
+    )
+
+
+def _load(output_dir: str) -> Tuple[float, float, float, int, int]:
+    start = time.perf_counter()
+    merger = TemporalGraphMerger(output_dir)
+    elapsed = time.perf_counter() - start
+    rss_mb, peak_mb = _memory_mb()
+    return elapsed, rss_mb, peak_mb, len(merger.domain_to_node), merger.num_edges
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--num-edges', type=int, default=10_000_000)
+    parser.add_argument('--num-nodes', type=int, default=2_000_000)
+    parser.add_argument('--num-slices', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        snapshot_dir = os.path.join(tmp_dir, 'snapshot')
+        print(
+            f'Writing {args.num_slices} synthetic slices with {args.num_edges:,}'
+            f' edges and {args.num_nodes:,} nodes'
+        )
+        write_synthetic_graph(
+            snapshot_dir, args.num_slices, args.num_nodes, args.num_edges, args.seed
+        )
+        csv_dir = os.path.join(tmp_dir, 'csv')
+        os.makedirs(csv_dir)
+        for name in ['temporal_edges.csv', 'temporal_nodes.csv']:
+            shutil.move(os.path.join(snapshot_dir, name), csv_dir)
+        store_dir = os.path.join(tmp_dir, 'store')
+        os.makedirs(store_dir)
+        shutil.copytree(
+            os.path.join(snapshot_dir, 'store'), os.path.join(store_dir, 'store')
+        )
+
+        # spawn: the workers do not inherit the memory of this process
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(1) as pool:
+            base_mb, _ = pool.apply(_memory_mb)
+        print(f'RSS after imports: {base_mb:.0f} MB')
+        print(f'{"":<10} {"load":>10} {"RSS":>10} {"peak RSS":>10}')
+        for name, output_dir in [
+            ('CSV', csv_dir),
+            ('store', store_dir),
+            ('snapshot', snapshot_dir),
+        ]:
+            with context.Pool(1) as pool:
+                elapsed, rss_mb, peak_mb, _, num_edges = pool.apply(
+                    _load, (output_dir,)
+                )
+            assert num_edges == args.num_edges // args.num_slices * args.num_slices
+            print(f'{name:<10} {elapsed:>8.2f} s {rss_mb:>7.0f} MB {peak_mb:>7.0f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,267 @@
+import argparse
+import gzip
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import requests
+
+from tgrag.utils.path import get_root_dir
+
+# downloads Common Crawl path listings and a subset of the listed files,
+# and writes the input listings used by the Spark jobs (cf. get_data.sh)
+
+parser = argparse.ArgumentParser(
+    description='Download Common Crawl data.',
+    formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+)
+parser.add_argument(
+    'crawl',
+    type=str,
+    help='CC time-slice to download, e.g., CC-MAIN-2017-13',
+)
+parser.add_argument(
+    '--data-dir',
+    type=str,
+    default=None,
+    help='Data directory, defaults to $SCRATCH or <project root>/data',
+)
+parser.add_argument(
+    '--base-url',
+    type=str,
+    default='https://data.commoncrawl.org',
+    help='Base URL used to download the path listings and files',
+)
+parser.add_argument(
+    '--data-types',
+    nargs='+',
+    default=['warc', 'wat', 'wet'],
+    help='Types of files to download',
+)
+parser.add_argument(
+    '--num-files',
+    type=int,
+    default=1,
+    help='Number of files to download per type (all if < 0)',
+)
+parser.add_argument(
+    '--sample',
+    action='store_true',
+    help='Select a random sample of files instead of the first ones',
+)
+parser.add_argument(
+    '--seed',
+    type=int,
+    default=1337,
+    help='Random seed used to sample files',
+)
+parser.add_argument(
+    '--workers',
+    type=int,
+    default=8,
+    help='Max. number of concurrent downloads',
+)
+
+CHUNK_SIZE = 1 << 20
+
+# (connect, read) timeout of a request in seconds, a stalled connection
+# raises requests.Timeout and the download is resumed
+TIMEOUT = (10, 60)
+
+_thread_local = threading.local()
+
+
+def _get_session() -> requests.Session:
+    """Get an HTTP session (connection pool) per thread."""
+    if not hasattr(_thread_local, 'session'):
+        _thread_local.session = requests.Session()
+    return _thread_local.session
+
+
+def read_paths_listing(listing_path: str) -> List[str]:
+    with gzip.open(listing_path, 'rt', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def select_paths(
+    paths: List[str], num_files: int, sample: bool = False, seed: int = 1337
+) -> List[str]:
+    if num_files < 0 or num_files >= len(paths):
+        return list(paths)
+    if sample:
+        return random.Random(seed).sample(paths, num_files)
+    return paths[:num_files]
+
+
+def _expected_size(response: requests.Response) -> Optional[int]:
+    """Total size of the remote file from Content-Range or Content-Length."""
+    content_range = response.headers.get('Content-Range')
+    if content_range and '/' in content_range:
+        total = content_range.rsplit('/', 1)[1]
+        if total.isdigit():
+            return int(total)
+    content_length = response.headers.get('Content-Length')
+    if response.status_code == 200 and content_length is not None:
+        return int(content_length)
+    return None
+
+
+def download_file(
+    url: str,
+    target_path: str,
+    retries: int = 3,
+    timeout: Tuple[float, float] = TIMEOUT,
+) -> int:
+    """Download url to target_path, resuming a partial download.
+
+    Data is written to <target_path>.part which is renamed once the
+    download is complete and its size is verified. An existing target
+    file is kept if its size matches the remote size. Connection errors,
+    timeouts and server errors (5xx) are retried.
+
+    Returns:
+        The size of the downloaded file in bytes.
+    """
+    os.makedirs(os.path.dirname(target_path) or '.', exist_ok=True)
+    session = _get_session()
+
+    if os.path.exists(target_path):
+        head = session.head(url, allow_redirects=True, timeout=timeout)
+        head.raise_for_status()
+        remote_size = _expected_size(head)
+        local_size = os.path.getsize(target_path)
+        if remote_size is None or remote_size == local_size:
+            return local_size
+        os.remove(target_path)
+
+    part_path = target_path + '.part'
+    for attempt in range(retries):
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {'Range': f'bytes={offset}-'} if offset > 0 else {}
+        try:
+            with session.get(
+                url, headers=headers, stream=True, timeout=timeout
+            ) as response:
+                if response.status_code == 416:
+                    # requested range not satisfiable: partial file is complete
+                    # or larger than the remote file, verified below
+                    expected = _expected_size(response)
+                else:
+                    response.raise_for_status()
+                    expected = _expected_size(response)
+                    mode = 'ab'
+                    if offset > 0 and response.status_code != 206:
+                        # server ignored the range request, start over
+                        mode = 'wb'
+                    with open(part_path, mode) as f:
+                        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                            f.write(chunk)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            print(f'Download of {url} interrupted (attempt {attempt + 1}): {e}')
+            continue
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code < 500:
+                raise
+            print(f'Download of {url} failed (attempt {attempt + 1}): {e}')
+            continue
+
+        size = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if expected is not None and size != expected:
+            if size > expected:
+                os.remove(part_path)
+            print(f'Size mismatch for {url}: {size} != {expected} bytes, retrying')
+            continue
+        os.replace(part_path, target_path)
+        return size
+
+    raise IOError(f'Failed to download {url} after {retries} attempts')
+
+
+def download_files(
+    base_url: str, paths: List[str], data_dir: str, workers: int = 8
+) -> List[str]:
+    """Download files (paths relative to base_url) to data_dir concurrently.
+
+    Returns:
+        The local paths of the downloaded files (in the order of paths).
+    """
+    targets = [os.path.join(data_dir, path) for path in paths]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [
+            executor.submit(download_file, f'{base_url}/{path}', target)
+            for path, target in zip(paths, targets)
+        ]
+        for path, future in zip(paths, futures):
+            size = future.result()
+            print(f'Downloaded {path} ({size} bytes)')
+    return targets
+
+
+def write_input_listings(
+    input_dir: str,
+    crawl: str,
+    data_type: str,
+    all_paths: List[str],
+    local_paths: List[str],
+) -> None:
+    """Write the input listings read by the Spark jobs:
+    test_<type>.txt (downloaded files) and all_<type>_<crawl>.txt (all files).
+    """
+    os.makedirs(input_dir, exist_ok=True)
+    with open(os.path.join(input_dir, f'test_{data_type}.txt'), 'w') as f:
+        for local_path in local_paths:
+            f.write(f'file:{os.path.abspath(local_path)}\n')
+    with open(os.path.join(input_dir, f'all_{data_type}_{crawl}.txt'), 'w') as f:
+        for path in all_paths:
+            f.write(f'{path}\n')
+
+
+def get_crawl_data(
+    crawl: str,
+    data_dir: str,
+    base_url: str,
+    data_types: List[str],
+    num_files: int = 1,
+    sample: bool = False,
+    seed: int = 1337,
+    workers: int = 8,
+) -> None:
+    crawl_dir = os.path.join(data_dir, 'crawl-data', crawl)
+    input_dir = os.path.join(crawl_dir, 'input')
+
+    for data_type in data_types:
+        print(f'Downloading Common Crawl paths listings ({data_type} files of {crawl})')
+        listing_path = os.path.join(crawl_dir, f'{data_type}.paths.gz')
+        download_file(
+            f'{base_url}/crawl-data/{crawl}/{data_type}.paths.gz', listing_path
+        )
+
+        all_paths = read_paths_listing(listing_path)
+        paths = select_paths(all_paths, num_files, sample=sample, seed=seed)
+        print(f'Downloading {len(paths)} of {len(all_paths)} {data_type} files')
+        local_paths = download_files(base_url, paths, data_dir, workers=workers)
+
+        write_input_listings(input_dir, crawl, data_type, all_paths, local_paths)
+
+
+def main() -> None:
+    args = parser.parse_args()
+    data_dir = args.data_dir
+    if data_dir is None:
+        data_dir = os.environ.get('SCRATCH') or str(get_root_dir() / 'data')
+    get_crawl_data(
+        args.crawl,
+        data_dir,
+        args.base_url.rstrip('/'),
+        args.data_types,
+        num_files=args.num_files,
+        sample=args.sample,
+        seed=args.seed,
+        workers=args.workers,
+    )
+
+
+if __name__ == '__main__':
+    main()
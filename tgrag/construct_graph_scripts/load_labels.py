@@ -1,5 +1,6 @@
 import pandas as pd
 
+from tgrag.utils.binary_graph import is_binary_graph
 from tgrag.utils.matching import extract_graph_domains
 
 
@@ -12,9 +13,12 @@ def load_credibility_scores(path: str, use_core: bool = False) -> pd.DataFrame:
 def get_credibility_intersection(source_path: str, time_slice: str) -> None:
     # Adjust paths
     cred_scores_path = f'{source_path}/dqr/domain_pc1.csv'
-    vertices_path = (
-        f'{source_path}/crawl-data/{time_slice}/output_text_dir/vertices.txt.gz'
-    )
+    # binary graph (written by default) or text graph (SAVE_TEXT=1)
+    vertices_path = f'{source_path}/crawl-data/{time_slice}/output_text_dir/binary'
+    if not is_binary_graph(vertices_path):
+        vertices_path = (
+            f'{source_path}/crawl-data/{time_slice}/output_text_dir/vertices.txt.gz'
+        )
     print(f'Opening vertices file: {vertices_path}')
     output_csv_path = f'{source_path}/crawl-data/{time_slice}/node_credibility.csv'
 
@@ -3,15 +3,18 @@ import os
 import pathlib
 from typing import List
 
-import pandas as pd
-
 from tgrag.construct_graph_scripts.process_compressed_text import (
     move_and_rename_compressed_outputs,
 )
+from tgrag.construct_graph_scripts.slice_manifest import update_slice_manifest
 from tgrag.construct_graph_scripts.subnetwork_construct import (
     construct_subnetwork,
 )
-from tgrag.construct_graph_scripts.temporal_merge import TemporalGraphMerger
+from tgrag.construct_graph_scripts.temporal_merge import (
+    DEFAULT_WORKERS,
+    TemporalGraphMerger,
+)
+from tgrag.utils.binary_graph import is_binary_graph
 from tgrag.utils.path import get_root_dir
 
 parser = argparse.ArgumentParser(
@@ -29,9 +32,26 @@ parser.add_argument(
     action='store_true',
     help='Whether to create subnetworks centered from gold-standard label.',
 )
+parser.add_argument(
+    '--workers',
+    type=int,
+    default=DEFAULT_WORKERS,
+    help='Number of processes loading slices concurrently (the CSV reader of'
+    ' each process is multithreaded).',
+)
+parser.add_argument(
+    '--no-csv',
+    action='store_true',
+    help='Do not export temporal_edges.csv and temporal_nodes.csv (only the store).',
+)
 
 
-def main(slices: List[str], construct_subnetworks: bool) -> None:
+def main(
+    slices: List[str],
+    construct_subnetworks: bool,
+    workers: int = DEFAULT_WORKERS,
+    export_csv: bool = True,
+) -> None:
     base_path = get_root_dir()
 
     crawl_path = f'{base_path}/data/crawl-data'
@@ -39,6 +59,7 @@ def main(slices: List[str], construct_subnetworks: bool) -> None:
 
     merger = TemporalGraphMerger(output_dir)
 
+    slice_paths = []
     for slice_id in slices:
         move_and_rename_compressed_outputs(
             source_base=f'{crawl_path}/{slice_id}/output_text_dir',
@@ -50,21 +71,35 @@ def main(slices: List[str], construct_subnetworks: bool) -> None:
         edges_path = os.path.join(
             f'{crawl_path}/{slice_id}/output_text_dir/', 'edges.txt.gz'
         )
+        adjacency_path = os.path.join(
+            f'{crawl_path}/{slice_id}/output_text_dir/', 'adjacency'
+        )
+        if os.path.isdir(adjacency_path):
+            edges_path = adjacency_path
+        binary_path = os.path.join(
+            f'{crawl_path}/{slice_id}/output_text_dir/', 'binary'
+        )
+        if is_binary_graph(binary_path):
+            vertices_path = edges_path = binary_path
 
         if not (os.path.exists(vertices_path) and os.path.exists(edges_path)):
             print(f'Missing data for {slice_id}: Skipping')
             continue
 
-        merger.add_graph(crawl_path, vertices_path, edges_path, slice_id)
+        # add the copied vertices.txt.gz/edges.txt.gz to the manifest
+        update_slice_manifest(crawl_path, slice_id)
+        slice_paths.append((vertices_path, edges_path, slice_id))
 
+    merger.add_graphs(crawl_path, slice_paths, workers=workers)
     merger.save()
+    if export_csv:
+        merger.export_csv()
     merger.print_overlap()
 
     dqr_path = f'{base_path}/data/dqr/domain_pc1.csv'
-    temporal_path = f'{base_path}/data/crawl-data/temporal'
-    temporal_edges_df = pd.read_csv(f'{temporal_path}/temporal_edges.csv')
-    temporal_vertices_df = pd.read_csv(f'{temporal_path}/temporal_nodes.csv')
     if construct_subnetworks:
+        temporal_edges_df = merger.get_edges_frame()
+        temporal_vertices_df = merger.get_nodes_frame()
         output_path = f'{base_path}/data/crawl-data/sub-networks/'
         pathlib.Path(output_path).mkdir(parents=True, exist_ok=True)
         construct_subnetwork(
@@ -74,4 +109,4 @@ def main(slices: List[str], construct_subnetworks: bool) -> None:
 
 if __name__ == '__main__':
     args = parser.parse_args()
-    main(args.CC_crawl, args.subnetworks)
+    main(args.CC_crawl, args.subnetworks, args.workers, not args.no_csv)
@@ -0,0 +1,245 @@
+"""Per-slice manifest (<crawl-data>/<slice>/manifest.json).
+
+The manifest is written by the run scripts after the graph of a slice
+has been extracted, and removed together with the outputs before a
+re-extraction. It holds the crawl ID, the time_id (date of the first
+WARC-Date found in the WAT files), vertex and edge counts and size,
+mtime and SHA-256 checksum of every output file, so that the merger does
+not need to rescan WAT files. main adds the files copied by
+move_and_rename_compressed_outputs. Files are verified by size and
+mtime, the checksum is only compared if the mtime changed. Usage:
+
+    python -m tgrag.construct_graph_scripts.slice_manifest --CC-crawl CC-MAIN-2025-21
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+from glob import glob
+from typing import Any, Dict, List, Optional, Tuple
+
+from tgrag.utils.binary_graph import is_binary_graph
+from tgrag.utils.path import get_root_dir
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def manifest_path(crawl_path: str, slice_id: str) -> str:
+    return os.path.join(crawl_path, slice_id, MANIFEST_NAME)
+
+
+def read_slice_manifest(crawl_path: str, slice_id: str) -> Optional[Dict[str, Any]]:
+    """Read the manifest of a slice, None if it does not exist."""
+    path = manifest_path(crawl_path, slice_id)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def scan_wat_time_id(crawl_path: str, slice_id: str) -> int:
+    """Yield timestamp from slice ID (current logic: YYYYMMDD)."""
+    pattern = os.path.join(crawl_path, slice_id, 'segments', '*', 'wat')
+    wat_dir = glob(pattern)[0]
+    wat_files = sorted(glob(os.path.join(wat_dir, '*.wat.gz')))
+    warc_date_re = re.compile(r'WARC-Date:\s*(\d{4})-(\d{2})-(\d{2})')
+
+    for path in wat_files:
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8', errors='ignore') as f:
+                for line in f:
+                    match = warc_date_re.search(line)
+                    if match:
+                        yyyy, mm, dd = match.groups()
+                        return int(f'{yyyy}{mm}{dd}')
+        except Exception as e:
+            print(f'Warning: failed to parse {path}: {e}')
+            continue
+
+    raise ValueError(f'Could not extract scrape date from any WAT files in {wat_dir}')
+
+
+def file_checksum(path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def _count_lines(path: str) -> int:
+    with gzip.open(path, 'rb') as f:
+        return sum(block.count(b'\n') for block in iter(lambda: f.read(1 << 20), b''))
+
+
+def count_graph(output_dir: str) -> Tuple[Optional[int], Optional[int]]:
+    """Number of vertices and edges of the graph of a slice, taken from
+    graph_stats.json or the binary headers if present, otherwise counted
+    in vertices.txt.gz and edges.txt.gz.
+    """
+    stats_path = os.path.join(output_dir, 'graph_stats.json')
+    if os.path.exists(stats_path):
+        with open(stats_path) as f:
+            stats = json.load(f)
+        return stats['vertices'], stats['edges']
+    binary_path = os.path.join(output_dir, 'binary')
+    if is_binary_graph(binary_path):
+        with open(os.path.join(binary_path, 'edges.json')) as f:
+            header = json.load(f)
+        return header['num_vertices'], header['num_edges']
+    counts = []
+    for name in ['vertices', 'edges']:
+        paths = sorted(glob(os.path.join(output_dir, name, '*.txt.gz')))
+        if not paths:
+            paths = glob(os.path.join(output_dir, f'{name}.txt.gz'))
+        counts.append(sum(_count_lines(p) for p in paths) if paths else None)
+    return counts[0], counts[1]
+
+
+def _output_files(output_dir: str) -> List[str]:
+    """Paths of the output files of a slice, relative to output_dir."""
+    return sorted(
+        os.path.relpath(os.path.join(root, name), output_dir)
+        for root, _, names in os.walk(output_dir)
+        for name in names
+    )
+
+
+def _file_entry(path: str) -> Dict[str, Any]:
+    stat = os.stat(path)
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': file_checksum(path),
+    }
+
+
+def _file_mismatch(path: str, entry: Dict[str, Any]) -> Optional[str]:
+    """Reason why a file does not match its manifest entry, None if it
+    matches. The file is only hashed if its mtime changed.
+    """
+    if not os.path.exists(path):
+        return 'missing'
+    stat = os.stat(path)
+    if stat.st_size != entry['size']:
+        return 'size'
+    if stat.st_mtime_ns == entry.get('mtime_ns'):
+        return None
+    if file_checksum(path) != entry['sha256']:
+        return 'sha256'
+    return None
+
+
+def _save_manifest(
+    crawl_path: str,
+    slice_id: str,
+    time_id: int,
+    num_vertices: Optional[int],
+    num_edges: Optional[int],
+    files: Dict[str, Dict[str, Any]],
+) -> Dict[str, Any]:
+    manifest = {
+        'crawl_id': slice_id,
+        'time_id': time_id,
+        'num_vertices': num_vertices,
+        'num_edges': num_edges,
+        'files': dict(sorted(files.items())),
+    }
+    path = manifest_path(crawl_path, slice_id)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + '.tmp', path)
+    return manifest
+
+
+def write_slice_manifest(
+    crawl_path: str, slice_id: str, time_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """Write the manifest of a slice (time_id is read from the WAT files
+    if not given) and return it.
+    """
+    if time_id is None:
+        time_id = scan_wat_time_id(crawl_path, slice_id)
+    output_dir = os.path.join(crawl_path, slice_id, 'output_text_dir')
+    num_vertices, num_edges = count_graph(output_dir)
+
+    files = {
+        name: _file_entry(os.path.join(output_dir, name))
+        for name in _output_files(output_dir)
+    }
+    return _save_manifest(crawl_path, slice_id, time_id, num_vertices, num_edges, files)
+
+
+def verify_slice_manifest(
+    crawl_path: str, slice_id: str, manifest: Dict[str, Any]
+) -> List[str]:
+    """Files of the manifest that are missing or changed (size, or SHA-256
+    checksum if the mtime changed), empty if all files match.
+    """
+    output_dir = os.path.join(crawl_path, slice_id, 'output_text_dir')
+    mismatches = []
+    for name, entry in manifest['files'].items():
+        reason = _file_mismatch(os.path.join(output_dir, name), entry)
+        if reason is not None:
+            mismatches.append(f'{name}: {reason}')
+    return mismatches
+
+
+def update_slice_manifest(crawl_path: str, slice_id: str) -> Dict[str, Any]:
+    """Add output files not listed yet (e.g., copied by
+    move_and_rename_compressed_outputs) to the manifest of a slice, or
+    write the manifest if it does not exist. Only the new files are hashed.
+    """
+    manifest = read_slice_manifest(crawl_path, slice_id)
+    if manifest is None:
+        return write_slice_manifest(crawl_path, slice_id)
+    output_dir = os.path.join(crawl_path, slice_id, 'output_text_dir')
+    new_files = [
+        name for name in _output_files(output_dir) if name not in manifest['files']
+    ]
+    if not new_files:
+        return manifest
+    files = dict(manifest['files'])
+    for name in new_files:
+        files[name] = _file_entry(os.path.join(output_dir, name))
+    return _save_manifest(
+        crawl_path,
+        slice_id,
+        manifest['time_id'],
+        manifest['num_vertices'],
+        manifest['num_edges'],
+        files,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Write the manifests of extracted slices.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        '--CC-crawl',
+        nargs='+',
+        required=True,
+        help='List of CC time-slices, e.g., --CC-crawl CC-MAIN-2017-13',
+    )
+    parser.add_argument(
+        '--crawl-path',
+        default=os.path.join(get_root_dir(), 'data', 'crawl-data'),
+        help='Directory holding the slices.',
+    )
+    args = parser.parse_args()
+    for slice_id in args.CC_crawl:
+        manifest = write_slice_manifest(args.crawl_path, slice_id)
+        print(
+            f'Wrote manifest of {slice_id}: time_id {manifest["time_id"]},'
+            f' {manifest["num_vertices"]} vertices, {manifest["num_edges"]} edges,'
+            f' {len(manifest["files"])} files'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,33 +1,197 @@
-import gzip
 import os
-import re
-from glob import glob
-from typing import Dict, List, Optional, Set, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from itertools import islice, repeat
+from typing import Dict, List, Optional, Set, Tuple, cast
 from urllib.parse import urlparse
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from tgrag.construct_graph_scripts.slice_manifest import (
+    read_slice_manifest,
+    scan_wat_time_id,
+    verify_slice_manifest,
+)
+from tgrag.utils.adjacency import csr_to_edges, read_adjacency
+from tgrag.utils.binary_graph import (
+    VertexNames,
+    is_binary_graph,
+    read_binary_edges,
+)
+from tgrag.utils.graph_snapshot import GraphSnapshot
+from tgrag.utils.temporal_store import TemporalGraphStore
+from tgrag.utils.text_graph import read_text_edges, read_text_vertices
 
 # this scripts merges multiple CC-MAIN slices into a temporal graph
 # and allows for continual addition of new slices
 
+# number of processes loading slices ahead of the merge
+DEFAULT_WORKERS = 2
+
+
+def _id_dtype(*arrays: np.ndarray) -> type:
+    """Smallest of int32 / int64 holding all values of the arrays."""
+    max_value = max((int(a.max()) for a in arrays if len(a)), default=0)
+    return np.int32 if max_value < 2**31 else np.int64
+
+
+class DomainNormalizer:
+    """Normalizes vertex names in batches (see
+    `TemporalGraphMerger._normalize_domain`), caching the normalized names
+    for the following slices.
+    """
+
+    # characters removed by str.strip()
+    _WHITESPACE = ''.join(chr(c) for c in range(128) if chr(c).isspace())
+
+    def __init__(self) -> None:
+        self.cache: Dict[str, str] = {}
+
+    @classmethod
+    def normalize_batch(cls, names: List[str]) -> List[str]:
+        """Normalize names with vectorized string operations, names with
+        non-ASCII characters or a scheme (://) are normalized one by one.
+        """
+        arr = pa.array(names, pa.string())
+        fallback = pc.or_(
+            pc.invert(pc.string_is_ascii(arr)), pc.match_substring(arr, '://')
+        )
+        arr = pc.ascii_lower(pc.ascii_trim(arr, characters=cls._WHITESPACE))
+        arr = pc.if_else(
+            pc.starts_with(arr, 'www.'), pc.utf8_slice_codeunits(arr, 4), arr
+        )
+        has_port = pc.match_substring(arr, ':')
+        if pc.any(has_port).as_py():
+            arr = pc.if_else(has_port, pc.replace_substring_regex(arr, ':.*', ''), arr)
+        arr = pc.if_else(
+            pc.ends_with(arr, '.'), pc.utf8_slice_codeunits(arr, 0, -1), arr
+        )
+        normalized = arr.to_pylist()
+        if pc.any(fallback).as_py():
+            normalize = TemporalGraphMerger._normalize_domain
+            for i in np.flatnonzero(fallback.to_numpy(zero_copy_only=False)):
+                normalized[i] = normalize(names[i])
+        return normalized
+
+    def normalize(self, names: List[str]) -> List[str]:
+        """Normalize names, looked up in the cache first."""
+        if not self.cache:
+            normalized = self.normalize_batch(names)
+            self.cache.update(zip(names, normalized))
+            return normalized
+
+        get = self.cache.get
+        cached = [get(name) for name in names]
+        num_missing = cached.count(None)
+        if num_missing == 0:
+            return cast(List[str], cached)
+        if num_missing > len(names) // 2:
+            # mostly new names, normalize all of them
+            normalized = self.normalize_batch(names)
+            self.cache.update(zip(names, normalized))
+            return normalized
+        positions = [i for i, value in enumerate(cached) if value is None]
+        missing = list(dict.fromkeys(names[i] for i in positions))
+        self.cache.update(zip(missing, self.normalize_batch(missing)))
+        cache = self.cache
+        for i in positions:
+            cached[i] = cache[names[i]]
+        return cast(List[str], cached)
+
+
+@dataclass
+class LoadedSlice:
+    """Vertices and edges of a slice, with local node IDs."""
+
+    slice_id: str
+    time_id: int
+    domains: List[str]
+    node_ids: np.ndarray
+    src: np.ndarray
+    dst: np.ndarray
+
+
+def load_slice(
+    vertices_path: str, edges_path: str, slice_id: str, time_id: int
+) -> LoadedSlice:
+    """Decompress and parse a slice, independent of the merger state
+    (run in worker processes by `TemporalGraphMerger.add_graphs`).
+    """
+    domains, node_ids = TemporalGraphMerger._load_vertices(vertices_path)
+    src, dst = TemporalGraphMerger._load_edges(edges_path)
+    return LoadedSlice(slice_id, time_id, domains, node_ids, src, dst)
+
 
 class TemporalGraphMerger:
     """Merges multiple slices into a temporal graph (both edges and nodes are temporal).
-    Then saves the graph (CSV) and can continually add slices to it.
+    Then saves the graph (one store partition per slice) and can continually add
+    slices to it.
     """
 
     def __init__(self, output_dir: str) -> None:
         self.output_dir: str = output_dir
-        self.edges: List[Tuple[int, int, int]] = []  # (src, dst, time_id)
-        self.domain_to_node: Dict[str, Tuple[int, int]] = {}  # domain → node_id
+        # per-slice column chunks (src, dst, time_id), see `_add_edges`
+        self.edge_chunks: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        # domain → (global node_id, last seen time_id)
+        self.domain_to_node: Dict[str, Tuple[int, int]] = {}
+        # domains in the order of their global node IDs
+        self._domain_index: pd.Index = pd.Index([], dtype=object)
         self.slice_node_sets: Dict[str, Set[int]] = {}  # slice_id → set of node_ids
         self.next_node_id: int = 0
         self.time_ids_seen: Set[int] = set()
         self._last_overlap: Optional[int] = None
+        self.normalizer = DomainNormalizer()
+        self.store = TemporalGraphStore(os.path.join(output_dir, 'store'))
+        self.snapshot = GraphSnapshot(os.path.join(output_dir, 'snapshot'))
+        # partitions not written to the store yet:
+        # time_id → (slice_id, domains, node_ids)
+        self._unsaved: Dict[int, Tuple[str, List[str], np.ndarray]] = {}
         self._load_existing()
 
     def _load_existing(self) -> None:
-        """Reconstruct graph from existing CSVs."""
+        """Reconstruct graph from the snapshot, the store or existing CSVs.
+
+        Without a current snapshot, the partitions of the store (edges and
+        the node IDs of the domains of a slice) are merged again in time
+        order.
+        """
+        if self.store.exists():
+            if self.snapshot.time_ids == self.store.time_ids:
+                # edges are memory-mapped
+                for time_id in self.snapshot.time_ids:
+                    src, dst = self.snapshot.read_partition(time_id)
+                    self._add_edges(
+                        src, dst, np.full(len(src), time_id, dtype=np.int32)
+                    )
+                domains, node_ids, time_ids = self.snapshot.read_nodes()
+                index = np.empty(len(domains), dtype=object)
+                index[node_ids] = domains
+                self._domain_index = pd.Index(index, dtype=object)
+                self.domain_to_node = dict(
+                    zip(domains, zip(node_ids.tolist(), time_ids.tolist()))
+                )
+                self.next_node_id = len(domains)
+            else:
+                for partition in sorted(
+                    self.store.partitions, key=lambda p: p['time_id']
+                ):
+                    time_id = partition['time_id']
+                    domains, node_ids = self.store.read_partition_nodes(time_id)
+                    src, dst = self.store.read_partition_edges(time_id)
+                    self._remap_slice(
+                        LoadedSlice(
+                            partition['slice_id'], time_id, domains, node_ids, src, dst
+                        )
+                    )
+            self.time_ids_seen = set(self.store.time_ids)
+            print(
+                f'Loaded existing graph with {len(self.domain_to_node)} nodes and {self.num_edges} edges'
+            )
+            return
+
         next_edges_path = os.path.join(self.output_dir, 'temporal_edges.csv')
         nodes_path = os.path.join(self.output_dir, 'temporal_nodes.csv')
 
@@ -35,14 +199,38 @@ class TemporalGraphMerger:
             try:
                 df_edges = pd.read_csv(next_edges_path)
                 df_nodes = pd.read_csv(nodes_path)
-                self.edges = list(df_edges.itertuples(index=False, name=None))
-                self.domain_to_node = {
-                    row['domain']: (row['node_id'], -1)
-                    for _, row in df_nodes.iterrows()
-                }
-                self.time_ids_seen = set(df_edges['time_id'])
+                # migrate: the IDs of the CSVs are taken as local IDs of every
+                # slice, all partitions are written to the store on save
+                id_to_domain = df_nodes.drop_duplicates('node_id', keep='last')
+                id_to_domain = id_to_domain.set_index('node_id')['domain']
+                for time_id in sorted(set(df_edges['time_id'])):
+                    edges = df_edges[df_edges['time_id'] == time_id]
+                    src = edges['src'].to_numpy()
+                    dst = edges['dst'].to_numpy()
+                    node_ids = np.union1d(
+                        np.union1d(src, dst),
+                        df_nodes.loc[df_nodes['time_id'] == time_id, 'node_id'],
+                    )
+                    node_ids = node_ids[np.isin(node_ids, id_to_domain.index)]
+                    domains = id_to_domain.loc[node_ids].tolist()
+                    global_ids = self._remap_slice(
+                        LoadedSlice(
+                            'temporal_edges.csv',
+                            int(time_id),
+                            domains,
+                            node_ids,
+                            src,
+                            dst,
+                        )
+                    )
+                    self._unsaved[int(time_id)] = (
+                        'temporal_edges.csv',
+                        domains,
+                        global_ids,
+                    )
+                    self.time_ids_seen.add(int(time_id))
                 print(
-                    f'Loaded existing graph with {len(self.domain_to_node)} nodes and {len(self.edges)} edges'
+                    f'Loaded existing graph with {len(self.domain_to_node)} nodes and {self.num_edges} edges'
                 )
             except Exception as e:
                 print(
@@ -50,7 +238,8 @@ class TemporalGraphMerger:
                 )
                 print('Continuing without loading existing CSVs.')
 
-    def _normalize_domain(self, raw: str) -> str:
+    @staticmethod
+    def _normalize_domain(raw: str) -> str:
         """Normalize domain strings for consistency across slices."""
         raw = raw.strip().lower()
         if '://' in raw:
@@ -63,50 +252,81 @@ class TemporalGraphMerger:
             raw = raw[:-1]
         return raw
 
-    def _load_vertices(self, filepath: str) -> Tuple[List[str], List[int]]:
-        """Helper to extract and load vertices from vertices.txt.gz."""
-        domains = []
-        node_ids = []
-        with gzip.open(filepath, 'rt', encoding='utf-8', errors='ignore') as f:
-            for line in f:
-                parts = line.strip().split('\t')
-                norm = self._normalize_domain(parts[1])
-                domains.append(norm)
-                node_ids.append(int(parts[0]))
-        return domains, node_ids
-
-    def _load_edges(self, filepath: str) -> List[Tuple[int, int]]:
-        with gzip.open(filepath, 'rt', encoding='utf-8', errors='ignore') as f:
-            result: List[Tuple[int, int]] = []
-            for line in f:
-                parts = line.strip().split()
-                if len(parts) == 2:
-                    result.append((int(parts[0]), int(parts[1])))
-            return result
-
-    def _slice_to_time_id(self, next_root_path: str, slice_id: str) -> int:
-        """Yield timestamp from slice ID (current logic: YYYYMMDD)."""
-        pattern = os.path.join(next_root_path, slice_id, 'segments', '*', 'wat')
-        wat_dir = glob(pattern)[0]
-        wat_files = sorted(glob(os.path.join(wat_dir, '*.wat.gz')))
-        warc_date_re = re.compile(r'WARC-Date:\s*(\d{4})-(\d{2})-(\d{2})')
-
-        for path in wat_files:
-            try:
-                with gzip.open(path, 'rt', encoding='utf-8', errors='ignore') as f:
-                    for line in f:
-                        match = warc_date_re.search(line)
-                        if match:
-                            yyyy, mm, dd = match.groups()
-                            return int(f'{yyyy}{mm}{dd}')
-            except Exception as e:
-                print(f'Warning: failed to parse {path}: {e}')
-                continue
+    @staticmethod
+    def _load_vertices(filepath: str) -> Tuple[List[str], np.ndarray]:
+        """Helper to extract and load vertices from vertices.txt.gz (names
+        are normalized when the slice is merged).
+        """
+        if is_binary_graph(filepath):
+            # binary graph (HostLinksToGraph --save_as_binary)
+            names = VertexNames(filepath).to_list()
+            node_ids = np.arange(len(names), dtype=np.int64)
+        else:
+            names, node_ids = read_text_vertices(filepath)
+        return names, node_ids
 
-        raise ValueError(
-            f'Could not extract scrape date from any WAT files in {wat_dir}'
+    def _add_edges(self, src: np.ndarray, dst: np.ndarray, time_id: np.ndarray) -> None:
+        """Append edges as column chunk, IDs stored as int32 if possible."""
+        dtype = _id_dtype(src, dst)
+        self.edge_chunks.append(
+            (
+                src.astype(dtype, copy=False),
+                dst.astype(dtype, copy=False),
+                time_id.astype(np.int32, copy=False),
+            )
         )
 
+    @property
+    def num_edges(self) -> int:
+        return sum(len(src) for src, _, _ in self.edge_chunks)
+
+    def get_edges(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Concatenate the edge chunks into the columns (src, dst, time_id)."""
+        if not self.edge_chunks:
+            empty = np.zeros(0, dtype=np.int32)
+            return empty, empty, empty
+        src, dst, time_id = zip(*self.edge_chunks)
+        return np.concatenate(src), np.concatenate(dst), np.concatenate(time_id)
+
+    @staticmethod
+    def _load_edges(filepath: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Load edges of a slice as arrays of sources and destinations."""
+        if is_binary_graph(filepath):
+            # binary graph (HostLinksToGraph --save_as_binary)
+            edges = read_binary_edges(filepath)
+            return np.ascontiguousarray(edges[:, 0]), np.ascontiguousarray(edges[:, 1])
+        if os.path.isdir(filepath):
+            # adjacency lists (HostLinksToGraph --save_as_adjacency)
+            return csr_to_edges(*read_adjacency(filepath))
+        return read_text_edges(filepath)
+
+    @staticmethod
+    def _slice_to_time_id(next_root_path: str, slice_id: str) -> int:
+        """Yield timestamp from slice ID (current logic: YYYYMMDD), read from
+        the slice manifest if present, otherwise from the WAT files.
+        """
+        manifest = read_slice_manifest(next_root_path, slice_id)
+        if manifest is not None:
+            return int(manifest['time_id'])
+        return scan_wat_time_id(next_root_path, slice_id)
+
+    @staticmethod
+    def _verify_slice(next_root_path: str, slice_id: str) -> None:
+        """Check the outputs of a slice to be merged against its manifest.
+
+        Raises:
+            ValueError: if the outputs of the slice do not match its manifest.
+        """
+        manifest = read_slice_manifest(next_root_path, slice_id)
+        if manifest is None:
+            return
+        mismatches = verify_slice_manifest(next_root_path, slice_id, manifest)
+        if mismatches:
+            raise ValueError(
+                f'Outputs of {slice_id} do not match its manifest:'
+                f' {", ".join(mismatches)}'
+            )
+
     def add_graph(
         self,
         next_root_path: str,
@@ -119,49 +339,197 @@ class TemporalGraphMerger:
         if time_id in self.time_ids_seen:
             print(f'Skipping slice {slice_id}: time_id {time_id} already exists.')
             return
+        self._verify_slice(next_root_path, slice_id)
+        self._merge_slice(
+            load_slice(next_vertices_path, next_edges_path, slice_id, time_id)
+        )
+
+    def add_graphs(
+        self,
+        next_root_path: str,
+        slices: List[Tuple[str, str, str]],
+        workers: int = DEFAULT_WORKERS,
+    ) -> None:
+        """Add new slices (vertices path, edges path, slice ID) to the existing
+        temporal graph. Slices are loaded concurrently in worker processes and
+        merged one after the other in the order of their time_id; at most
+        `workers` slices are loaded ahead of the merge.
+        """
+        pending: Dict[int, Tuple[str, str, str]] = {}
+        for vertices_path, edges_path, slice_id in slices:
+            time_id = self._slice_to_time_id(next_root_path, slice_id)
+            if time_id in self.time_ids_seen or time_id in pending:
+                print(f'Skipping slice {slice_id}: time_id {time_id} already exists.')
+                continue
+            self._verify_slice(next_root_path, slice_id)
+            pending[time_id] = (vertices_path, edges_path, slice_id)
+        if not pending:
+            return
+
+        workers = max(1, min(workers, len(pending)))
+        time_ids = iter(sorted(pending))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures: Dict[int, Future[LoadedSlice]] = {
+                time_id: executor.submit(load_slice, *pending[time_id], time_id)
+                for time_id in islice(time_ids, workers)
+            }
+            while futures:
+                # pop: a slice is released once it is merged
+                loaded = futures.pop(min(futures)).result()
+                for time_id in islice(time_ids, 1):
+                    futures[time_id] = executor.submit(
+                        load_slice, *pending[time_id], time_id
+                    )
+                self._merge_slice(loaded)
+
+    def _to_global_ids(self, domains: List[str]) -> np.ndarray:
+        """Global node IDs of domains, IDs of new domains are assigned in the
+        order of first occurrence.
+        """
+        global_ids = self._domain_index.get_indexer(domains)
+        new = global_ids < 0
+        if new.any():
+            new_domains = pd.Index(np.asarray(domains, dtype=object)[new])
+            unique_domains = new_domains.unique()
+            global_ids[new] = (
+                unique_domains.get_indexer(new_domains) + self.next_node_id
+            )
+            self._domain_index = self._domain_index.append(unique_domains)
+            self.next_node_id = len(self._domain_index)
+        return global_ids
 
-        # snapshot current node IDs before mutation
-        existing_node_ids = set(self.domain_to_node.values())
+    def _remap_slice(self, loaded: LoadedSlice) -> np.ndarray:
+        """Add the edges of a slice with global node IDs, returns the global
+        IDs of the domains of the slice.
+        """
+        time_id = loaded.time_id
+        global_ids = self._to_global_ids(loaded.domains)
 
-        # load vertices and edges using local -> global mapping
-        domains, node_ids = self._load_vertices(next_vertices_path)
-        new_node_ids = set()
+        src, dst = loaded.src, loaded.dst
+        node_ids = loaded.node_ids.astype(np.int64, copy=False)
+        size = max(
+            (int(a.max()) + 1 for a in [node_ids, src, dst] if len(a)), default=0
+        )
+        if size <= 2 * len(node_ids) + 1024:
+            # local → global lookup, applied to the edges in one gather
+            lookup = np.full(size, -1, dtype=np.int64)
+            lookup[node_ids] = global_ids
+            src, dst = lookup[src], lookup[dst]
+        else:
+            # sparse node IDs (HostLinksToGraph --vertex_ids global): look up
+            # the positions in node_ids, unknown IDs (-1) map to -1
+            index = pd.Index(node_ids)
+            lookup = np.append(global_ids, -1)
+            src = lookup[index.get_indexer(src)]
+            dst = lookup[index.get_indexer(dst)]
+        valid = (src >= 0) & (dst >= 0)
+        if not valid.all():
+            print(
+                f'Warning: dropping {len(valid) - int(valid.sum())} edges of slice'
+                f' {loaded.slice_id} with unknown node IDs'
+            )
+            src, dst = src[valid], dst[valid]
+        self._add_edges(src, dst, np.full(len(src), time_id, dtype=np.int32))
+
+        self.domain_to_node.update(
+            zip(loaded.domains, zip(global_ids.tolist(), repeat(time_id)))
+        )
+        return global_ids
 
-        for local_id, domain in enumerate(domains):
-            if domain not in self.domain_to_node:
-                new_node_ids.add(node_ids[local_id])
-            self.domain_to_node[domain] = (node_ids[local_id], time_id)
+    def _merge_slice(self, loaded: LoadedSlice) -> None:
+        time_id = loaded.time_id
+        num_existing = self.next_node_id
+        loaded = replace(loaded, domains=self.normalizer.normalize(loaded.domains))
 
-        edges = self._load_edges(next_edges_path)
-        for src_local, dst_local in edges:
-            self.edges.append((src_local, dst_local, time_id))
+        global_ids = self._remap_slice(loaded)
+        unique_ids = np.unique(global_ids)
+        num_new = int((unique_ids >= num_existing).sum())
+        node_ids = set(unique_ids.tolist())
 
-        self.slice_node_sets[slice_id] = new_node_ids
+        slice_id = loaded.slice_id
+        self.slice_node_sets[slice_id] = node_ids
+        self._unsaved[time_id] = (slice_id, loaded.domains, global_ids)
         self.time_ids_seen.add(time_id)
 
         print(
-            f'Added slice {slice_id} (timestamp {time_id}): {len(new_node_ids)} nodes, {len(edges)} edges'
+            f'Added slice {slice_id} (timestamp {time_id}): {num_new} new nodes, {len(loaded.src)} edges'
         )
 
         # store overlap with pre-existing graph if this is the only slice being added now
         if len(self.slice_node_sets) == 1:
-            self._last_overlap = len(existing_node_ids & new_node_ids)
+            self._last_overlap = len(node_ids) - num_new
+
+    def _get_partition_edges(self, time_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        src, dst = [], []
+        for chunk_src, chunk_dst, chunk_time_id in self.edge_chunks:
+            mask = chunk_time_id == time_id
+            if mask.all():
+                src.append(chunk_src)
+                dst.append(chunk_dst)
+            elif mask.any():
+                src.append(chunk_src[mask])
+                dst.append(chunk_dst[mask])
+        if not src:
+            empty = np.zeros(0, dtype=np.int32)
+            return empty, empty
+        return np.concatenate(src), np.concatenate(dst)
 
     def save(self) -> None:
-        """Save merged graph to CSV."""
-        os.makedirs(self.output_dir, exist_ok=True)
+        """Append the slices added since the last save to the store and
+        update the snapshot.
+        """
+        for time_id in sorted(self._unsaved):
+            slice_id, domains, node_ids = self._unsaved[time_id]
+            src, dst = self._get_partition_edges(time_id)
+            self.store.append_partition(time_id, slice_id, src, dst, domains, node_ids)
+            print(f'Saved partition time_id={time_id} ({slice_id}): {len(src)} edges')
+        self._unsaved.clear()
+        self._save_snapshot()
 
-        pd.DataFrame(self.edges, columns=['src', 'dst', 'time_id']).to_csv(
-            os.path.join(self.output_dir, 'temporal_edges.csv'), index=False
+    def _save_snapshot(self) -> None:
+        partitions = self.store.time_ids
+        if self.snapshot.time_ids == partitions:
+            return
+        for time_id in partitions:
+            if not self.snapshot.has_partition(time_id):
+                self.snapshot.write_partition(
+                    time_id, *self._get_partition_edges(time_id)
+                )
+        nodes = self.get_nodes_frame()
+        self.snapshot.write_nodes(
+            nodes['domain'].tolist(),
+            nodes['node_id'].to_numpy(),
+            nodes['time_id'].to_numpy(),
+            partitions,
         )
 
-        df_nodes = pd.DataFrame(
-            [
-                {'domain': domain, 'node_id': node_id, 'time_id': time_id}
-                for domain, (node_id, time_id) in self.domain_to_node.items()
-            ]
+    def get_edges_frame(self) -> pd.DataFrame:
+        """Edges (src, dst, time_id) of the merged graph."""
+        src, dst, time_id = self.get_edges()
+        return pd.DataFrame({'src': src, 'dst': dst, 'time_id': time_id})
+
+    def get_nodes_frame(self) -> pd.DataFrame:
+        """Nodes (domain, node_id, time_id) of the merged graph, time_id is
+        the last slice the domain is seen in.
+        """
+        node_ids, time_ids = (
+            zip(*self.domain_to_node.values()) if self.domain_to_node else ((), ())
+        )
+        return pd.DataFrame(
+            {
+                'domain': pd.Series(list(self.domain_to_node), dtype=object),
+                'node_id': np.array(node_ids, dtype=np.int64),
+                'time_id': np.array(time_ids, dtype=np.int32),
+            }
+        )
+
+    def export_csv(self) -> None:
+        """Save merged graph to CSV (temporal_edges.csv, temporal_nodes.csv)."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.get_edges_frame().to_csv(
+            os.path.join(self.output_dir, 'temporal_edges.csv'), index=False
         )
-        df_nodes.to_csv(
+        self.get_nodes_frame().to_csv(
             os.path.join(self.output_dir, 'temporal_nodes.csv'), index=False
         )
 
@@ -0,0 +1,149 @@
+"""Reader of the adjacency-list output of HostLinksToGraph (--save_as_adjacency).
+
+The output is a directory of Parquet files with one row per source vertex:
+`s` (vertex ID), `degree` (number of successors) and `successors`
+(sorted successor IDs, gap-encoded: the first ID followed by the
+differences to the previous ID, each an unsigned LEB128 varint).
+"""
+
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+
+def encode_varints(values: Iterable[int]) -> bytes:
+    """Encode non-negative integers as unsigned LEB128 varints.
+
+    Same encoding as `HostLinksToGraph.encode_varints` in the cc-scripts,
+    which cannot import tgrag (see `test_spark_encoder_matches`).
+    """
+    buf = bytearray()
+    for value in values:
+        while value > 0x7F:
+            buf.append((value & 0x7F) | 0x80)
+            value >>= 7
+        buf.append(value)
+    return bytes(buf)
+
+
+def encode_successors(successors: Iterable[int]) -> bytes:
+    """Gap-encode a sorted list of successor IDs."""
+    gaps = []
+    last = 0
+    for successor in successors:
+        gaps.append(successor - last)
+        last = successor
+    return encode_varints(gaps)
+
+
+def decode_varints(data: np.ndarray) -> np.ndarray:
+    """Decode a concatenation of unsigned LEB128 varints (vectorized).
+
+    Args:
+        data: uint8 array holding the encoded varints.
+
+    Returns:
+        The decoded values as int64 array.
+    """
+    if len(data) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if data[-1] & 0x80:
+        raise ValueError('Truncated varint at end of data')
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    lengths = ends - starts + 1
+    # position of every byte within its varint
+    position = np.arange(len(data)) - np.repeat(starts, lengths)
+    shifted = (data & 0x7F).astype(np.uint64) << (7 * position).astype(np.uint64)
+    return np.add.reduceat(shifted, starts).astype(np.int64)
+
+
+def decode_adjacency(
+    sources: np.ndarray,
+    degrees: np.ndarray,
+    data: np.ndarray,
+    num_nodes: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Decode gap-encoded adjacency lists into CSR arrays.
+
+    Args:
+        sources: Source vertex IDs in ascending order.
+        degrees: Number of successors per source vertex.
+        data: Concatenated encoded successor lists (uint8) of all sources.
+        num_nodes: Number of vertices, defaults to the max. vertex ID + 1.
+
+    Returns:
+        The CSR arrays (indptr, indices): the successors of vertex v
+        are indices[indptr[v]:indptr[v + 1]].
+    """
+    degrees = degrees.astype(np.int64)
+    gaps = decode_varints(data)
+    if len(gaps) != degrees.sum():
+        raise ValueError(
+            f'Number of successors ({len(gaps)}) does not match degrees ({degrees.sum()})'
+        )
+
+    # prefix sum of gaps, reset at the first successor of every source
+    prefix = np.cumsum(gaps)
+    row_starts = np.cumsum(degrees) - degrees
+    base = np.zeros(len(degrees), dtype=np.int64)
+    has_successors = (degrees > 0) & (row_starts > 0)
+    base[has_successors] = prefix[row_starts[has_successors] - 1]
+    indices = prefix - np.repeat(base, degrees)
+
+    if num_nodes is None:
+        max_id = max(
+            int(sources.max()) if len(sources) else -1,
+            int(indices.max()) if len(indices) else -1,
+        )
+        num_nodes = max_id + 1
+    counts = np.zeros(num_nodes, dtype=np.int64)
+    counts[sources] = degrees
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    return indptr, indices
+
+
+def read_adjacency(
+    path: str, num_nodes: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Read the adjacency-list output of HostLinksToGraph as CSR arrays.
+
+    Args:
+        path: Directory (or file) written with --save_as_adjacency.
+        num_nodes: Number of vertices, defaults to the max. vertex ID + 1.
+
+    Returns:
+        The CSR arrays (indptr, indices), see `decode_adjacency`.
+    """
+    table = pq.read_table(path, columns=['s', 'degree', 'successors'])
+    sources = table.column('s').to_numpy()
+    if np.any(np.diff(sources) <= 0):
+        table = table.sort_by('s')
+        sources = table.column('s').to_numpy()
+    degrees = table.column('degree').to_numpy()
+
+    successors = pc.cast(table.column('successors'), pa.large_binary())
+    successors = successors.combine_chunks()
+    offsets = np.frombuffer(successors.buffers()[1], dtype=np.int64)
+    offsets = offsets[successors.offset : successors.offset + len(successors) + 1]
+    data_buffer = successors.buffers()[2]
+    if data_buffer is None:
+        data = np.zeros(0, dtype=np.uint8)
+    else:
+        data = np.frombuffer(data_buffer, dtype=np.uint8)[offsets[0] : offsets[-1]]
+
+    return decode_adjacency(sources, degrees, data, num_nodes)
+
+
+def csr_to_edges(
+    indptr: np.ndarray, indices: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Convert CSR arrays into arrays of edge sources and targets."""
+    src = np.repeat(np.arange(len(indptr) - 1, dtype=np.int64), np.diff(indptr))
+    return src, indices
@@ -0,0 +1,86 @@
+"""Reader of the binary output of HostLinksToGraph (--save_as_binary).
+
+Edges are stored as array of (s, t) pairs of little-endian integers
+(edges.bin, described by the header edges.json). Vertex names are stored
+as string table in the order of vertex IDs: the offsets of the names
+(vertices.offsets.bin) and the concatenated UTF-8 names
+(vertices.names.bin), described by the header vertices.json.
+"""
+
+import json
+import os
+from typing import Any, Dict, List
+
+import numpy as np
+
+
+def is_binary_graph(path: str) -> bool:
+    return os.path.exists(os.path.join(path, 'edges.json'))
+
+
+def _read_header(path: str, name: str) -> Dict[str, Any]:
+    with open(os.path.join(path, name)) as f:
+        return json.load(f)
+
+
+def _map_array(filepath: str, dtype: str, shape: tuple, mmap: bool) -> np.ndarray:
+    if int(np.prod(shape)) == 0:
+        # empty files cannot be memory-mapped
+        return np.zeros(shape, dtype=dtype)
+    if mmap:
+        return np.memmap(filepath, dtype=dtype, mode='r', shape=shape)
+    return np.fromfile(filepath, dtype=dtype).reshape(shape)
+
+
+def read_binary_edges(path: str, mmap: bool = True) -> np.ndarray:
+    """Read the edges of a binary graph.
+
+    Args:
+        path: Directory written with --save_as_binary.
+        mmap: Memory-map the edges file instead of reading it.
+
+    Returns:
+        Array of shape (num_edges, 2) holding the pairs (s, t).
+    """
+    header = _read_header(path, 'edges.json')
+    return _map_array(
+        os.path.join(path, header['edges']),
+        header['dtype'],
+        tuple(header['shape']),
+        mmap,
+    )
+
+
+class VertexNames:
+    """Vertex names of a binary graph, indexed by vertex ID."""
+
+    def __init__(self, path: str, mmap: bool = True) -> None:
+        header = _read_header(path, 'vertices.json')
+        self.encoding: str = header['encoding']
+        self.offsets = _map_array(
+            os.path.join(path, header['offsets']),
+            header['offsets_dtype'],
+            (header['num_vertices'] + 1,),
+            mmap,
+        )
+        num_bytes = int(self.offsets[-1]) if len(self.offsets) else 0
+        self.names = _map_array(
+            os.path.join(path, header['names']), 'u1', (num_bytes,), mmap
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, vertex_id: int) -> str:
+        if not 0 <= vertex_id < len(self):
+            raise IndexError(f'Vertex ID {vertex_id} out of range')
+        start, end = self.offsets[vertex_id], self.offsets[vertex_id + 1]
+        return self.names[start:end].tobytes().decode(self.encoding)
+
+    def to_list(self) -> List[str]:
+        data = self.names.tobytes()
+        offsets = self.offsets.tolist()
+        return [
+            data[start:end].decode(self.encoding)
+            for start, end in zip(offsets[:-1], offsets[1:])
+        ]
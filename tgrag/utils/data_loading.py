@@ -4,6 +4,8 @@ import pandas as pd
 import torch
 from torch import Tensor
 
+from tgrag.utils.adjacency import csr_to_edges, read_adjacency
+
 
 def load_node_csv(
     path: str, index_col: int, encoders: Dict | None = None
@@ -54,3 +56,9 @@ def load_edge_csv(
         edge_attr = torch.cat(edge_attrs, dim=-1)
 
     return edge_index, edge_attr
+
+
+def load_edge_adjacency(path: str, num_nodes: int | None = None) -> Tensor:
+    """Load the adjacency-list output of HostLinksToGraph as edge index."""
+    src, dst = csr_to_edges(*read_adjacency(path, num_nodes))
+    return torch.stack([torch.from_numpy(src), torch.from_numpy(dst)], dim=0)
@@ -0,0 +1,129 @@
+"""Binary snapshot of the state of TemporalGraphMerger.
+
+The snapshot restores the merger without parsing: edges are memory-mapped
+and the domain index is read as a string table. Layout:
+
+    edges/<time_id>.src.npy, edges/<time_id>.dst.npy
+    nodes/vertices.json, vertices.offsets.bin, vertices.names.bin
+    nodes/node_ids.npy, nodes/time_ids.npy
+
+The edges of a partition are written once. The nodes directory (domain
+index in the format of tgrag.utils.binary_graph, with node ID and last
+seen time_id per domain) is replaced as a whole on every update; its
+header lists the partitions covered by the snapshot. Snapshots of other
+versions than VERSION are ignored, their edges are removed before the
+first partition is written.
+"""
+
+import json
+import os
+import shutil
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from tgrag.utils.binary_graph import VertexNames
+
+# 1: edges with the node IDs of the slices, 2: global node IDs
+VERSION = 2
+
+
+class GraphSnapshot:
+    """Reader and writer of a merger snapshot."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.time_ids: List[int] = []
+        # edges written by another version
+        self._stale = False
+        header_path = os.path.join(path, 'nodes', 'vertices.json')
+        if os.path.exists(header_path):
+            with open(header_path) as f:
+                header = json.load(f)
+            if header.get('version', 1) == VERSION:
+                self.time_ids = header['time_ids']
+            else:
+                self._stale = True
+
+    def exists(self) -> bool:
+        return bool(self.time_ids)
+
+    def _edges_path(self, time_id: int, column: str) -> str:
+        return os.path.join(self.path, 'edges', f'{time_id}.{column}.npy')
+
+    def has_partition(self, time_id: int) -> bool:
+        return not self._stale and os.path.exists(self._edges_path(time_id, 'dst'))
+
+    def write_partition(self, time_id: int, src: np.ndarray, dst: np.ndarray) -> None:
+        """Write the edges of a partition (src is written first, dst marks
+        the partition as complete).
+        """
+        if self._stale:
+            shutil.rmtree(os.path.join(self.path, 'edges'), ignore_errors=True)
+            self._stale = False
+        os.makedirs(os.path.join(self.path, 'edges'), exist_ok=True)
+        for column, values in [('src', src), ('dst', dst)]:
+            path = self._edges_path(time_id, column)
+            with open(path + '.tmp', 'wb') as f:
+                np.save(f, np.ascontiguousarray(values))
+            os.replace(path + '.tmp', path)
+
+    def read_partition(
+        self, time_id: int, mmap: bool = True
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Read (memory-map) the edges of a partition."""
+        if not mmap:
+            return (
+                np.load(self._edges_path(time_id, 'src')),
+                np.load(self._edges_path(time_id, 'dst')),
+            )
+        return (
+            np.load(self._edges_path(time_id, 'src'), mmap_mode='r'),
+            np.load(self._edges_path(time_id, 'dst'), mmap_mode='r'),
+        )
+
+    def write_nodes(
+        self,
+        domains: List[str],
+        node_ids: np.ndarray,
+        time_ids: np.ndarray,
+        partitions: List[int],
+    ) -> None:
+        """Replace the domain index, the snapshot then covers `partitions`."""
+        target = os.path.join(self.path, 'nodes')
+        tmp = target + '.tmp'
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+
+        encoded = [domain.encode('utf-8') for domain in domains]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(name) for name in encoded], out=offsets[1:])
+        offsets.tofile(os.path.join(tmp, 'vertices.offsets.bin'))
+        with open(os.path.join(tmp, 'vertices.names.bin'), 'wb') as f:
+            f.write(b''.join(encoded))
+        np.save(os.path.join(tmp, 'node_ids.npy'), np.asarray(node_ids))
+        np.save(os.path.join(tmp, 'time_ids.npy'), np.asarray(time_ids, np.int32))
+
+        header: Dict[str, Any] = {
+            'version': VERSION,
+            'num_vertices': len(encoded),
+            'encoding': 'utf-8',
+            'offsets': 'vertices.offsets.bin',
+            'offsets_dtype': '<i8',
+            'names': 'vertices.names.bin',
+            'time_ids': sorted(int(t) for t in partitions),
+        }
+        with open(os.path.join(tmp, 'vertices.json'), 'w') as f:
+            json.dump(header, f, indent=2)
+
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(tmp, target)
+        self.time_ids = header['time_ids']
+
+    def read_nodes(self) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """Read domains, node IDs and last seen time_ids of the domain index."""
+        path = os.path.join(self.path, 'nodes')
+        domains = VertexNames(path, mmap=False).to_list()
+        node_ids = np.load(os.path.join(path, 'node_ids.npy'))
+        time_ids = np.load(os.path.join(path, 'time_ids.npy'))
+        return domains, node_ids, time_ids
@@ -7,8 +7,31 @@ import re
 
 import pandas as pd
 
+from tgrag.utils.binary_graph import VertexNames, is_binary_graph
+
+
+def _match_domain(name: str) -> str:
+    tokens = name.split('.')
+    if len(tokens) >= 2:
+        return tokens[1] + '.' + tokens[0]
+    # this case shouldn't happen (fallback)
+    return tokens[0]
+
 
 def extract_graph_domains(filepath: str) -> pd.DataFrame:
+    """Match domains of the vertices of a graph, read from vertices.txt.gz
+    or from the directory of a binary graph (HostLinksToGraph
+    --save_as_binary).
+    """
+    if is_binary_graph(filepath):
+        names = VertexNames(filepath, mmap=False).to_list()
+        parsed = [
+            (i, _match_domain(name.strip().lower()))
+            for i, name in enumerate(names)
+            if name.strip()
+        ]
+        return pd.DataFrame(parsed, columns=['node_id', 'match_domain'])
+
     parsed = []
     with gzip.open(filepath, 'rt', encoding='utf-8', errors='ignore') as f:
         for i, line in enumerate(f):
@@ -18,13 +41,6 @@ def extract_graph_domains(filepath: str) -> pd.DataFrame:
             if not line:
                 continue
 
-            tokens = line.split('.')
-            if len(tokens) >= 2:
-                domain = tokens[1] + '.' + tokens[0]
-            else:
-                # this case shouldn't happen (fallback)
-                domain = tokens[0]
-
-            parsed.append((i, domain))
+            parsed.append((i, _match_domain(line)))
 
     return pd.DataFrame(parsed, columns=['node_id', 'match_domain'])
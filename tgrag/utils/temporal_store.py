@@ -0,0 +1,164 @@
+"""Append-only temporal graph store, partitioned by time_id.
+
+Every merged slice is stored as one partition of compressed Parquet
+files, in hive-style directories:
+
+    edges/time_id=<time_id>/part-0.parquet  (src, dst)
+    nodes/time_id=<time_id>/part-0.parquet  (domain, node_id)
+
+The nodes of a partition are the domains seen in the slice. The manifest
+(manifest.json) lists the partitions with their slice ID and row counts.
+Adding a slice writes only its partition and the updated manifest;
+readers select partitions by time range without scanning the others.
+"""
+
+import json
+import os
+import shutil
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+MANIFEST_NAME = 'manifest.json'
+COMPRESSION = 'zstd'
+
+
+class TemporalGraphStore:
+    """Reader and (append-only) writer of a temporal graph store."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.partitions: List[Dict[str, Any]] = []
+        manifest_path = os.path.join(path, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                self.partitions = json.load(f)['partitions']
+
+    def exists(self) -> bool:
+        return bool(self.partitions)
+
+    @property
+    def time_ids(self) -> List[int]:
+        return sorted(p['time_id'] for p in self.partitions)
+
+    def _partition_dir(self, table: str, time_id: int) -> str:
+        return os.path.join(self.path, table, f'time_id={time_id}')
+
+    def _write_table(self, table: str, time_id: int, data: pa.Table) -> None:
+        """Write a partition to a temporary directory, then move it into place."""
+        target = self._partition_dir(table, time_id)
+        tmp = target + '.tmp'
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        pq.write_table(
+            data, os.path.join(tmp, 'part-0.parquet'), compression=COMPRESSION
+        )
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(tmp, target)
+
+    def _write_manifest(self) -> None:
+        manifest_path = os.path.join(self.path, MANIFEST_NAME)
+        with open(manifest_path + '.tmp', 'w') as f:
+            json.dump({'partitions': self.partitions}, f, indent=2)
+        os.replace(manifest_path + '.tmp', manifest_path)
+
+    def append_partition(
+        self,
+        time_id: int,
+        slice_id: str,
+        src: np.ndarray,
+        dst: np.ndarray,
+        domains: List[str],
+        node_ids: np.ndarray,
+    ) -> None:
+        """Add the edges and nodes of a slice as new partition."""
+        if time_id in self.time_ids:
+            raise ValueError(f'Partition time_id={time_id} already exists')
+        os.makedirs(self.path, exist_ok=True)
+        self._write_table('edges', time_id, pa.table({'src': src, 'dst': dst}))
+        self._write_table(
+            'nodes',
+            time_id,
+            pa.table({'domain': pa.array(domains, pa.string()), 'node_id': node_ids}),
+        )
+        # the partition becomes visible with the manifest update
+        self.partitions.append(
+            {
+                'time_id': int(time_id),
+                'slice_id': slice_id,
+                'num_edges': len(src),
+                'num_nodes': len(domains),
+            }
+        )
+        self._write_manifest()
+
+    def _select(self, start: Optional[int], end: Optional[int]) -> List[int]:
+        return [
+            time_id
+            for time_id in self.time_ids
+            if (start is None or time_id >= start) and (end is None or time_id <= end)
+        ]
+
+    def read_partition_edges(self, time_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Read the edges of a partition as arrays of sources and destinations."""
+        edges = pq.read_table(self._partition_dir('edges', time_id))
+        return edges.column('src').to_numpy(), edges.column('dst').to_numpy()
+
+    def read_partition_nodes(self, time_id: int) -> Tuple[List[str], np.ndarray]:
+        """Read the nodes of a partition as domains and node IDs."""
+        nodes = pq.read_table(self._partition_dir('nodes', time_id))
+        return nodes.column('domain').to_pylist(), nodes.column('node_id').to_numpy()
+
+    def read_edges(
+        self, start: Optional[int] = None, end: Optional[int] = None
+    ) -> pd.DataFrame:
+        """Read edges (src, dst, time_id) of the partitions start <= time_id <= end."""
+        frames = []
+        for time_id in self._select(start, end):
+            src, dst = self.read_partition_edges(time_id)
+            frames.append(
+                pd.DataFrame(
+                    {
+                        'src': src,
+                        'dst': dst,
+                        'time_id': np.full(len(src), time_id, dtype=np.int32),
+                    }
+                )
+            )
+        if not frames:
+            return pd.DataFrame(
+                {
+                    'src': np.zeros(0, np.int64),
+                    'dst': np.zeros(0, np.int64),
+                    'time_id': np.zeros(0, np.int32),
+                }
+            )
+        return pd.concat(frames, ignore_index=True)
+
+    def read_nodes(
+        self, start: Optional[int] = None, end: Optional[int] = None
+    ) -> pd.DataFrame:
+        """Read nodes (domain, node_id, time_id) of the partitions
+        start <= time_id <= end, time_id is the last partition a domain is
+        seen in.
+        """
+        frames = []
+        for time_id in self._select(start, end):
+            nodes = pq.read_table(self._partition_dir('nodes', time_id)).to_pandas()
+            nodes['time_id'] = np.int32(time_id)
+            frames.append(nodes)
+        if not frames:
+            return pd.DataFrame(
+                {
+                    'domain': pd.Series([], dtype=object),
+                    'node_id': np.zeros(0, np.int64),
+                    'time_id': np.zeros(0, np.int32),
+                }
+            )
+        nodes = pd.concat(frames, ignore_index=True)
+        # partitions are read in time order
+        nodes = nodes.drop_duplicates('domain', keep='last')
+        return nodes.reset_index(drop=True)
@@ -0,0 +1,79 @@
+"""Reader of the text output of HostLinksToGraph (--save_as_text).
+
+Vertices (vertices.txt.gz) are stored as tab-separated lines `<id> <name>`,
+edges (edges.txt.gz) as lines `<src> <dst>`, both gzip-compressed. The files
+are parsed by the pyarrow CSV reader: the gzip stream is decompressed
+and split into blocks which are parsed into columns by multiple threads.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv
+
+# bytes per block parsed by one thread
+BLOCK_SIZE = 1 << 24
+
+
+def _read_columns(
+    path: str, column_types: List[Tuple[str, pa.DataType]], use_threads: bool
+) -> pa.Table:
+    try:
+        return _read_csv(path, column_types, use_threads)
+    except pa.ArrowInvalid as e:
+        if 'Empty CSV file' not in str(e):
+            raise
+        return pa.schema(column_types).empty_table()
+
+
+def _read_csv(
+    path: str, column_types: List[Tuple[str, pa.DataType]], use_threads: bool
+) -> pa.Table:
+    return csv.read_csv(
+        path,
+        read_options=csv.ReadOptions(
+            column_names=[name for name, _ in column_types],
+            block_size=BLOCK_SIZE,
+            use_threads=use_threads,
+        ),
+        parse_options=csv.ParseOptions(
+            delimiter='\t',
+            quote_char=False,
+            # skip malformed lines (wrong number of columns)
+            invalid_row_handler=lambda row: 'skip',
+        ),
+        convert_options=csv.ConvertOptions(column_types=dict(column_types)),
+    )
+
+
+def read_text_edges(
+    path: str, use_threads: bool = True
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Read edges.txt.gz as arrays of sources and destinations (int64)."""
+    table = _read_columns(path, [('src', pa.int64()), ('dst', pa.int64())], use_threads)
+    return (
+        table.column('src').to_numpy(),
+        table.column('dst').to_numpy(),
+    )
+
+
+def read_text_vertices(
+    path: str, use_threads: bool = True
+) -> Tuple[List[str], np.ndarray]:
+    """Read vertices.txt.gz as list of names and array of IDs (int64).
+
+    Names which are not valid UTF-8 are decoded ignoring invalid bytes.
+    """
+    table = _read_columns(
+        path, [('id', pa.int64()), ('name', pa.binary())], use_threads
+    )
+    names = table.column('name')
+    try:
+        name_list = pc.cast(names, pa.string()).to_pylist()
+    except pa.ArrowInvalid:
+        name_list = [
+            name.decode('utf-8', errors='ignore') for name in names.to_pylist()
+        ]
+    return name_list, table.column('id').to_numpy()